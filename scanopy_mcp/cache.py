@@ -0,0 +1,172 @@
+"""TTL cache for upstream GET responses."""
+
+import contextlib
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from scanopy_mcp.hashing import canonical_json
+from scanopy_mcp.metrics import Metrics
+
+# Whether GETs in the current context skip fresh cache hits (set by uncached())
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "scanopy_cache_bypass", default=False
+)
+
+
+@contextlib.contextmanager
+def uncached() -> Iterator[None]:
+    """Send GETs made inside the block upstream even if a fresh copy is cached.
+
+    Responses are still stored, and an entry's validators still let the API
+    answer with a 304.
+    """
+    reset = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(reset)
+
+
+def cache_bypassed() -> bool:
+    """Return whether GETs in the current context skip fresh cache hits."""
+    return _bypass.get()
+
+
+class _Entry:
+    """A cached response, its freshness and its validators."""
+
+    __slots__ = ("value", "expires_at", "etag", "last_modified")
+
+    def __init__(
+        self,
+        value: Any,
+        expires_at: float,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ):
+        self.value = value
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+class ResponseCache:
+    """LRU cache of decoded GET responses with a fixed time-to-live.
+
+    A fresh hit returns the same decoded object every time, so consumers
+    can cheaply tell whether data changed by identity. Expired entries that
+    carry an ETag or Last-Modified are kept for conditional revalidation: a
+    304 makes them fresh again, with the same object, without a download.
+
+    Every lookup is counted once in the `upstream_get` cache metrics: as a
+    hit (fresh), a revalidation (304) or a miss (body downloaded).
+    """
+
+    def __init__(
+        self,
+        ttl_s: float,
+        max_entries: int = 256,
+        metrics: Metrics | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the cache.
+
+        Args:
+            ttl_s: Seconds a stored response stays fresh.
+            max_entries: Maximum cached responses; least recently used are evicted.
+            metrics: Optional metrics registry for hit rates.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._clock = clock
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(url: str, params: dict | None) -> str:
+        """Build a cache key from a URL and its query parameters."""
+        if not params:
+            return url
+        return f"{url}?{canonical_json(params).decode()}"
+
+    def get(self, key: str) -> Any | None:
+        """Return a fresh cached value, or None if it must be fetched.
+
+        Only hits are counted here; the fetch is counted by revalidated()
+        or put().
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expires_at <= self._clock():
+                if entry.etag is None and entry.last_modified is None:
+                    del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        self.metrics.record_cache("upstream_get", hit=True)
+        return entry.value
+
+    def conditional_headers(self, key: str) -> dict[str, str]:
+        """Return If-None-Match / If-Modified-Since headers for a stored entry."""
+        with self._lock:
+            entry = self._entries.get(key)
+        headers = {}
+        if entry is not None:
+            if entry.etag is not None:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified is not None:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def revalidated(self, key: str) -> Any | None:
+        """Mark an entry fresh again after a 304 and return its value.
+
+        Returns None if the entry is gone (e.g. a write cleared the cache
+        meanwhile); the caller then has to fetch the body.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            entry.expires_at = self._clock() + self.ttl_s
+            self._entries.move_to_end(key)
+        self.metrics.record_cache("upstream_get", hit=False, revalidated=True)
+        return entry.value
+
+    def put(
+        self,
+        key: str,
+        value: Any,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        """Store a downloaded value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key.
+            value: Decoded response.
+            etag: Response ETag, used to revalidate the entry once it expires.
+            last_modified: Response Last-Modified, likewise.
+        """
+        with self._lock:
+            self._entries[key] = _Entry(value, self._clock() + self.ttl_s, etag, last_modified)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        self.metrics.record_cache("upstream_get", hit=False)
+
+    def clear(self) -> None:
+        """Drop every cached response (e.g. after a write)."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
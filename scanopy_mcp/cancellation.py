@@ -0,0 +1,181 @@
+"""Cancellation of in-flight requests (MCP notifications/cancelled)."""
+
+import contextlib
+import contextvars
+import socket
+import threading
+from collections.abc import Callable, Hashable, Iterator
+
+import httpx
+
+
+class RequestCancelledError(Exception):
+    """Raised in a request's thread once the client has cancelled it."""
+
+
+class CancelToken:
+    """Cancellation state of one request.
+
+    Callbacks registered with on_cancel() run once, in the cancelling
+    thread, so they can abort blocking work such as an upstream read.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._callbacks: dict[int, Callable[[], None]] = {}
+        self._next = 0
+        self.reason: str | None = None
+        self.cancelled = False
+
+    def cancel(self, reason: str | None = None) -> None:
+        """Cancel the request and run its callbacks."""
+        with self._lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+            self.reason = reason
+            callbacks, self._callbacks = list(self._callbacks.values()), {}
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                # Aborting is best effort; the request thread notices the flag
+                pass
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancellation (now, if already cancelled).
+
+        Returns:
+            A function that unregisters the callback.
+        """
+        with self._lock:
+            if not self.cancelled:
+                key = self._next
+                self._next += 1
+                self._callbacks[key] = callback
+                return lambda: self._callbacks.pop(key, None)
+        callback()
+        return lambda: None
+
+    def raise_if_cancelled(self) -> None:
+        """Raise RequestCancelledError if the request was cancelled."""
+        if self.cancelled:
+            raise RequestCancelledError(self.reason or "Request cancelled")
+
+
+_current_token: contextvars.ContextVar[CancelToken | None] = contextvars.ContextVar(
+    "scanopy_cancel_token", default=None
+)
+
+
+def current_token() -> CancelToken | None:
+    """Return the cancel token of the request being handled, if any."""
+    return _current_token.get()
+
+
+@contextlib.contextmanager
+def activate(token: CancelToken) -> Iterator[CancelToken]:
+    """Make a token current for the block (see current_token())."""
+    reset = _current_token.set(token)
+    try:
+        yield token
+    finally:
+        _current_token.reset(reset)
+
+
+class InFlightRequests:
+    """Cancel tokens of the requests being handled, by request key."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: dict[Hashable, CancelToken] = {}
+
+    def reserve(self, key: Hashable) -> CancelToken:
+        """Register a request before it starts (e.g. while it is queued)."""
+        with self._lock:
+            return self._tokens.setdefault(key, CancelToken())
+
+    @contextlib.contextmanager
+    def track(self, key: Hashable) -> Iterator[CancelToken]:
+        """Register a request for the duration of the block.
+
+        The token is current (see current_token()) inside the block, and
+        so in threads started from a copy of its context. A token reserved
+        earlier for the key is reused, so a cancel sent while the request
+        was queued still applies.
+        """
+        token = self.reserve(key)
+        try:
+            with activate(token):
+                yield token
+        finally:
+            with self._lock:
+                if self._tokens.get(key) is token:
+                    del self._tokens[key]
+
+    def cancel(self, key: Hashable, reason: str | None = None) -> bool:
+        """Cancel a tracked request; returns False if it is not in flight."""
+        with self._lock:
+            token = self._tokens.get(key)
+        if token is None:
+            return False
+        token.cancel(reason)
+        return True
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._tokens)
+
+
+class CancellableTransport(httpx.BaseTransport):
+    """httpx transport that aborts responses of cancelled requests.
+
+    While a response body is read for a request with a cancel token,
+    cancelling the token shuts the connection's socket down. The blocked
+    read fails at once and the connection is dropped instead of going back
+    to the pool half-read. The reader gets RequestCancelledError.
+    """
+
+    def __init__(self, transport: httpx.BaseTransport):
+        self._transport = transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        token = current_token()
+        if token is None:
+            return self._transport.handle_request(request)
+        token.raise_if_cancelled()
+        response = self._transport.handle_request(request)
+        response.stream = _CancellableStream(response, token)
+        return response
+
+    def close(self) -> None:
+        self._transport.close()
+
+
+class _CancellableStream(httpx.SyncByteStream):
+    """Response body stream that stops when its request is cancelled."""
+
+    def __init__(self, response: httpx.Response, token: CancelToken):
+        self._stream = response.stream
+        self._network = response.extensions.get("network_stream")
+        self._token = token
+
+    def _abort(self) -> None:
+        sock = self._network.get_extra_info("socket") if self._network is not None else None
+        if sock is not None:
+            sock.shutdown(socket.SHUT_RDWR)
+
+    def __iter__(self) -> Iterator[bytes]:
+        unregister = self._token.on_cancel(self._abort)
+        try:
+            for chunk in self._stream:
+                self._token.raise_if_cancelled()
+                yield chunk
+        except (httpx.TransportError, OSError):
+            self._token.raise_if_cancelled()
+            raise
+        finally:
+            unregister()
+
+    def close(self) -> None:
+        self._stream.close()
@@ -0,0 +1,138 @@
+"""Compiled, memory-mapped tool catalog shared read-only between processes."""
+
+import json
+import mmap
+import os
+import struct
+import threading
+from collections.abc import Iterator, Mapping, MutableMapping
+
+from scanopy_mcp.tool_spec import ToolSpec, as_tool_spec
+
+# File layout: MAGIC, index length (u64), index JSON, then one JSON blob per tool
+MAGIC = b"SCNCAT01"
+_HEADER = struct.Struct("<Q")
+
+
+def compile_catalog(tools: Mapping[str, ToolSpec | Mapping], path: str) -> None:
+    """Write tools to a catalog file that workers can memory-map.
+
+    Args:
+        tools: Tool name -> ToolSpec (as produced by ToolRegistry) or dict form.
+        path: Destination file; written atomically.
+    """
+    blobs = []
+    index = {}
+    offset = 0
+    for name, tool in tools.items():
+        blob = json.dumps(as_tool_spec(name, tool).to_dict(), separators=(",", ":")).encode()
+        index[name] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+
+    index_bytes = json.dumps(index, separators=(",", ":")).encode()
+    tmp = f"{path}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(MAGIC)
+        f.write(_HEADER.pack(len(index_bytes)))
+        f.write(index_bytes)
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+class Catalog:
+    """Read-only view of a compiled catalog file.
+
+    The file is memory-mapped, so every process that opens it shares the same
+    page-cache pages; a tool is only decoded when it is looked up.
+    """
+
+    def __init__(self, path: str):
+        """Open and map a catalog file.
+
+        Raises:
+            ValueError: If the file is not a catalog.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[: len(MAGIC)] != MAGIC:
+            self._map.close()
+            raise ValueError(f"Not a tool catalog: {path}")
+        start = len(MAGIC)
+        (index_len,) = _HEADER.unpack_from(self._map, start)
+        start += _HEADER.size
+        self._index: dict[str, list[int]] = json.loads(self._map[start : start + index_len])
+        self._data_start = start + index_len
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def raw(self, name: str) -> bytes:
+        """Return the encoded JSON of one tool.
+
+        Raises:
+            KeyError: If the tool is not in the catalog.
+        """
+        offset, length = self._index[name]
+        start = self._data_start + offset
+        return self._map[start : start + length]
+
+    def get(self, name: str) -> ToolSpec:
+        """Decode one tool.
+
+        Raises:
+            KeyError: If the tool is not in the catalog.
+        """
+        return ToolSpec.from_dict(name, json.loads(self.raw(name)))
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._map.close()
+
+
+class CatalogTools(MutableMapping):
+    """Tool table backed by a Catalog, with locally registered additions.
+
+    Catalog tools are decoded on first access and cached per process; tools
+    assigned at runtime (meta-tools) live in a plain dict on top.
+    """
+
+    def __init__(self, catalog: Catalog):
+        self._catalog = catalog
+        self._local: dict[str, ToolSpec] = {}
+        self._decoded: dict[str, ToolSpec] = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name: str) -> ToolSpec:
+        if name in self._local:
+            return self._local[name]
+        tool = self._decoded.get(name)
+        if tool is None:
+            tool = self._catalog.get(name)
+            with self._lock:
+                tool = self._decoded.setdefault(name, tool)
+        return tool
+
+    def __setitem__(self, name: str, tool: ToolSpec | Mapping) -> None:
+        self._local[name] = as_tool_spec(name, tool)
+
+    def __delitem__(self, name: str) -> None:
+        del self._local[name]
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._local or name in self._catalog
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._catalog
+        yield from (name for name in self._local if name not in self._catalog)
+
+    def __len__(self) -> int:
+        return len(self._catalog) + sum(1 for name in self._local if name not in self._catalog)
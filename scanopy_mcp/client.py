@@ -1,30 +1,139 @@
 """HTTP client for Scanopy API."""
 
+import contextvars
+import threading
+import time
+from collections.abc import Callable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
 import httpx
 
+from scanopy_mcp.cache import ResponseCache, cache_bypassed
+from scanopy_mcp.cancellation import CancellableTransport, CancelToken, activate, current_token
+from scanopy_mcp.compression import DEFAULT_ENCODINGS, accept_encoding, wire_bytes
+from scanopy_mcp.deadlines import DeadlineExceededError, remaining
+from scanopy_mcp.idempotency import IDEMPOTENCY_HEADER, current_key
+from scanopy_mcp.metrics import Metrics
+from scanopy_mcp.tracing import Span, Tracer, current_span
+
+# GET responses worth retrying: the upstream or a proxy was briefly unavailable
+RETRY_STATUSES = frozenset({502, 503, 504})
+
+# Delay before the first retry; doubled for each further one
+RETRY_BACKOFF_S = 0.1
+
+# Upstream latency quantile after which a GET is hedged, and the samples
+# needed before the quantile is trusted
+HEDGE_QUANTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+
 
 class ScanopyClient:
     """HTTP client for making authenticated requests to Scanopy API."""
 
-    def __init__(self, base_url: str, api_key: str, timeout_s: float = 10.0):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        timeout_s: float = 10.0,
+        metrics: Metrics | None = None,
+        tracer: Tracer | None = None,
+        max_connections: int = 10,
+        cache: ResponseCache | None = None,
+        encodings: tuple[str, ...] | None = None,
+        tool_timeouts: Mapping[str, float] | None = None,
+        retries: int = 0,
+        hedge: bool = False,
+    ):
         """Initialize the client.
 
         Args:
             base_url: Base URL of the Scanopy API.
             api_key: API key for authentication (raw token, no "Bearer" prefix).
-            timeout_s: Request timeout in seconds.
+            timeout_s: Request timeout in seconds (per connect and read wait).
+            metrics: Optional metrics registry for upstream latency and bytes.
+            tracer: Optional tracer for upstream request spans.
+            max_connections: Size of the shared upstream connection pool.
+            cache: Optional cache for GET responses; any write clears it.
+            encodings: Response encodings to ask for, most preferred first
+                (default: zstd, br, gzip, as far as their decoders are installed).
+            tool_timeouts: Timeouts overriding timeout_s for the requests of
+                given tools, by tool name.
+            retries: Times a GET is retried after a transport error or a 502,
+                503 or 504 response, within the request deadline.
+            hedge: Send a second copy of a GET once the first has taken
+                longer than the tool's observed p95 upstream latency; the
+                first response wins and the other is cancelled.
         """
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
         self.timeout_s = timeout_s
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.max_connections = max_connections
+        self.cache = cache
+        self.accept_encoding = accept_encoding(
+            DEFAULT_ENCODINGS if encodings is None else encodings
+        )
+        self.tool_timeouts = dict(tool_timeouts or {})
+        self.retries = max(0, retries)
+        self.hedge = hedge
+        self._http: httpx.Client | None = None
+        self._http_lock = threading.Lock()
+        self._hedge_pool: ThreadPoolExecutor | None = None
+
+    def _http_client(self) -> httpx.Client:
+        """Return the pooled HTTP client shared by all requests.
+
+        Keeping one client avoids a TCP/TLS handshake per call; httpx clients
+        are safe to share between threads. Responses of cancelled requests
+        are aborted mid-read, freeing their connection.
+        """
+        if self._http is None:
+            with self._http_lock:
+                if self._http is None:
+                    transport = httpx.HTTPTransport(
+                        limits=httpx.Limits(
+                            max_connections=self.max_connections,
+                            max_keepalive_connections=self.max_connections,
+                        ),
+                    )
+                    self._http = httpx.Client(
+                        timeout=self.timeout_s, transport=CancellableTransport(transport)
+                    )
+        return self._http
+
+    def close(self) -> None:
+        """Close pooled upstream connections."""
+        with self._http_lock:
+            if self._hedge_pool is not None:
+                self._hedge_pool.shutdown(wait=False, cancel_futures=True)
+                self._hedge_pool = None
+            if self._http is not None:
+                self._http.close()
+                self._http = None
 
     def _headers(self) -> dict:
         """Build request headers with authentication.
 
+        The active trace context is forwarded as a W3C `traceparent` header so
+        upstream logs can be matched to local spans. Writes carry their
+        `Idempotency-Key`, so the API can drop a retried duplicate.
+
         Returns:
             Dictionary of HTTP headers.
         """
-        return {"Authorization": f"Bearer {self.api_key}"}
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Accept-Encoding": self.accept_encoding,
+        }
+        span = current_span()
+        if span is not None:
+            headers["traceparent"] = span.traceparent
+        key = current_key()
+        if key is not None:
+            headers[IDEMPOTENCY_HEADER] = key
+        return headers
 
     def request(
         self,
@@ -48,6 +157,7 @@ class ScanopyClient:
             httpx.HTTPStatusError: If the request fails.
         """
         params = params or {}
+        template = path
 
         # Extract path params (those with {placeholder} in path)
         path_params = {}
@@ -62,18 +172,209 @@ class ScanopyClient:
 
         url = f"{self.base_url}{path}"
 
-        with httpx.Client(timeout=self.timeout_s) as client:
-            if method.upper() == "GET":
-                # GET: use query params, no body
-                resp = client.request(
-                    method, url, headers=self._headers(), params=other_params or None
-                )
+        is_get = method.upper() == "GET"
+        cache_key = None
+        conditional = {}
+        if self.cache is not None and is_get:
+            cache_key = ResponseCache.key(url, other_params)
+            cached = None if cache_bypassed() else self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+            # An expired entry with validators can be revalidated by a 304
+            conditional = self.cache.conditional_headers(cache_key)
+
+        with self.tracer.span(
+            "scanopy.http.request", **{"http.request.method": method.upper(), "url.path": path}
+        ) as span:
+            kwargs = {}
+            if span is not None:
+                # Surface connect/TLS handshake timings as span events
+                kwargs["extensions"] = {"trace": _trace_events(span)}
+
+            client = self._http_client()
+            with self.metrics.timer("upstream"):
+                if is_get:
+                    # GET: use query params, no body
+                    resp = self._get(
+                        client,
+                        url,
+                        headers={**self._headers(), **conditional},
+                        params=other_params or None,
+                        **kwargs,
+                    )
+                else:
+                    # POST/PUT/PATCH/DELETE: use JSON body (prefer explicit json)
+                    # Writes are not retried: a lost response may hide a success
+                    body = json if json is not None else (other_params or None)
+                    kwargs["timeout"] = self._timeout()
+                    resp = client.request(
+                        method, url, headers=self._headers(), json=body, **kwargs
+                    )
+            received = len(resp.content)
+            wire = wire_bytes(resp, received)
+            sent = int(resp.request.headers.get("content-length", 0))
+            self.metrics.add_bytes(bytes_in=received, bytes_out=sent, bytes_in_wire=wire)
+            if span is not None:
+                span.set_attribute("http.response.status_code", resp.status_code)
+                span.set_attribute("http.response.body.size", wire)
+                span.set_attribute("scanopy.response.decoded_size", received)
+                encoding = resp.headers.get("content-encoding")
+                if encoding:
+                    span.set_attribute("http.response.header.content-encoding", encoding)
+
+            if conditional and resp.status_code == 304:
+                # Not modified: no body to transfer or decode
+                data = self.cache.revalidated(cache_key)
+                if data is None:
+                    # The entry was dropped meanwhile (a write); fetch the body
+                    return self.request(method, template, json=json, params=params)
+                return data
+
+            resp.raise_for_status()
+            with self.metrics.timer("decode"):
+                data = resp.json()
+
+        if cache_key is not None:
+            self.cache.put(
+                cache_key,
+                data,
+                etag=resp.headers.get("etag"),
+                last_modified=resp.headers.get("last-modified"),
+            )
+        elif self.cache is not None and not is_get:
+            # Writes may change any listing; drop everything cached
+            self.cache.clear()
+        return data
+
+    def _timeout(self) -> float:
+        """Return the timeout of an upstream attempt for the current tool.
+
+        Raises:
+            DeadlineExceededError: If the request deadline has passed.
+        """
+        timeout = self.tool_timeouts.get(self.metrics.current_tool(), self.timeout_s)
+        left = remaining()
+        if left is None:
+            return timeout
+        if left <= 0:
+            raise DeadlineExceededError("Request deadline exceeded")
+        return min(timeout, left)
+
+    def _get(self, client: httpx.Client, url: str, **kwargs) -> httpx.Response:
+        """Send a GET, retrying transient failures with exponential backoff.
+
+        A retry is only made if its backoff ends before the request deadline.
+        """
+        attempt = 0
+        while True:
+            try:
+                resp = self._hedged(client, url, **kwargs)
+            except httpx.TransportError:
+                if not self._backoff(attempt):
+                    raise
             else:
-                # POST/PUT/PATCH/DELETE: use JSON body (prefer explicit json)
-                body = json if json is not None else (other_params or None)
-                resp = client.request(
-                    method, url, headers=self._headers(), json=body
+                if resp.status_code not in RETRY_STATUSES or not self._backoff(attempt):
+                    return resp
+            attempt += 1
+
+    def _backoff(self, attempt: int) -> bool:
+        """Wait before retry number attempt + 1; False if there is none to make."""
+        delay = RETRY_BACKOFF_S * 2**attempt
+        left = remaining()
+        token = current_token()
+        if attempt >= self.retries or (left is not None and delay >= left):
+            return False
+        if token is not None and token.cancelled:
+            return False
+        time.sleep(delay)
+        return True
+
+    def _hedged(self, client: httpx.Client, url: str, **kwargs) -> httpx.Response:
+        """Send a GET, hedged by a second copy if the first one is slow.
+
+        Both copies run on a pool with this context (trace span, metrics
+        tool, deadline). The loser is cancelled like a client-cancelled
+        request: its body read is aborted, or, if its headers are still
+        pending, it is dropped when they arrive.
+        """
+        delay = self._hedge_delay()
+        timeout = self._timeout()
+        if delay is None or delay >= timeout:
+            return client.request("GET", url, timeout=timeout, **kwargs)
+
+        parent = current_token()
+        tokens: dict[Future, CancelToken] = {}
+        unlink = []
+
+        def submit():
+            token = CancelToken()
+            if parent is not None:
+                unlink.append(parent.on_cancel(lambda: token.cancel(parent.reason)))
+            run = contextvars.copy_context().run
+            future = self._hedge_executor().submit(
+                run, _attempt, token, client, url, self._timeout(), kwargs
+            )
+            tokens[future] = token
+            return future
+
+        try:
+            first = submit()
+            if wait([first], timeout=delay).done:
+                return first.result()
+            hedge = submit()
+            pending = {first, hedge}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        resp = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    self.metrics.record_hedge(won=future is hedge)
+                    return resp
+            self.metrics.record_hedge(won=False)
+            raise error
+        finally:
+            for future, token in tokens.items():
+                if not future.done():
+                    token.cancel("Hedged request lost")
+            for callback in unlink:
+                callback()
+
+    def _hedge_delay(self) -> float | None:
+        """Return how long a GET may take before it is hedged, if hedging applies."""
+        tool = self.metrics.current_tool()
+        if not self.hedge or tool is None:
+            return None
+        return self.metrics.latency_quantile(
+            tool, "upstream", HEDGE_QUANTILE, min_count=HEDGE_MIN_SAMPLES
+        )
+
+    def _hedge_executor(self) -> ThreadPoolExecutor:
+        """Return the pool hedged GET attempts run on."""
+        with self._http_lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(
+                    max_workers=2 * self.max_connections, thread_name_prefix="scanopy-hedge"
                 )
+            return self._hedge_pool
 
-            resp.raise_for_status()
-            return resp.json()
+
+def _attempt(
+    token: CancelToken, client: httpx.Client, url: str, timeout: float, kwargs: dict
+) -> httpx.Response:
+    """Send one copy of a hedged GET under its own cancel token."""
+    with activate(token):
+        return client.request("GET", url, timeout=timeout, **kwargs)
+
+
+def _trace_events(span: Span) -> Callable[[str, dict], None]:
+    """Build an httpx trace extension callback that records span events."""
+
+    def callback(event_name: str, info: dict) -> None:
+        if event_name.endswith((".started", ".complete", ".failed")):
+            span.add_event(event_name)
+
+    return callback
@@ -0,0 +1,70 @@
+"""Negotiated compression of upstream responses."""
+
+import importlib.util
+from collections.abc import Iterable
+
+import httpx
+
+# Encodings in the default order of preference
+DEFAULT_ENCODINGS = ("zstd", "br", "gzip")
+
+# Content codings httpx can decode, and the optional module each one needs
+_DECODER_MODULES = {
+    "zstd": ("zstandard",),
+    "br": ("brotli", "brotlicffi"),
+    "gzip": (),
+    "deflate": (),
+}
+
+# Values that turn negotiation off
+_IDENTITY = frozenset({"identity", "none", "off"})
+
+
+def available_encodings() -> tuple[str, ...]:
+    """Return the encodings whose decoders are installed."""
+    return tuple(
+        name
+        for name, modules in _DECODER_MODULES.items()
+        if not modules or any(importlib.util.find_spec(module) for module in modules)
+    )
+
+
+def parse_encodings(value: str) -> tuple[str, ...]:
+    """Parse a comma-separated list of encodings, most preferred first.
+
+    Raises:
+        ValueError: If an encoding is not supported.
+    """
+    names = tuple(name.strip().lower() for name in value.split(",") if name.strip())
+    if any(name in _IDENTITY for name in names):
+        return ()
+    unknown = [name for name in names if name not in _DECODER_MODULES]
+    if unknown:
+        supported = ", ".join(_DECODER_MODULES)
+        raise ValueError(f"Unsupported encoding(s) {', '.join(unknown)}; use {supported} or none")
+    return names
+
+
+def accept_encoding(encodings: Iterable[str] = DEFAULT_ENCODINGS) -> str:
+    """Build an Accept-Encoding header value for the installed encodings.
+
+    Encodings are weighted in the order given; ones whose optional decoder
+    package (zstandard, brotli) is missing are left out. Without any,
+    `identity` asks for uncompressed responses.
+    """
+    available = available_encodings()
+    names = [name for name in dict.fromkeys(encodings) if name in available]
+    if not names:
+        return "identity"
+    return ", ".join(
+        name if i == 0 else f"{name};q={max(0.1, 1 - i / 10):.1f}" for i, name in enumerate(names)
+    )
+
+
+def wire_bytes(resp: httpx.Response, decoded: int) -> int:
+    """Return the body bytes a response took on the wire (before decoding).
+
+    Responses built from content rather than read from a stream (e.g. by
+    a mock transport) report no download; their decoded size is used.
+    """
+    return resp.num_bytes_downloaded or decoded
@@ -1,8 +1,12 @@
 """Configuration management for Scanopy MCP."""
 
 import os
+from collections.abc import Mapping
 from dataclasses import dataclass
 
+from scanopy_mcp.compression import DEFAULT_ENCODINGS, parse_encodings
+from scanopy_mcp.deadlines import parse_timeouts
+
 
 @dataclass(frozen=True)
 class Config:
@@ -11,6 +15,44 @@ class Config:
     base_url: str
     api_key: str
     confirm_string: str
+    metrics_file: str | None = None
+    metrics_interval_s: float = 15.0
+    trace_file: str | None = None
+    profile_dir: str = "profiles"
+    profile_next: int | None = None
+    profile_tool: str | None = None
+    batch_concurrency: int = 8
+    discovery_poll_min_s: float = 2.0
+    discovery_poll_max_s: float = 30.0
+    mirror_path: str | None = None
+    mirror_max_age_s: float = 300.0
+    cache_ttl_s: float = 0.0
+    search_memory_mb: float = 32.0
+    snapshot_dir: str | None = None
+    tenants_file: str | None = None
+    tenant: str = "default"
+    transport: str = "stdio"
+    http_host: str = "127.0.0.1"
+    http_port: int = 8765
+    http_token: str | None = None
+    http_workers: int = 1
+    compact_schemas: bool = False
+    schema_slim: bool = False
+    schema_max_depth: int = 3
+    schema_max_enum: int = 20
+    schema_keep_descriptions: bool = False
+    tool_tags: frozenset[str] | None = None
+    lazy_tools: bool = False
+    spec_streaming: bool = False
+    encodings: tuple[str, ...] = DEFAULT_ENCODINGS
+    stdio_concurrency: int = 8
+    timeout_s: float = 10.0
+    tool_timeouts: Mapping[str, float] | None = None
+    spec_timeout_s: float = 5.0
+    deadline_s: float = 0.0
+    retries: int = 0
+    hedge_reads: bool = False
+    write_dedup_s: float = 0.0
 
 
 def load_config() -> Config:
@@ -29,4 +71,135 @@ def load_config() -> Config:
     if not confirm_string or not confirm_string.strip():
         raise ValueError("SCANOPY_CONFIRM_STRING must be a non-empty string")
 
-    return Config(base_url=base_url.rstrip("/"), api_key=api_key, confirm_string=confirm_string)
+    metrics_file = os.getenv("SCANOPY_METRICS_FILE") or None
+    metrics_interval_s = float(os.getenv("SCANOPY_METRICS_INTERVAL", "15"))
+    if metrics_interval_s <= 0:
+        raise ValueError("SCANOPY_METRICS_INTERVAL must be positive")
+
+    trace_file = os.getenv("SCANOPY_TRACE_FILE") or None
+
+    profile_dir = os.getenv("SCANOPY_PROFILE_DIR") or "profiles"
+    profile_next = int(os.getenv("SCANOPY_PROFILE_NEXT", "0")) or None
+    profile_tool = os.getenv("SCANOPY_PROFILE_TOOL") or None
+
+    batch_concurrency = int(os.getenv("SCANOPY_BATCH_CONCURRENCY", "8"))
+    if batch_concurrency <= 0:
+        raise ValueError("SCANOPY_BATCH_CONCURRENCY must be positive")
+
+    discovery_poll_min_s = float(os.getenv("SCANOPY_DISCOVERY_POLL_MIN", "2"))
+    discovery_poll_max_s = float(os.getenv("SCANOPY_DISCOVERY_POLL_MAX", "30"))
+    if not 0 < discovery_poll_min_s <= discovery_poll_max_s:
+        raise ValueError(
+            "SCANOPY_DISCOVERY_POLL_MIN must be positive and not above SCANOPY_DISCOVERY_POLL_MAX"
+        )
+
+    mirror_path = os.getenv("SCANOPY_MIRROR_PATH") or None
+    mirror_max_age_s = float(os.getenv("SCANOPY_MIRROR_MAX_AGE", "300"))
+
+    cache_ttl_s = float(os.getenv("SCANOPY_CACHE_TTL", "0"))
+    if cache_ttl_s < 0:
+        raise ValueError("SCANOPY_CACHE_TTL must not be negative")
+    search_memory_mb = float(os.getenv("SCANOPY_SEARCH_MEMORY_MB", "32"))
+    if search_memory_mb < 0:
+        raise ValueError("SCANOPY_SEARCH_MEMORY_MB must not be negative")
+
+    snapshot_dir = os.getenv("SCANOPY_SNAPSHOT_DIR") or None
+    tenants_file = os.getenv("SCANOPY_TENANTS_FILE") or None
+    tenant = os.getenv("SCANOPY_TENANT") or "default"
+
+    transport = (os.getenv("SCANOPY_TRANSPORT") or "stdio").lower()
+    if transport not in {"stdio", "http"}:
+        raise ValueError("SCANOPY_TRANSPORT must be 'stdio' or 'http'")
+    http_host = os.getenv("SCANOPY_HTTP_HOST") or "127.0.0.1"
+    http_port = int(os.getenv("SCANOPY_HTTP_PORT", "8765"))
+    if not 0 <= http_port <= 65535:
+        raise ValueError("SCANOPY_HTTP_PORT must be between 0 and 65535")
+    http_token = os.getenv("SCANOPY_HTTP_TOKEN") or None
+    compact_schemas = _env_flag("SCANOPY_COMPACT_SCHEMAS")
+    schema_slim = _env_flag("SCANOPY_SCHEMA_SLIM")
+    schema_max_depth = int(os.getenv("SCANOPY_SCHEMA_MAX_DEPTH", "3"))
+    schema_max_enum = int(os.getenv("SCANOPY_SCHEMA_MAX_ENUM", "20"))
+    if schema_max_depth < 0 or schema_max_enum < 0:
+        raise ValueError(
+            "SCANOPY_SCHEMA_MAX_DEPTH and SCANOPY_SCHEMA_MAX_ENUM must not be negative"
+        )
+    schema_keep_descriptions = _env_flag("SCANOPY_SCHEMA_KEEP_DESCRIPTIONS")
+    lazy_tools = _env_flag("SCANOPY_LAZY_TOOLS")
+    spec_streaming = _env_flag("SCANOPY_SPEC_STREAMING")
+    encodings = parse_encodings(os.getenv("SCANOPY_COMPRESSION") or ",".join(DEFAULT_ENCODINGS))
+    tool_tags = frozenset(
+        tag.strip() for tag in os.getenv("SCANOPY_TOOL_TAGS", "").split(",") if tag.strip()
+    )
+
+    timeout_s = float(os.getenv("SCANOPY_TIMEOUT", "10"))
+    spec_timeout_s = float(os.getenv("SCANOPY_SPEC_TIMEOUT", "5"))
+    if timeout_s <= 0 or spec_timeout_s <= 0:
+        raise ValueError("SCANOPY_TIMEOUT and SCANOPY_SPEC_TIMEOUT must be positive")
+    tool_timeouts = parse_timeouts(os.getenv("SCANOPY_TOOL_TIMEOUTS", ""))
+    deadline_s = float(os.getenv("SCANOPY_DEADLINE", "0"))
+    if deadline_s < 0:
+        raise ValueError("SCANOPY_DEADLINE must not be negative")
+    retries = int(os.getenv("SCANOPY_RETRIES", "0"))
+    if retries < 0:
+        raise ValueError("SCANOPY_RETRIES must not be negative")
+    hedge_reads = _env_flag("SCANOPY_HEDGE_READS")
+    write_dedup_s = float(os.getenv("SCANOPY_WRITE_DEDUP_TTL", "0"))
+    if write_dedup_s < 0:
+        raise ValueError("SCANOPY_WRITE_DEDUP_TTL must not be negative")
+
+    stdio_concurrency = int(os.getenv("SCANOPY_STDIO_CONCURRENCY", "8"))
+    if stdio_concurrency < 1:
+        raise ValueError("SCANOPY_STDIO_CONCURRENCY must be at least 1")
+
+    http_workers = int(os.getenv("SCANOPY_HTTP_WORKERS", "1"))
+    if http_workers < 1:
+        raise ValueError("SCANOPY_HTTP_WORKERS must be at least 1")
+
+    return Config(
+        base_url=base_url.rstrip("/"),
+        api_key=api_key,
+        confirm_string=confirm_string,
+        metrics_file=metrics_file,
+        metrics_interval_s=metrics_interval_s,
+        trace_file=trace_file,
+        profile_dir=profile_dir,
+        profile_next=profile_next,
+        profile_tool=profile_tool,
+        batch_concurrency=batch_concurrency,
+        discovery_poll_min_s=discovery_poll_min_s,
+        discovery_poll_max_s=discovery_poll_max_s,
+        mirror_path=mirror_path,
+        mirror_max_age_s=mirror_max_age_s,
+        cache_ttl_s=cache_ttl_s,
+        search_memory_mb=search_memory_mb,
+        snapshot_dir=snapshot_dir,
+        tenants_file=tenants_file,
+        tenant=tenant,
+        transport=transport,
+        http_host=http_host,
+        http_port=http_port,
+        http_token=http_token,
+        http_workers=http_workers,
+        compact_schemas=compact_schemas,
+        schema_slim=schema_slim,
+        schema_max_depth=schema_max_depth,
+        schema_max_enum=schema_max_enum,
+        schema_keep_descriptions=schema_keep_descriptions,
+        tool_tags=tool_tags or None,
+        lazy_tools=lazy_tools,
+        spec_streaming=spec_streaming,
+        encodings=encodings,
+        stdio_concurrency=stdio_concurrency,
+        timeout_s=timeout_s,
+        tool_timeouts=tool_timeouts or None,
+        spec_timeout_s=spec_timeout_s,
+        deadline_s=deadline_s,
+        retries=retries,
+        hedge_reads=hedge_reads,
+        write_dedup_s=write_dedup_s,
+    )
+
+
+def _env_flag(name: str) -> bool:
+    """Return whether an environment variable is set to a true value."""
+    return os.getenv(name, "").lower() in {"1", "true", "yes"}
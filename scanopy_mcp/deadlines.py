@@ -0,0 +1,63 @@
+"""End-to-end deadlines and per-tool timeouts for upstream requests."""
+
+import contextlib
+import contextvars
+import time
+from collections.abc import Iterator
+
+# Absolute time.monotonic() by which the current request must finish
+_deadline: contextvars.ContextVar[float | None] = contextvars.ContextVar(
+    "scanopy_deadline", default=None
+)
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a request's deadline passes before an upstream attempt."""
+
+
+@contextlib.contextmanager
+def deadline(seconds: float | None) -> Iterator[None]:
+    """Bound the work in the block to `seconds` from now.
+
+    Deadlines nest: an inner deadline never extends an outer one, so calls
+    made on behalf of a request (batch entries, retries, hedges) share its
+    budget. The deadline is seen by threads started from a copy of the
+    context. None or a non-positive value leaves the current deadline as is.
+    """
+    if not seconds or seconds <= 0:
+        yield
+        return
+    until = time.monotonic() + seconds
+    outer = _deadline.get()
+    reset = _deadline.set(until if outer is None else min(outer, until))
+    try:
+        yield
+    finally:
+        _deadline.reset(reset)
+
+
+def remaining() -> float | None:
+    """Return seconds left until the current deadline, or None without one."""
+    until = _deadline.get()
+    return None if until is None else until - time.monotonic()
+
+
+def parse_timeouts(value: str) -> dict[str, float]:
+    """Parse per-tool timeouts given as `tool=seconds` pairs, comma-separated.
+
+    Raises:
+        ValueError: If a pair is malformed or a timeout is not positive.
+    """
+    timeouts = {}
+    for pair in value.split(","):
+        if not pair.strip():
+            continue
+        name, sep, seconds = pair.partition("=")
+        try:
+            timeout = float(seconds) if sep and name.strip() else 0.0
+        except ValueError:
+            timeout = 0.0
+        if timeout <= 0:
+            raise ValueError(f"Invalid tool timeout {pair.strip()!r}; use tool=seconds")
+        timeouts[name.strip()] = timeout
+    return timeouts
@@ -0,0 +1,282 @@
+"""Shared polling of discovery status with MCP progress notifications."""
+
+import threading
+import time
+from collections.abc import Callable
+from typing import Any
+
+# Tools involved in discovery tracking
+CREATE_DISCOVERY_TOOL = "create_discovery"
+CANCEL_DISCOVERY_TOOL = "cancel_discovery"
+LIST_DISCOVERIES_TOOL = "list_discoveries"
+
+# Phases (lower-cased) after which a discovery is no longer polled
+TERMINAL_PHASES = {"complete", "completed", "finished", "failed", "error", "cancelled", "canceled"}
+
+# Consecutive poll failures after which tracking is abandoned
+MAX_POLL_FAILURES = 5
+
+
+def extract_id(result: Any) -> str | None:
+    """Return the entity id from a Scanopy response (bare or wrapped in 'data')."""
+    if isinstance(result, dict):
+        data = result.get("data", result)
+        if isinstance(data, dict) and data.get("id") is not None:
+            return str(data["id"])
+    return None
+
+
+def discovery_state(item: dict) -> tuple[str | None, float | None, float | None]:
+    """Return (phase, processed, total) from a discovery list entry.
+
+    Scanopy reports progress under slightly different keys depending on the
+    discovery type, so the first present key of each kind is used.
+    """
+    phase = None
+    for key in ("phase", "status", "state"):
+        value = item.get(key)
+        if isinstance(value, dict):
+            value = value.get("type") or value.get("phase")
+        if value:
+            phase = str(value)
+            break
+    processed = next(
+        (item[k] for k in ("progress", "processed") if isinstance(item.get(k), (int, float))),
+        None,
+    )
+    total = next(
+        (item[k] for k in ("total", "total_to_process") if isinstance(item.get(k), (int, float))),
+        None,
+    )
+    return phase, processed, total
+
+
+class _Tracked:
+    """Polling state for one discovery."""
+
+    __slots__ = (
+        "discovery_id",
+        "token",
+        "notify",
+        "interval",
+        "next_poll",
+        "last_state",
+        "progress",
+        "session_id",
+    )
+
+    def __init__(self, discovery_id: str, token, notify, interval: float, now: float):
+        self.discovery_id = discovery_id
+        self.token = token
+        self.notify = notify
+        self.interval = interval
+        self.next_poll = now + interval
+        self.last_state = None
+        self.progress = 0.0
+        self.session_id: str | None = None
+
+
+class DiscoveryTracker:
+    """Poll discovery status for many discoveries from one scheduler thread.
+
+    Each tick issues a single list call that serves every discovery due for a
+    poll. Discoveries back off exponentially while their state is unchanged
+    and snap back to the minimum interval when it changes.
+    """
+
+    def __init__(
+        self,
+        poll: Callable[[], Any],
+        min_interval_s: float = 2.0,
+        max_interval_s: float = 30.0,
+        backoff: float = 1.5,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the tracker.
+
+        Args:
+            poll: Callable returning the list_discoveries response.
+            min_interval_s: First and post-change polling interval.
+            max_interval_s: Upper bound for the backed-off interval.
+            backoff: Interval multiplier applied while nothing changes.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self._poll = poll
+        self.min_interval_s = min_interval_s
+        self.max_interval_s = max_interval_s
+        self.backoff = backoff
+        self._clock = clock
+        self._tracked: dict[str, _Tracked] = {}
+        self._failures = 0
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self._stopped = False
+
+    @property
+    def active(self) -> list[str]:
+        """Ids of discoveries currently being tracked."""
+        with self._cond:
+            return list(self._tracked)
+
+    def track(
+        self, discovery_id: str, progress_token: Any, notify: Callable[[dict], None]
+    ) -> None:
+        """Start polling a discovery and report progress via notify.
+
+        Args:
+            discovery_id: Id of the discovery returned by create_discovery.
+            progress_token: Client-supplied MCP progress token.
+            notify: Callable that delivers a JSON-RPC notification message.
+        """
+        entry = _Tracked(discovery_id, progress_token, notify, self.min_interval_s, self._clock())
+        with self._cond:
+            self._tracked[discovery_id] = entry
+            self._cond.notify_all()
+        self._send(entry, f"Discovery {discovery_id} started", final=False)
+        self._ensure_thread()
+
+    def cancel(self, discovery_id: str) -> bool:
+        """Stop tracking a discovery (by discovery or session id) after cancellation.
+
+        Returns:
+            True if a tracked discovery matched.
+        """
+        with self._cond:
+            entry = self._tracked.pop(discovery_id, None)
+            if entry is None:
+                for key, tracked in list(self._tracked.items()):
+                    if tracked.session_id == discovery_id:
+                        entry = self._tracked.pop(key)
+                        break
+            self._cond.notify_all()
+        if entry is None:
+            return False
+        self._send(entry, f"Discovery {entry.discovery_id} cancelled", final=True)
+        return True
+
+    def poll_once(self) -> float | None:
+        """Run one scheduler tick.
+
+        Returns:
+            Seconds until the next discovery is due, or None if none are tracked.
+        """
+        now = self._clock()
+        with self._cond:
+            due = [t for t in self._tracked.values() if t.next_poll <= now]
+        if due:
+            try:
+                response = self._poll()
+            except Exception as e:
+                self._on_poll_failure(due, e)
+            else:
+                self._failures = 0
+                self._apply(due, response)
+
+        with self._cond:
+            if not self._tracked:
+                return None
+            return max(0.0, min(t.next_poll for t in self._tracked.values()) - self._clock())
+
+    def _apply(self, due: list[_Tracked], response: Any) -> None:
+        """Update due discoveries from one list response."""
+        items = response.get("data", response) if isinstance(response, dict) else response
+        by_id = {}
+        if isinstance(items, list):
+            by_id = {str(i.get("id")): i for i in items if isinstance(i, dict)}
+
+        now = self._clock()
+        for tracked in due:
+            with self._cond:
+                if self._tracked.get(tracked.discovery_id) is not tracked:
+                    # Cancelled while the poll was in flight
+                    continue
+            item = by_id.get(tracked.discovery_id)
+            if item is None:
+                self._finish(tracked, f"Discovery {tracked.discovery_id} is no longer listed")
+                continue
+
+            if item.get("session_id"):
+                tracked.session_id = str(item["session_id"])
+            phase, processed, total = discovery_state(item)
+            state = (phase, processed, total)
+            if state != tracked.last_state:
+                tracked.last_state = state
+                tracked.interval = self.min_interval_s
+                message = f"Discovery {tracked.discovery_id}: {phase or 'running'}"
+                if phase and phase.lower() in TERMINAL_PHASES:
+                    self._finish(tracked, message, total=total)
+                    continue
+                progress = float(processed) if processed is not None else tracked.progress + 1
+                if progress > tracked.progress:
+                    # MCP progress must increase with every notification
+                    tracked.progress = progress
+                    self._send(tracked, message, final=False, total=total)
+            else:
+                tracked.interval = min(tracked.interval * self.backoff, self.max_interval_s)
+            tracked.next_poll = now + tracked.interval
+
+    def _on_poll_failure(self, due: list[_Tracked], error: Exception) -> None:
+        """Back off after a failed poll and give up after repeated failures."""
+        self._failures += 1
+        now = self._clock()
+        for tracked in due:
+            if self._failures >= MAX_POLL_FAILURES:
+                self._finish(tracked, f"Discovery status unavailable: {error}")
+            else:
+                tracked.interval = min(tracked.interval * self.backoff, self.max_interval_s)
+                tracked.next_poll = now + tracked.interval
+
+    def _finish(self, tracked: _Tracked, message: str, total: float | None = None) -> None:
+        """Send the final notification and stop tracking."""
+        with self._cond:
+            if self._tracked.get(tracked.discovery_id) is not tracked:
+                return
+            del self._tracked[tracked.discovery_id]
+        self._send(tracked, message, final=True, total=total)
+
+    def _send(
+        self, tracked: _Tracked, message: str, final: bool, total: float | None = None
+    ) -> None:
+        """Emit a notifications/progress message for a discovery."""
+        if final:
+            if total is not None and total > tracked.progress:
+                tracked.progress = float(total)
+            else:
+                tracked.progress += 1
+        params = {"progressToken": tracked.token, "progress": tracked.progress, "message": message}
+        if total is not None:
+            params["total"] = total
+        try:
+            tracked.notify({"jsonrpc": "2.0", "method": "notifications/progress", "params": params})
+        except Exception:
+            # A client that went away must not break polling for the others
+            pass
+
+    def _ensure_thread(self) -> None:
+        """Start the scheduler thread on first use."""
+        with self._cond:
+            if self._thread is not None or self._stopped:
+                return
+            self._thread = threading.Thread(
+                target=self._run, name="discovery-tracker", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            wait = self.poll_once()
+            with self._cond:
+                if self._stopped:
+                    return
+                self._cond.wait(timeout=wait)
+                if self._stopped:
+                    return
+
+    def stop(self) -> None:
+        """Stop the scheduler thread."""
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
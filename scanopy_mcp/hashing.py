@@ -0,0 +1,17 @@
+"""Stable content hashing for JSON-compatible data."""
+
+import hashlib
+import json
+from typing import Any
+
+
+def canonical_json(value: Any) -> bytes:
+    """Serialize a value to canonical JSON bytes (sorted keys, no whitespace)."""
+    return json.dumps(
+        value, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode()
+
+
+def content_hash(value: Any) -> str:
+    """Return a short hex digest identifying a value's content."""
+    return hashlib.blake2b(canonical_json(value), digest_size=16).hexdigest()
@@ -0,0 +1,590 @@
+"""Streamable HTTP transport for the MCP protocol."""
+
+import contextvars
+import hashlib
+import hmac
+import json
+import secrets
+import socket
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Callable, Hashable
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.stdio_server import MCPStdioServer
+
+# Path of the single MCP endpoint
+MCP_PATH = "/mcp"
+
+# Header carrying the session id assigned by initialize
+SESSION_HEADER = "Mcp-Session-Id"
+
+# Header naming the tenant a session is bound to at initialize (default: SCANOPY_TENANT)
+TENANT_HEADER = "Scanopy-Tenant"
+
+# Notifications buffered per session while no GET stream is open
+MAX_PENDING_NOTIFICATIONS = 1000
+
+# Seconds between SSE keep-alive comments on an idle GET stream
+SSE_KEEPALIVE_S = 15.0
+
+# Sessions without any request or open stream for this long are dropped
+SESSION_IDLE_TIMEOUT_S = 3600.0
+
+# Deleted session ids remembered per worker in worker mode
+MAX_DROPPED_SESSIONS = 10000
+
+# Largest accepted POST body
+MAX_BODY_BYTES = 4 << 20
+
+_LOOPBACK_HOSTS = {"localhost", "127.0.0.1", "::1"}
+
+# Session of the request being handled, for request-scoped notifications
+_current_session: contextvars.ContextVar["_Session | None"] = contextvars.ContextVar(
+    "scanopy_mcp_http_session", default=None
+)
+
+
+class _Session:
+    """One MCP client session, its tenant and its server-to-client notification queue."""
+
+    __slots__ = ("session_id", "tenant", "pending", "cond", "closed", "stream_owner", "last_seen")
+
+    def __init__(self, session_id: str, tenant: str):
+        self.session_id = session_id
+        self.tenant = tenant
+        self.pending: deque[dict] = deque(maxlen=MAX_PENDING_NOTIFICATIONS)
+        self.cond = threading.Condition()
+        self.closed = False
+        self.stream_owner: object | None = None
+        self.last_seen = time.monotonic()
+
+    def push(self, message: dict) -> None:
+        """Queue a notification for the session's GET stream."""
+        with self.cond:
+            if not self.closed:
+                self.pending.append(message)
+                self.cond.notify_all()
+
+    def close(self) -> None:
+        """End the session and wake its stream."""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+
+class MCPHTTPServer(MCPStdioServer):
+    """Serve MCP over streamable HTTP to many clients with one shared runtime.
+
+    Every client goes through the same handle_request dispatch, so tenants,
+    registries, response caches and upstream connection pools are shared.
+    Responses are returned as JSON on the POST; notifications (progress,
+    tools/list_changed) are delivered on the session's GET event stream.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        openapi_url: str,
+        allowlist: set[str],
+        openapi_spec: dict | None = None,
+        host: str | None = None,
+        port: int | None = None,
+        catalogs: dict[str, str] | None = None,
+        listen_socket: socket.socket | None = None,
+        session_secret: bytes | None = None,
+        relay: socket.socket | None = None,
+    ):
+        """Initialize the HTTP server.
+
+        Args:
+            config: Configuration for Scanopy API.
+            openapi_url: URL to fetch OpenAPI spec from.
+            allowlist: Set of write operation IDs that are allowed.
+            openapi_spec: Optional pre-loaded OpenAPI spec (for testing).
+            host: Bind address (default: config.http_host).
+            port: Bind port, 0 for any free port (default: config.http_port).
+            catalogs: Optional tenant name -> compiled catalog file.
+            listen_socket: Already listening socket to accept on (worker mode).
+            session_secret: Key for signed session ids that any worker sharing
+                the key accepts (worker mode).
+            relay: Socket to the worker supervisor that fans notifications,
+                session drops and cancels out to the other workers (worker mode).
+        """
+        super().__init__(
+            config, openapi_url, allowlist, openapi_spec=openapi_spec, catalogs=catalogs
+        )
+        self.host = host if host is not None else config.http_host
+        self.port = port if port is not None else config.http_port
+        self._sessions: dict[str, _Session] = {}
+        self._sessions_lock = threading.Lock()
+        self._httpd: ThreadingHTTPServer | None = None
+        self._listen_socket = listen_socket
+        self._session_secret = session_secret
+        self._relay = relay
+        self._relay_lock = threading.Lock()
+        # Deleted signed ids, so other workers do not adopt them again
+        self._dropped: OrderedDict[str, None] = OrderedDict()
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Bound (host, port); the port is known once bind() ran."""
+        if self._httpd is None:
+            return self.host, self.port
+        return self._httpd.server_address[:2]
+
+    def bind(self) -> ThreadingHTTPServer:
+        """Create the listening socket."""
+        if self._httpd is None:
+            if self._listen_socket is None:
+                self._httpd = ThreadingHTTPServer((self.host, self.port), _handler_class(self))
+            else:
+                address = self._listen_socket.getsockname()[:2]
+                self._httpd = ThreadingHTTPServer(
+                    address, _handler_class(self), bind_and_activate=False
+                )
+                self._httpd.socket.close()
+                self._httpd.socket = self._listen_socket
+                self._httpd.server_address = address
+            self._httpd.daemon_threads = True
+        return self._httpd
+
+    def run(self) -> None:
+        """Serve HTTP requests until shutdown() is called."""
+        httpd = self.bind()
+        if self._relay is not None:
+            threading.Thread(target=self._read_relay, name="mcp-relay", daemon=True).start()
+        with self._background():
+            try:
+                httpd.serve_forever()
+            finally:
+                self._close_sessions()
+                httpd.server_close()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() from another thread."""
+        self._close_sessions()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+
+    def _notifier(self) -> Callable[[dict], None]:
+        """Deliver request-scoped notifications to the requesting session."""
+        session = _current_session.get()
+        if session is None:
+            return self._write
+        if self._relay is not None:
+            session_id = session.session_id
+            return lambda message: self._send_relay({"session": session_id, "message": message})
+        return session.push
+
+    def _request_key(self, req_id: int | str) -> Hashable:
+        """Key an in-flight request by session and JSON-RPC id.
+
+        Ids are only unique per client, so a cancel from one session never
+        reaches another session's request.
+        """
+        session = _current_session.get()
+        return (session.session_id if session is not None else None, req_id)
+
+    def _tenant(self) -> str:
+        """Return the tenant the requesting session is bound to."""
+        session = _current_session.get()
+        return session.tenant if session is not None else self.config.tenant
+
+    def _tools_changed(self, tenant: str) -> None:
+        """Tell the sessions bound to a tenant that a refreshed spec changed its tools."""
+        message = {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}
+        if self._relay is not None:
+            self._send_relay({"session": None, "tenant": tenant, "message": message})
+        else:
+            self._deliver(None, message, tenant=tenant)
+
+    def request_tenant(self, session: _Session | None, tenant: str | None) -> str:
+        """Return the tenant a request is served from.
+
+        A session keeps the tenant it was bound to at initialize; a request
+        without a session is served from the tenant in its header, or the
+        configured one.
+
+        Args:
+            session: The request's session, if any.
+            tenant: Value of the tenant header, if sent.
+
+        Raises:
+            ValueError: If the tenant is unknown or differs from the session's.
+        """
+        if tenant and tenant not in self.tenants:
+            raise ValueError(f"Unknown tenant: {tenant}")
+        if session is None:
+            return tenant or self.config.tenant
+        if tenant and tenant != session.tenant:
+            raise ValueError(f"Session is bound to tenant {session.tenant}, not {tenant}")
+        return session.tenant
+
+    def _handle_cancelled(self, params: dict) -> None:
+        """Abort the named request, asking the other workers if it is not ours.
+
+        In worker mode the request may be in flight on any worker, since each
+        POST goes to whichever worker accepts its connection.
+        """
+        request_id = params.get("requestId")
+        if request_id is None:
+            return
+        key = self._request_key(request_id)
+        if not self._inflight.cancel(key, params.get("reason")) and self._relay is not None:
+            self._send_relay({"cancel": list(key), "reason": params.get("reason")})
+
+    def _write(self, message: dict) -> None:
+        """Broadcast a server-initiated notification to every session."""
+        if self._relay is not None:
+            self._send_relay({"session": None, "message": message})
+        else:
+            self._deliver(None, message)
+
+    def _deliver(self, session_id: str | None, message: dict, tenant: str | None = None) -> None:
+        """Queue a notification for one session, or for all when session_id is None.
+
+        With a tenant, a broadcast only reaches the sessions bound to it.
+        """
+        with self._sessions_lock:
+            if session_id is None:
+                sessions = [
+                    s for s in self._sessions.values() if tenant is None or s.tenant == tenant
+                ]
+            else:
+                sessions = [self._sessions[session_id]] if session_id in self._sessions else []
+        for session in sessions:
+            session.push(message)
+
+    def _send_relay(self, envelope: dict) -> None:
+        """Hand an envelope to the supervisor, which echoes it to every worker."""
+        line = json.dumps(envelope).encode() + b"\n"
+        try:
+            with self._relay_lock:
+                self._relay.sendall(line)
+        except OSError:
+            # Supervisor gone; deliver locally at least (drops and cancels
+            # were already applied here)
+            if "drop" not in envelope and "cancel" not in envelope:
+                self._deliver(envelope["session"], envelope["message"], envelope.get("tenant"))
+
+    def _read_relay(self) -> None:
+        """Apply notifications, session drops and cancels relayed from any worker."""
+        with self._relay.makefile("rb") as lines:
+            for line in lines:
+                try:
+                    envelope = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if envelope.get("drop"):
+                    self._drop_local(envelope["drop"])
+                elif envelope.get("cancel"):
+                    self._inflight.cancel(tuple(envelope["cancel"]), envelope.get("reason"))
+                else:
+                    self._deliver(
+                        envelope.get("session"), envelope.get("message"), envelope.get("tenant")
+                    )
+
+    def _close_sessions(self) -> None:
+        with self._sessions_lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _session_id(self, tenant: str) -> str:
+        """Return a new session id, signed when workers share a session secret.
+
+        Signed ids carry the session's tenant, so the worker adopting the
+        session serves it from the same tenant.
+        """
+        token = secrets.token_hex(16)
+        if self._session_secret is None:
+            return token
+        return f"{token}.{tenant}.{self._sign(f'{token}.{tenant}')}"
+
+    def _sign(self, token: str) -> str:
+        return hmac.new(self._session_secret, token.encode(), hashlib.sha256).hexdigest()[:32]
+
+    def _new_session(self, tenant: str) -> _Session:
+        session = _Session(self._session_id(tenant), tenant)
+        cutoff = time.monotonic() - SESSION_IDLE_TIMEOUT_S
+        with self._sessions_lock:
+            # Clients that vanished without DELETE would otherwise leak sessions
+            idle = [s for s in self._sessions.values() if s.last_seen < cutoff]
+            for stale in idle:
+                del self._sessions[stale.session_id]
+            self._sessions[session.session_id] = session
+        for stale in idle:
+            stale.close()
+        return session
+
+    def _get_session(self, session_id: str | None) -> _Session | None:
+        if not session_id:
+            return None
+        with self._sessions_lock:
+            session = self._sessions.get(session_id)
+            adoptable = session_id not in self._dropped
+            if session is None and self._session_secret is not None and adoptable:
+                # Initialized by another worker: adopt it if the signature holds
+                signed, _, signature = session_id.rpartition(".")
+                _, _, tenant = signed.partition(".")
+                if (
+                    tenant in self.tenants
+                    and signature
+                    and hmac.compare_digest(signature, self._sign(signed))
+                ):
+                    session = self._sessions[session_id] = _Session(session_id, tenant)
+        if session is not None:
+            session.last_seen = time.monotonic()
+        return session
+
+    def _drop_session(self, session_id: str) -> bool:
+        session = self._get_session(session_id)
+        if session is None:
+            return False
+        self._drop_local(session_id)
+        if self._relay is not None:
+            self._send_relay({"drop": session_id})
+        return True
+
+    def _drop_local(self, session_id: str) -> None:
+        with self._sessions_lock:
+            session = self._sessions.pop(session_id, None)
+            if self._session_secret is not None:
+                self._dropped[session_id] = None
+                while len(self._dropped) > MAX_DROPPED_SESSIONS:
+                    self._dropped.popitem(last=False)
+        if session is not None:
+            session.close()
+
+    def handle_post(
+        self,
+        body: bytes,
+        session_id: str | None,
+        traceparent: str | None = None,
+        tenant: str | None = None,
+    ) -> tuple[int, object | None, str | None]:
+        """Process one POSTed JSON-RPC message or batch.
+
+        Args:
+            body: Request body.
+            session_id: Value of the session header, if sent.
+            traceparent: W3C trace context of the caller, if sent.
+            tenant: Value of the tenant header, if sent. At initialize it binds
+                the new session to the tenant; later it must name the same one.
+
+        Returns:
+            (HTTP status, JSON payload or None, session id to announce or None).
+        """
+        try:
+            payload = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            error = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32700, "message": "Parse error"},
+            }
+            return HTTPStatus.BAD_REQUEST, error, None
+
+        batch = isinstance(payload, list)
+        messages = payload if batch else [payload]
+        if not messages or not all(isinstance(m, dict) for m in messages):
+            error = {
+                "jsonrpc": "2.0",
+                "id": None,
+                "error": {"code": -32600, "message": "Invalid Request"},
+            }
+            return HTTPStatus.BAD_REQUEST, error, None
+
+        initializing = any(m.get("method") == "initialize" for m in messages)
+        session = self._get_session(session_id)
+        if not initializing:
+            if not session_id:
+                error = {"error": f"Missing {SESSION_HEADER} header"}
+                return HTTPStatus.BAD_REQUEST, error, None
+            if session is None:
+                return HTTPStatus.NOT_FOUND, {"error": "Unknown session"}, None
+        try:
+            bound = self.request_tenant(session, tenant)
+        except ValueError as e:
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}, None
+        new_session = None
+        if initializing:
+            session = new_session = self._new_session(bound)
+
+        responses = []
+        token = _current_session.set(session)
+        try:
+            with self.tracer.span("mcp.http.request", traceparent=traceparent):
+                for message in messages:
+                    # Responses to server requests carry no method and need no reply
+                    if "method" not in message:
+                        continue
+                    response = self.handle_request(message)
+                    if response is not None and message.get("id") is not None:
+                        responses.append(response)
+        finally:
+            _current_session.reset(token)
+
+        announced = new_session.session_id if new_session is not None else None
+        if not responses:
+            return HTTPStatus.ACCEPTED, None, announced
+        return HTTPStatus.OK, responses if batch else responses[0], announced
+
+    def stream(self, session: _Session, send: Callable[[bytes], None]) -> None:
+        """Pump a session's notifications into an event stream until it ends.
+
+        A newer GET stream for the same session takes over from this one.
+        """
+        owner = object()
+        with session.cond:
+            session.stream_owner = owner
+            session.cond.notify_all()
+        while True:
+            with session.cond:
+                if not session.pending and not session.closed and session.stream_owner is owner:
+                    session.cond.wait(timeout=SSE_KEEPALIVE_S)
+                if session.closed or session.stream_owner is not owner:
+                    return
+                messages = list(session.pending)
+                session.pending.clear()
+                session.last_seen = time.monotonic()
+            if messages:
+                chunk = "".join(f"event: message\ndata: {json.dumps(m)}\n\n" for m in messages)
+            else:
+                chunk = ": keep-alive\n\n"
+            send(chunk.encode())
+
+    def origin_allowed(self, origin: str | None) -> bool:
+        """Reject cross-site browser requests (DNS rebinding) from foreign origins."""
+        if not origin:
+            return True
+        host = urlsplit(origin).hostname
+        return host in _LOOPBACK_HOSTS or host == self.host
+
+    def authorized(self, header: str | None, tenant: str | None = None) -> bool:
+        """Check the bearer token when the tenant has one.
+
+        Tenants take their token from the tenants file, or SCANOPY_HTTP_TOKEN.
+        """
+        settings = self.tenants.get(tenant or self.config.tenant)
+        expected = settings.http_token if settings is not None else self.config.http_token
+        if not expected:
+            return True
+        return hmac.compare_digest(header or "", f"Bearer {expected}")
+
+
+def _handler_class(server: MCPHTTPServer) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler class bound to one MCPHTTPServer."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        server_version = "scanopy-mcp-server"
+
+        def log_message(self, format, *args):  # noqa: A002
+            # Keep stdout/stderr quiet like the stdio transport
+            pass
+
+        def _check(self) -> bool:
+            if urlsplit(self.path).path != MCP_PATH:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Not found"})
+                return False
+            if not server.origin_allowed(self.headers.get("Origin")):
+                self._send_json(HTTPStatus.FORBIDDEN, {"error": "Origin not allowed"})
+                return False
+            # The session's tenant decides which token applies; without a
+            # session, the tenant the request names
+            session = server._get_session(self.headers.get(SESSION_HEADER))
+            if session is not None:
+                tenant = session.tenant
+            else:
+                tenant = self.headers.get(TENANT_HEADER)
+            if not server.authorized(self.headers.get("Authorization"), tenant):
+                self._send_json(HTTPStatus.UNAUTHORIZED, {"error": "Unauthorized"})
+                return False
+            return True
+
+        def _session(self) -> _Session | None:
+            """Return the request's session, answering 404 or 400 when it is unusable."""
+            session = server._get_session(self.headers.get(SESSION_HEADER))
+            if session is None:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Unknown session"})
+                return None
+            try:
+                server.request_tenant(session, self.headers.get(TENANT_HEADER))
+            except ValueError as e:
+                self._send_json(HTTPStatus.BAD_REQUEST, {"error": str(e)})
+                return None
+            return session
+
+        def _send_json(
+            self, status: int, payload: object | None, session_id: str | None = None
+        ) -> None:
+            body = json.dumps(payload).encode() if payload is not None else b""
+            self.send_response(status)
+            if payload is not None:
+                self.send_header("Content-Type", "application/json")
+            if session_id:
+                self.send_header(SESSION_HEADER, session_id)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_POST(self):
+            if not self._check():
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length > MAX_BODY_BYTES:
+                self._send_json(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Body too large"})
+                return
+            status, payload, session_id = server.handle_post(
+                self.rfile.read(length),
+                self.headers.get(SESSION_HEADER),
+                traceparent=self.headers.get("traceparent"),
+                tenant=self.headers.get(TENANT_HEADER),
+            )
+            self._send_json(status, payload, session_id)
+
+        def do_GET(self):
+            if not self._check():
+                return
+            if "text/event-stream" not in (self.headers.get("Accept") or ""):
+                self._send_json(HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Expected event stream"})
+                return
+            session = self._session()
+            if session is None:
+                return
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+
+            def send(chunk: bytes) -> None:
+                self.wfile.write(chunk)
+                self.wfile.flush()
+
+            try:
+                send(b": stream open\n\n")
+                server.stream(session, send)
+            except (BrokenPipeError, ConnectionResetError):
+                pass
+
+        def do_DELETE(self):
+            if not self._check():
+                return
+            session = self._session()
+            if session is None:
+                return
+            if server._drop_session(session.session_id):
+                self._send_json(HTTPStatus.NO_CONTENT, None)
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {"error": "Unknown session"})
+
+    return Handler
@@ -0,0 +1,161 @@
+"""Idempotency keys and a short-lived ledger of completed writes."""
+
+import contextlib
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from typing import Any
+
+from scanopy_mcp.cancellation import current_token
+from scanopy_mcp.deadlines import DeadlineExceededError, remaining
+from scanopy_mcp.hashing import content_hash
+from scanopy_mcp.metrics import Metrics
+
+# Request header carrying the key of a write
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+# Key of the write being sent (set by idempotent())
+_current_key: contextvars.ContextVar[str | None] = contextvars.ContextVar(
+    "scanopy_idempotency_key", default=None
+)
+
+# Seconds between cancel checks while a replay waits for its write
+REPLAY_POLL_S = 0.05
+
+
+def idempotency_key(tool: str, args: dict) -> str:
+    """Derive a write's key from its tool name and arguments.
+
+    Arguments are hashed as canonical JSON, so key order does not matter.
+    """
+    return content_hash({"tool": tool, "args": args})
+
+
+def current_key() -> str | None:
+    """Return the idempotency key of the write being sent, if any."""
+    return _current_key.get()
+
+
+@contextlib.contextmanager
+def idempotent(key: str) -> Iterator[None]:
+    """Send upstream writes made inside the block with an idempotency key."""
+    reset = _current_key.set(key)
+    try:
+        yield
+    finally:
+        _current_key.reset(reset)
+
+
+class _Flight:
+    """A write in progress or recently completed."""
+
+    __slots__ = ("done", "result", "error", "expires_at")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+        self.expires_at = 0.0
+
+
+class WriteLedger:
+    """Record of recent writes by idempotency key, so replays are not resent.
+
+    A replay of a write that succeeded within the TTL returns the recorded
+    result. A replay arriving while the write is still in flight waits for
+    it, within its own deadline and until it is cancelled, and shares its
+    outcome. Failed writes are not recorded, so a later
+    replay is sent again, with the same key.
+
+    Replays count as hits and sent writes as misses in the `write_ledger`
+    cache metrics.
+    """
+
+    def __init__(
+        self,
+        ttl_s: float,
+        max_entries: int = 1024,
+        metrics: Metrics | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize the ledger.
+
+        Args:
+            ttl_s: Seconds a completed write is remembered.
+            max_entries: Maximum remembered writes; the oldest are dropped.
+            metrics: Optional metrics registry for replay counts.
+            clock: Monotonic time source (injectable for tests).
+        """
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._clock = clock
+        self._flights: OrderedDict[str, _Flight] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key: str, write: Callable[[], Any]) -> tuple[Any, bool]:
+        """Return the result of the write with this key, calling write() at most once.
+
+        Returns:
+            The result, and whether it is a replay of a write sent earlier.
+
+        Raises:
+            DeadlineExceededError: If a replay's deadline passes while it waits.
+            RequestCancelledError: If a replay is cancelled while it waits.
+            Exception: Whatever write() raised, also to replays waiting on it.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight.done.is_set() and flight.expires_at <= self._clock():
+                del self._flights[key]
+                flight = None
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                while len(self._flights) > self.max_entries:
+                    oldest = next(iter(self._flights.values()))
+                    if not oldest.done.is_set():
+                        break
+                    self._flights.popitem(last=False)
+        self.metrics.record_cache("write_ledger", hit=not leader)
+
+        if not leader:
+            _wait(flight)
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+
+        try:
+            flight.result = write()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            raise
+        finally:
+            flight.expires_at = self._clock() + self.ttl_s
+            flight.done.set()
+        return flight.result, False
+
+
+def _wait(flight: _Flight) -> None:
+    """Wait for a flight within the current deadline and cancel token.
+
+    Raises:
+        DeadlineExceededError: If the request deadline passes first.
+        RequestCancelledError: If the request is cancelled first.
+    """
+    token = current_token()
+    while not flight.done.is_set():
+        if token is not None:
+            token.raise_if_cancelled()
+        left = remaining()
+        if left is not None and left <= 0:
+            raise DeadlineExceededError("Request deadline exceeded")
+        if token is None and left is None:
+            flight.done.wait()
+        else:
+            flight.done.wait(REPLAY_POLL_S if left is None else min(left, REPLAY_POLL_S))
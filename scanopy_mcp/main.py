@@ -4,7 +4,9 @@ import dotenv
 
 from scanopy_mcp.allowlist import WRITE_ALLOWLIST
 from scanopy_mcp.config import load_config
+from scanopy_mcp.http_server import MCPHTTPServer
 from scanopy_mcp.stdio_server import MCPStdioServer
+from scanopy_mcp.workers import PreforkHTTPServer
 
 
 def main() -> None:
@@ -15,15 +17,21 @@ def main() -> None:
     # Load configuration from environment
     config = load_config()
 
-    # Create stdio server
+    # Create stdio or HTTP server
     openapi_url = f"{config.base_url}/openapi.json"
-    server = MCPStdioServer(
+    if config.transport != "http":
+        server_class = MCPStdioServer
+    elif config.http_workers > 1:
+        server_class = PreforkHTTPServer
+    else:
+        server_class = MCPHTTPServer
+    server = server_class(
         config=config,
         openapi_url=openapi_url,
         allowlist=WRITE_ALLOWLIST,
     )
 
-    # Run stdio server
+    # Run server
     server.run()
 
 
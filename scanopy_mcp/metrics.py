@@ -0,0 +1,359 @@
+"""In-process metrics for tool calls, caches and upstream traffic."""
+
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Latency histogram bucket upper bounds in seconds
+DEFAULT_BUCKETS = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+# Phases of a tool call that get their own latency histogram
+PHASES = ("validate", "upstream", "decode", "serialize", "total")
+
+# Tool whose call is currently being served (set by Metrics.tool)
+_current_tool: ContextVar[str | None] = ContextVar("scanopy_mcp_current_tool", default=None)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """Initialize the histogram.
+
+        Args:
+            buckets: Sorted bucket upper bounds in seconds.
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float | None:
+        """Estimate a quantile as the upper bound of the bucket containing it.
+
+        Returns:
+            Bucket upper bound in seconds, or None if nothing was observed.
+            Observations above the largest bucket report that bucket's bound.
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return self.buckets[-1]
+
+    def snapshot(self) -> dict:
+        """Return count, sum, cumulative buckets and estimated percentiles."""
+        cumulative = {}
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            cumulative[str(bound)] = seen
+        cumulative["+Inf"] = self.count
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": cumulative,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class _ToolStats:
+    """Counters and histograms for a single tool."""
+
+    __slots__ = ("calls", "errors", "bytes_in", "bytes_in_wire", "bytes_out", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_in_wire = 0
+        self.bytes_out = 0
+        self.latency: dict[str, Histogram] = {}
+
+
+class Metrics:
+    """Thread-safe registry of per-tool counters, latencies and cache stats."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        """Initialize an empty registry.
+
+        Args:
+            buckets: Bucket upper bounds used for every latency histogram.
+        """
+        self._buckets = buckets
+        self._lock = threading.Lock()
+        self._tools: dict[str, _ToolStats] = {}
+        self._caches: dict[str, list[int]] = {}
+        self._hedges = [0, 0]
+
+    def _stats(self, tool: str | None) -> _ToolStats:
+        """Return stats for a tool (caller must hold the lock)."""
+        name = tool or "_unattributed"
+        stats = self._tools.get(name)
+        if stats is None:
+            stats = self._tools[name] = _ToolStats()
+        return stats
+
+    @contextmanager
+    def tool(self, name: str) -> Iterator[None]:
+        """Attribute metrics recorded inside the block to a tool."""
+        token = _current_tool.set(name)
+        try:
+            yield
+        finally:
+            _current_tool.reset(token)
+
+    def current_tool(self) -> str | None:
+        """Return the tool metrics are currently attributed to."""
+        return _current_tool.get()
+
+    def record_call(self, tool: str, error: bool = False) -> None:
+        """Count a finished call and whether it failed."""
+        with self._lock:
+            stats = self._stats(tool)
+            stats.calls += 1
+            if error:
+                stats.errors += 1
+
+    def observe(self, phase: str, seconds: float, tool: str | None = None) -> None:
+        """Record a phase latency for a tool (defaults to the current tool)."""
+        with self._lock:
+            stats = self._stats(tool or _current_tool.get())
+            hist = stats.latency.get(phase)
+            if hist is None:
+                hist = stats.latency[phase] = Histogram(self._buckets)
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, phase: str, tool: str | None = None) -> Iterator[None]:
+        """Time the enclosed block as a phase latency."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(phase, time.perf_counter() - start, tool=tool)
+
+    def record_cache(self, cache: str, hit: bool, revalidated: bool = False) -> None:
+        """Count a cache hit, miss, or a stale entry revalidated without a download."""
+        with self._lock:
+            counts = self._caches.setdefault(cache, [0, 0, 0])
+            counts[2 if revalidated else 0 if hit else 1] += 1
+
+    def record_hedge(self, won: bool) -> None:
+        """Count a hedged upstream request, and whether the hedge answered first."""
+        with self._lock:
+            self._hedges[0] += 1
+            self._hedges[1] += won
+
+    def add_bytes(
+        self,
+        bytes_in: int = 0,
+        bytes_out: int = 0,
+        tool: str | None = None,
+        bytes_in_wire: int | None = None,
+    ) -> None:
+        """Add upstream bytes received and sent for a tool.
+
+        bytes_in counts decoded response bytes; bytes_in_wire the compressed
+        bytes actually transferred (defaults to bytes_in).
+        """
+        with self._lock:
+            stats = self._stats(tool or _current_tool.get())
+            stats.bytes_in += bytes_in
+            stats.bytes_in_wire += bytes_in if bytes_in_wire is None else bytes_in_wire
+            stats.bytes_out += bytes_out
+
+    def latency_quantile(self, tool: str, phase: str, q: float, min_count: int = 1) -> float | None:
+        """Return an estimated latency quantile for a tool phase.
+
+        Returns None until at least min_count latencies were observed.
+        """
+        with self._lock:
+            stats = self._tools.get(tool)
+            hist = stats.latency.get(phase) if stats else None
+            if hist is None or hist.count < max(1, min_count):
+                return None
+            return hist.quantile(q)
+
+    def snapshot(self) -> dict:
+        """Return all metrics as a JSON-serializable dictionary."""
+        with self._lock:
+            tools = {
+                name: {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "bytes_in": stats.bytes_in,
+                    "bytes_in_wire": stats.bytes_in_wire,
+                    "bytes_out": stats.bytes_out,
+                    "latency": {
+                        phase: hist.snapshot() for phase, hist in sorted(stats.latency.items())
+                    },
+                }
+                for name, stats in sorted(self._tools.items())
+            }
+            caches = {}
+            for name, (hits, misses, revalidations) in sorted(self._caches.items()):
+                total = hits + misses + revalidations
+                caches[name] = {
+                    "hits": hits,
+                    "misses": misses,
+                    "revalidations": revalidations,
+                    "hit_rate": hits / total if total else 0.0,
+                    "revalidate_rate": revalidations / total if total else 0.0,
+                    "miss_rate": misses / total if total else 0.0,
+                }
+            hedges = {"sent": self._hedges[0], "won": self._hedges[1]}
+        return {
+            "tools": tools,
+            "caches": caches,
+            "hedges": hedges,
+            "bytes_in": sum(t["bytes_in"] for t in tools.values()),
+            "bytes_in_wire": sum(t["bytes_in_wire"] for t in tools.values()),
+            "bytes_out": sum(t["bytes_out"] for t in tools.values()),
+        }
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        snap = self.snapshot()
+        lines = [
+            "# TYPE scanopy_mcp_tool_calls_total counter",
+            *(
+                f'scanopy_mcp_tool_calls_total{{tool="{_escape(n)}"}} {t["calls"]}'
+                for n, t in snap["tools"].items()
+            ),
+            "# TYPE scanopy_mcp_tool_errors_total counter",
+            *(
+                f'scanopy_mcp_tool_errors_total{{tool="{_escape(n)}"}} {t["errors"]}'
+                for n, t in snap["tools"].items()
+            ),
+            "# TYPE scanopy_mcp_upstream_bytes_in_total counter",
+            *(
+                f'scanopy_mcp_upstream_bytes_in_total{{tool="{_escape(n)}"}} {t["bytes_in"]}'
+                for n, t in snap["tools"].items()
+            ),
+            "# TYPE scanopy_mcp_upstream_bytes_in_wire_total counter",
+            *(
+                f'scanopy_mcp_upstream_bytes_in_wire_total{{tool="{_escape(n)}"}} '
+                f"{t['bytes_in_wire']}"
+                for n, t in snap["tools"].items()
+            ),
+            "# TYPE scanopy_mcp_upstream_bytes_out_total counter",
+            *(
+                f'scanopy_mcp_upstream_bytes_out_total{{tool="{_escape(n)}"}} {t["bytes_out"]}'
+                for n, t in snap["tools"].items()
+            ),
+            "# TYPE scanopy_mcp_tool_latency_seconds histogram",
+        ]
+        for name, tool in snap["tools"].items():
+            for phase, hist in tool["latency"].items():
+                labels = f'tool="{_escape(name)}",phase="{phase}"'
+                for bound, count in hist["buckets"].items():
+                    lines.append(
+                        f'scanopy_mcp_tool_latency_seconds_bucket{{{labels},le="{bound}"}} {count}'
+                    )
+                lines.append(f"scanopy_mcp_tool_latency_seconds_sum{{{labels}}} {hist['sum']}")
+                lines.append(f"scanopy_mcp_tool_latency_seconds_count{{{labels}}} {hist['count']}")
+        lines.append("# TYPE scanopy_mcp_cache_hits_total counter")
+        for name, cache in snap["caches"].items():
+            lines.append(f'scanopy_mcp_cache_hits_total{{cache="{_escape(name)}"}} {cache["hits"]}')
+        lines.append("# TYPE scanopy_mcp_cache_misses_total counter")
+        for name, cache in snap["caches"].items():
+            lines.append(
+                f'scanopy_mcp_cache_misses_total{{cache="{_escape(name)}"}} {cache["misses"]}'
+            )
+        lines.append("# TYPE scanopy_mcp_cache_revalidations_total counter")
+        for name, cache in snap["caches"].items():
+            lines.append(
+                f'scanopy_mcp_cache_revalidations_total{{cache="{_escape(name)}"}} '
+                f"{cache['revalidations']}"
+            )
+        lines.append("# TYPE scanopy_mcp_hedged_requests_total counter")
+        lines.append(f"scanopy_mcp_hedged_requests_total {snap['hedges']['sent']}")
+        lines.append("# TYPE scanopy_mcp_hedge_wins_total counter")
+        lines.append(f"scanopy_mcp_hedge_wins_total {snap['hedges']['won']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    """Escape a Prometheus label value."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class PrometheusFileWriter:
+    """Periodically write metrics in Prometheus text format to a file."""
+
+    def __init__(self, metrics: Metrics, path: str, interval_s: float = 15.0):
+        """Initialize the writer.
+
+        Args:
+            metrics: Metrics registry to export.
+            path: Output file path (e.g. for node_exporter's textfile collector).
+            interval_s: Seconds between writes.
+        """
+        self.metrics = metrics
+        self.path = path
+        self.interval_s = interval_s
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def write_once(self) -> None:
+        """Write the current metrics, replacing the file atomically."""
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.metrics.to_prometheus())
+        os.replace(tmp_path, self.path)
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.write_once()
+            except OSError:
+                continue
+
+    def start(self) -> None:
+        """Start writing in a background daemon thread."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread and write a final snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        try:
+            self.write_once()
+        except OSError:
+            pass
@@ -0,0 +1,397 @@
+"""Local SQLite mirror of Scanopy inventory with incremental sync."""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections.abc import Callable, Iterable, Mapping
+from typing import Any
+
+from scanopy_mcp.hashing import content_hash
+
+# Entity kind -> list tool returning every entity of that kind
+MIRROR_SOURCES = {
+    "hosts": "get_all_hosts",
+    "services": "list_services",
+    "ports": "list_ports",
+    "subnets": "list_subnets",
+    "networks": "list_networks",
+}
+
+# Meta-tool names served from the mirror
+QUERY_INVENTORY_TOOL = "query_inventory"
+SYNC_INVENTORY_TOOL = "sync_inventory"
+
+# Row limits for query_inventory
+DEFAULT_QUERY_LIMIT = 100
+MAX_QUERY_LIMIT = 1000
+
+# Entities requested per page from list tools that accept limit/offset
+SYNC_PAGE_SIZE = 500
+
+# Field paths accepted in 'where' filters (top-level or dotted)
+_FIELD_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)*$")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    updated_at TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (kind, id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    kind TEXT PRIMARY KEY,
+    synced_at REAL NOT NULL,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS port_index (
+    port_id TEXT PRIMARY KEY,
+    host_id TEXT,
+    number INTEGER,
+    protocol TEXT
+);
+CREATE INDEX IF NOT EXISTS port_index_number ON port_index (number, host_id);
+CREATE TABLE IF NOT EXISTS host_subnets (
+    host_id TEXT NOT NULL,
+    subnet_id TEXT,
+    ip_address TEXT
+);
+CREATE INDEX IF NOT EXISTS host_subnets_host ON host_subnets (host_id);
+CREATE INDEX IF NOT EXISTS host_subnets_subnet ON host_subnets (subnet_id, host_id);
+"""
+
+
+def response_items(response: Any) -> list[dict]:
+    """Return the entity list from a Scanopy list response (bare or under 'data')."""
+    items = response.get("data", response) if isinstance(response, dict) else response
+    if not isinstance(items, list):
+        return []
+    return [item for item in items if isinstance(item, dict) and item.get("id") is not None]
+
+
+def paged_sources(tools: Mapping) -> list[str]:
+    """Return the mirror list tools among tools that accept `limit` and `offset`."""
+    paged = []
+    for tool in MIRROR_SOURCES.values():
+        if tool in tools:
+            properties = tools[tool].input_schema.get("properties") or {}
+            if "limit" in properties and "offset" in properties:
+                paged.append(tool)
+    return paged
+
+
+def fetch_pages(fetch: Callable[[str, dict], Any], tool: str, paged: bool) -> list[Any]:
+    """Return the responses listing every entity of a tool.
+
+    A paged tool is read with `limit` and `offset` up to its last page; any
+    other tool is called once. A partial list would make a merge delete every
+    entity past it, so a page repeating an entity already read (the API
+    ignoring `offset`) raises instead.
+
+    Raises:
+        ValueError: If paging does not advance.
+    """
+    if not paged:
+        return [fetch(tool, {})]
+    pages = []
+    ids: set[str] = set()
+    offset = 0
+    while True:
+        response = fetch(tool, {"limit": SYNC_PAGE_SIZE, "offset": offset})
+        pages.append(response)
+        page = response.get("data", response) if isinstance(response, dict) else response
+        if not isinstance(page, list):
+            page = []
+        for item in response_items(page):
+            entity_id = str(item["id"])
+            if entity_id in ids:
+                raise ValueError(f"{tool} returned {entity_id} again at offset {offset}")
+            ids.add(entity_id)
+        if len(page) < SYNC_PAGE_SIZE:
+            return pages
+        offset += len(page)
+
+
+def port_number(port: dict) -> tuple[int | None, str | None]:
+    """Return (number, protocol) for a port entity."""
+    source = port.get("port_type") if isinstance(port.get("port_type"), dict) else port
+    number = source.get("number", source.get("port"))
+    protocol = source.get("protocol")
+    try:
+        return int(number), str(protocol) if protocol is not None else None
+    except (TypeError, ValueError):
+        return None, str(protocol) if protocol is not None else None
+
+
+def host_interfaces(host: dict) -> list[tuple[str | None, str | None]]:
+    """Return (subnet_id, ip_address) pairs for a host's interfaces."""
+    pairs = []
+    for interface in host.get("interfaces") or []:
+        if isinstance(interface, dict):
+            subnet_id = interface.get("subnet_id")
+            ip = interface.get("ip_address") or interface.get("ip")
+            pairs.append((str(subnet_id) if subnet_id else None, str(ip) if ip else None))
+    return pairs
+
+
+class InventoryMirror:
+    """Mirror hosts, services, ports, subnets and networks into SQLite.
+
+    A sync downloads each list once, page by page for list tools that take
+    `limit` and `offset`, and writes only entities whose `updated_at` or
+    content hash changed, deleting entities no longer listed. Queries are
+    answered locally from indexed tables.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fetch: Callable[[str, dict], Any],
+        max_age_s: float = 300.0,
+        kinds: Iterable[str] | None = None,
+        paged: Iterable[str] = (),
+    ):
+        """Initialize the mirror.
+
+        Args:
+            path: SQLite database file (":memory:" for a private in-memory mirror).
+            fetch: Callable taking a list tool name and its arguments and
+                returning its response.
+            max_age_s: Age after which a kind is re-synced before querying it.
+            kinds: Kinds synced when a sync names none (default: all).
+            paged: List tools that accept `limit` and `offset`.
+        """
+        self.path = path
+        self._fetch = fetch
+        self.max_age_s = max_age_s
+        self.kinds = list(MIRROR_SOURCES if kinds is None else kinds)
+        self.paged = frozenset(paged)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._db.close()
+
+    def sync(self, kinds: Iterable[str] | None = None) -> dict:
+        """Refresh the mirror from Scanopy.
+
+        Args:
+            kinds: Entity kinds to sync (default: those given at construction).
+
+        Returns:
+            Per-kind counts of added, updated, removed and unchanged entities.
+
+        Raises:
+            ValueError: If an unknown kind is requested, or paging of a list
+                does not advance.
+        """
+        kinds = list(kinds or self.kinds)
+        unknown = [kind for kind in kinds if kind not in MIRROR_SOURCES]
+        if unknown:
+            raise ValueError(f"Unknown inventory kind: {', '.join(unknown)}")
+
+        stats = {}
+        for kind in kinds:
+            tool = MIRROR_SOURCES[kind]
+            pages = fetch_pages(self._fetch, tool, paged=tool in self.paged)
+            items = [item for page in pages for item in response_items(page)]
+            stats[kind] = self._merge(kind, items)
+        return stats
+
+    def _merge(self, kind: str, items: list[dict]) -> dict:
+        """Apply a freshly fetched list to the stored entities of one kind."""
+        counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        with self._lock, self._db:
+            existing = {
+                row["id"]: (row["hash"], row["updated_at"])
+                for row in self._db.execute(
+                    "SELECT id, hash, updated_at FROM entities WHERE kind = ?", (kind,)
+                )
+            }
+            seen = set()
+            for item in items:
+                entity_id = str(item["id"])
+                seen.add(entity_id)
+                updated_at = item.get("updated_at")
+                updated_at = str(updated_at) if updated_at is not None else None
+                previous = existing.get(entity_id)
+
+                # Unchanged timestamp means unchanged entity; skip hashing
+                if previous and updated_at is not None and previous[1] == updated_at:
+                    counts["unchanged"] += 1
+                    continue
+                digest = content_hash(item)
+                if previous and previous[0] == digest:
+                    counts["unchanged"] += 1
+                    continue
+
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entities (kind, id, hash, updated_at, data) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (kind, entity_id, digest, updated_at, json.dumps(item)),
+                )
+                self._index(kind, entity_id, item)
+                counts["updated" if previous else "added"] += 1
+
+            removed = [entity_id for entity_id in existing if entity_id not in seen]
+            for entity_id in removed:
+                self._db.execute(
+                    "DELETE FROM entities WHERE kind = ? AND id = ?", (kind, entity_id)
+                )
+                self._unindex(kind, entity_id)
+            counts["removed"] = len(removed)
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO sync_state (kind, synced_at, count) VALUES (?, ?, ?)",
+                (kind, time.time(), len(seen)),
+            )
+        return counts
+
+    def _index(self, kind: str, entity_id: str, item: dict) -> None:
+        """Maintain derived lookup tables for an upserted entity."""
+        self._unindex(kind, entity_id)
+        if kind == "ports":
+            number, protocol = port_number(item)
+            host_id = item.get("host_id")
+            self._db.execute(
+                "INSERT INTO port_index (port_id, host_id, number, protocol) VALUES (?, ?, ?, ?)",
+                (entity_id, str(host_id) if host_id else None, number, protocol),
+            )
+        elif kind == "hosts":
+            self._db.executemany(
+                "INSERT INTO host_subnets (host_id, subnet_id, ip_address) VALUES (?, ?, ?)",
+                [(entity_id, subnet, ip) for subnet, ip in host_interfaces(item)],
+            )
+
+    def _unindex(self, kind: str, entity_id: str) -> None:
+        """Drop derived lookup rows for an entity."""
+        if kind == "ports":
+            self._db.execute("DELETE FROM port_index WHERE port_id = ?", (entity_id,))
+        elif kind == "hosts":
+            self._db.execute("DELETE FROM host_subnets WHERE host_id = ?", (entity_id,))
+
+    def stale_kinds(self, kinds: Iterable[str]) -> list[str]:
+        """Return kinds never synced or synced longer than max_age_s ago."""
+        with self._lock:
+            synced = {
+                row["kind"]: row["synced_at"]
+                for row in self._db.execute("SELECT kind, synced_at FROM sync_state")
+            }
+        now = time.time()
+        return [
+            kind for kind in kinds if kind not in synced or now - synced[kind] > self.max_age_s
+        ]
+
+    def query(
+        self,
+        kind: str = "hosts",
+        where: dict | None = None,
+        port: int | None = None,
+        subnet_id: str | None = None,
+        limit: int = DEFAULT_QUERY_LIMIT,
+    ) -> list[dict]:
+        """Return mirrored entities matching all filters.
+
+        Args:
+            kind: Entity kind to query.
+            where: Equality filters on top-level or dotted JSON fields.
+            port: Hosts only: keep hosts with a port of this number.
+            subnet_id: Hosts only: keep hosts with an interface in this subnet.
+            limit: Maximum rows to return.
+
+        Raises:
+            ValueError: For unknown kinds, invalid fields or host-only filters
+                on other kinds.
+        """
+        if kind not in MIRROR_SOURCES:
+            raise ValueError(f"Unknown inventory kind: {kind}")
+        if (port is not None or subnet_id) and kind != "hosts":
+            raise ValueError("'port' and 'subnet_id' filters only apply to hosts")
+
+        sql = ["SELECT e.data FROM entities e WHERE e.kind = ?"]
+        args: list[Any] = [kind]
+        for field, value in (where or {}).items():
+            if not _FIELD_RE.match(field):
+                raise ValueError(f"Invalid filter field: {field}")
+            if isinstance(value, (dict, list)):
+                raise ValueError(f"Filter value for '{field}' must be a scalar")
+            sql.append(f"AND json_extract(e.data, '$.{field}') IS ?")
+            args.append(int(value) if isinstance(value, bool) else value)
+        if port is not None:
+            sql.append("AND e.id IN (SELECT host_id FROM port_index WHERE number = ?)")
+            args.append(int(port))
+        if subnet_id:
+            sql.append("AND e.id IN (SELECT host_id FROM host_subnets WHERE subnet_id = ?)")
+            args.append(str(subnet_id))
+        sql.append("ORDER BY e.id LIMIT ?")
+        args.append(max(1, min(int(limit), MAX_QUERY_LIMIT)))
+
+        with self._lock:
+            rows = self._db.execute(" ".join(sql), args).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def handle_query(self, args: dict, confirm: str | None = None, dry_run: bool = False) -> dict:
+        """Serve query_inventory, syncing the kinds it reads first if stale."""
+        kind = args.get("kind") or "hosts"
+        needed = [kind]
+        if args.get("port") is not None:
+            needed.append("ports")
+        stale = self.stale_kinds(needed)
+        if stale:
+            self.sync(stale)
+        items = self.query(
+            kind=kind,
+            where=args.get("where"),
+            port=args.get("port"),
+            subnet_id=args.get("subnet_id"),
+            limit=args.get("limit") or DEFAULT_QUERY_LIMIT,
+        )
+        return {"kind": kind, "count": len(items), "items": items, "synced": stale}
+
+    def handle_sync(self, args: dict, confirm: str | None = None, dry_run: bool = False) -> dict:
+        """Serve sync_inventory."""
+        return {"synced": self.sync(args.get("kinds"))}
+
+
+def mirror_tools() -> dict:
+    """Return meta-tool definitions served by the inventory mirror."""
+    kinds = sorted(MIRROR_SOURCES)
+    return {
+        QUERY_INVENTORY_TOOL: {
+            "kind": "meta",
+            "description": (
+                "Query the local inventory mirror (hosts, services, ports, subnets, "
+                "networks) with filters, e.g. hosts exposing a port in a subnet."
+            ),
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "kind": {"type": "string", "enum": kinds, "default": "hosts"},
+                    "where": {
+                        "type": "object",
+                        "description": "Equality filters on (dotted) entity fields",
+                    },
+                    "port": {"type": "integer", "description": "Hosts exposing this port"},
+                    "subnet_id": {"type": "string", "description": "Hosts in this subnet"},
+                    "limit": {"type": "integer", "maximum": MAX_QUERY_LIMIT},
+                },
+            },
+        },
+        SYNC_INVENTORY_TOOL: {
+            "kind": "meta",
+            "description": "Refresh the local inventory mirror from Scanopy.",
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "kinds": {"type": "array", "items": {"type": "string", "enum": kinds}}
+                },
+            },
+        },
+    }
@@ -4,34 +4,95 @@ import time
 
 import httpx
 
+from scanopy_mcp.compression import DEFAULT_ENCODINGS, accept_encoding, wire_bytes
+from scanopy_mcp.metrics import Metrics
+from scanopy_mcp.spec_stream import parse_spec
+
+# Name spec downloads are counted under in the per-tool byte metrics
+SPEC_METRICS_TOOL = "openapi_spec"
+
 
 class OpenAPILoader:
     """Load and cache OpenAPI specification from a URL."""
 
-    def __init__(self, url: str, ttl_seconds: int = 600):
+    def __init__(
+        self,
+        url: str,
+        ttl_seconds: int = 600,
+        metrics: Metrics | None = None,
+        streaming: bool = False,
+        encodings: tuple[str, ...] = DEFAULT_ENCODINGS,
+        timeout_s: float = 5.0,
+    ):
         """Initialize the loader.
 
         Args:
             url: URL to fetch OpenAPI spec from.
             ttl_seconds: Cache time-to-live in seconds.
+            metrics: Optional metrics registry for cache hit rates.
+            streaming: Parse the response as it downloads and keep only the
+                sections tools are built from (see spec_stream.parse_spec).
+            encodings: Response encodings to ask for, most preferred first.
+            timeout_s: Download timeout in seconds (per connect and read wait).
         """
         self.url = url
         self.ttl_seconds = ttl_seconds
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.streaming = streaming
+        self.headers = {"Accept-Encoding": accept_encoding(encodings)}
+        self.timeout_s = timeout_s
         self._cache = None
         self._loaded_at = 0.0
 
+    @property
+    def expires_at(self) -> float:
+        """Epoch time from which load() re-fetches the spec."""
+        return self._loaded_at + self.ttl_seconds
+
     def load(self) -> dict:
         """Load OpenAPI spec, using cache if fresh.
 
+        A failed re-fetch returns the previously loaded spec.
+
         Returns:
             OpenAPI specification as a dictionary.
         """
         now = time.time()
         if self._cache is not None and (now - self._loaded_at) < self.ttl_seconds:
+            self.metrics.record_cache("openapi_spec", hit=True)
             return self._cache
 
-        resp = httpx.get(self.url, timeout=5)
-        resp.raise_for_status()
-        self._cache = resp.json()
+        self.metrics.record_cache("openapi_spec", hit=False)
+        try:
+            if self.streaming:
+                with httpx.stream(
+                    "GET", self.url, headers=self.headers, timeout=self.timeout_s
+                ) as resp:
+                    resp.raise_for_status()
+                    decoded = 0
+
+                    def chunks():
+                        # Decompressed chunk by chunk as the body arrives
+                        nonlocal decoded
+                        for chunk in resp.iter_bytes():
+                            decoded += len(chunk)
+                            yield chunk
+
+                    spec = parse_spec(chunks())
+            else:
+                resp = httpx.get(self.url, headers=self.headers, timeout=self.timeout_s)
+                resp.raise_for_status()
+                spec = resp.json()
+                decoded = len(resp.content)
+            self.metrics.add_bytes(
+                bytes_in=decoded, tool=SPEC_METRICS_TOOL, bytes_in_wire=wire_bytes(resp, decoded)
+            )
+        except Exception:
+            if self._cache is None:
+                raise
+            # Keep serving the stale spec and retry after another TTL, not on every call
+            self._loaded_at = now
+            return self._cache
+        self._cache = spec
         self._loaded_at = now
         return self._cache
@@ -1,5 +1,7 @@
 """Policy guard for enforcing write operation rules."""
 
+from scanopy_mcp.tool_spec import ToolSpec
+
 
 class PolicyGuard:
     """Enforce policy on write operations."""
@@ -14,16 +16,20 @@ class PolicyGuard:
         self.allowlist = allowlist
         self.confirm_string = confirm_string
 
-    def enforce_write(self, tool_name: str, confirm: str | None):
+    def enforce_write(self, tool_name: str | ToolSpec, confirm: str | None):
         """Enforce policy on a write operation.
 
         Args:
-            tool_name: Name of the tool being called.
+            tool_name: Name (or ToolSpec) of the tool being called.
             confirm: Confirmation string from user.
 
         Raises:
             ValueError: If tool not allowlisted or confirm string doesn't match.
         """
+        if isinstance(tool_name, ToolSpec):
+            if not tool_name.is_write:
+                return
+            tool_name = tool_name.name
         if tool_name not in self.allowlist:
             raise ValueError(f"Tool '{tool_name}' is not allowlisted for write operations")
 
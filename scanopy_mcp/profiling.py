@@ -0,0 +1,144 @@
+"""On-demand cProfile and tracemalloc sampling of individual requests."""
+
+import cProfile
+import os
+import re
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+# Methods used to control the server itself are never profiled
+_CONTROL_METHODS = {"server/profile", "server/metrics"}
+
+
+class RequestProfiler:
+    """Profile selected requests and dump `.pstats` and allocation snapshots.
+
+    The profiler is disarmed by default; callers check the plain `armed`
+    attribute before doing anything else, so it costs nothing when off.
+    """
+
+    def __init__(self, output_dir: str = "profiles"):
+        """Initialize a disarmed profiler.
+
+        Args:
+            output_dir: Directory that receives profile dumps.
+        """
+        self.output_dir = output_dir
+        self.armed = False
+        self._remaining: int | None = None
+        self._tool: str | None = None
+        self._memory = True
+        self._lock = threading.Lock()
+        self._busy = threading.Lock()
+        self._dumps: list[str] = []
+
+    def arm(
+        self,
+        count: int | None = 1,
+        tool: str | None = None,
+        output_dir: str | None = None,
+        memory: bool = True,
+    ) -> None:
+        """Profile upcoming requests.
+
+        Args:
+            count: Number of requests to profile; None means until disarmed.
+            tool: Only profile tools/call requests for this tool.
+            output_dir: Override the dump directory.
+            memory: Also take tracemalloc allocation snapshots.
+
+        Raises:
+            ValueError: If count is not positive or neither count nor tool is set.
+        """
+        if count is not None and count <= 0:
+            raise ValueError("Profile count must be positive")
+        if count is None and tool is None:
+            raise ValueError("Profile count or tool is required")
+        with self._lock:
+            self._remaining = count
+            self._tool = tool
+            self._memory = memory
+            if output_dir:
+                self.output_dir = output_dir
+            self.armed = True
+
+    def disarm(self) -> None:
+        """Stop profiling requests."""
+        with self._lock:
+            self.armed = False
+            self._remaining = None
+            self._tool = None
+
+    def status(self) -> dict:
+        """Return the current arming state and recent dump paths."""
+        with self._lock:
+            return {
+                "armed": self.armed,
+                "remaining": self._remaining,
+                "tool": self._tool,
+                "output_dir": self.output_dir,
+                "dumps": list(self._dumps[-20:]),
+            }
+
+    def claim(self, method: str | None, tool: str | None) -> bool:
+        """Decide whether to profile a request, consuming one slot if so."""
+        if method in _CONTROL_METHODS:
+            return False
+        with self._lock:
+            if not self.armed:
+                return False
+            if self._tool is not None and tool != self._tool:
+                return False
+            if self._remaining is not None:
+                self._remaining -= 1
+                if self._remaining <= 0:
+                    self.armed = False
+            return True
+
+    @contextmanager
+    def profile(self, label: str) -> Iterator[None]:
+        """Profile the enclosed block and dump results under `label`.
+
+        Only one request is profiled at a time; a request that arrives while
+        another is being profiled runs unprofiled.
+        """
+        if not self._busy.acquire(blocking=False):
+            yield
+            return
+
+        memory = self._memory and not tracemalloc.is_tracing()
+        profiler = cProfile.Profile()
+        try:
+            if memory:
+                tracemalloc.start()
+            profiler.enable()
+            try:
+                yield
+            finally:
+                profiler.disable()
+                snapshot = tracemalloc.take_snapshot() if memory else None
+                if memory:
+                    tracemalloc.stop()
+                self._dump(label, profiler, snapshot)
+        finally:
+            self._busy.release()
+
+    def _dump(
+        self, label: str, profiler: cProfile.Profile, snapshot: tracemalloc.Snapshot | None
+    ) -> None:
+        """Write profile outputs to the dump directory."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        safe_label = re.sub(r"[^A-Za-z0-9_.-]+", "_", label)
+        base = os.path.join(self.output_dir, f"{time.strftime('%Y%m%d-%H%M%S')}-{safe_label}")
+        base = f"{base}-{time.perf_counter_ns() % 1_000_000:06d}"
+
+        profiler.dump_stats(f"{base}.pstats")
+        paths = [f"{base}.pstats"]
+        if snapshot is not None:
+            snapshot.dump(f"{base}.tracemalloc")
+            paths.append(f"{base}.tracemalloc")
+        with self._lock:
+            self._dumps.extend(paths)
@@ -1,9 +1,32 @@
 """Runtime builder for wiring all MCP server components."""
 
+from collections.abc import Mapping, MutableMapping
+
+from scanopy_mcp.cache import ResponseCache
 from scanopy_mcp.client import ScanopyClient
+from scanopy_mcp.idempotency import WriteLedger
+from scanopy_mcp.metrics import Metrics
+from scanopy_mcp.mirror import (
+    MIRROR_SOURCES,
+    QUERY_INVENTORY_TOOL,
+    SYNC_INVENTORY_TOOL,
+    InventoryMirror,
+    mirror_tools,
+    paged_sources,
+)
 from scanopy_mcp.policy import PolicyGuard
+from scanopy_mcp.search_index import InventoryIndex, search_tools
 from scanopy_mcp.server import ScanopyMCPServer
+from scanopy_mcp.snapshots import (
+    DIFF_SNAPSHOTS_TOOL,
+    LIST_SNAPSHOTS_TOOL,
+    SNAPSHOT_INVENTORY_TOOL,
+    SnapshotStore,
+    snapshot_tools,
+)
 from scanopy_mcp.tool_registry import ToolRegistry
+from scanopy_mcp.tool_search import ToolIndex, tool_search_tools
+from scanopy_mcp.tracing import Tracer
 
 
 def build_runtime(
@@ -12,6 +35,23 @@ def build_runtime(
     base_url: str = "",
     api_key: str = "",
     confirm_string: str = "",
+    metrics: Metrics | None = None,
+    tracer: Tracer | None = None,
+    batch_concurrency: int = 8,
+    mirror_path: str | None = None,
+    mirror_max_age_s: float = 300.0,
+    cache_ttl_s: float = 0.0,
+    search_memory_mb: float = 32.0,
+    snapshot_dir: str | None = None,
+    registry: ToolRegistry | None = None,
+    tools: MutableMapping | None = None,
+    encodings: tuple[str, ...] | None = None,
+    timeout_s: float = 10.0,
+    tool_timeouts: Mapping[str, float] | None = None,
+    retries: int = 0,
+    hedge: bool = False,
+    deadline_s: float = 0.0,
+    write_dedup_s: float = 0.0,
 ) -> ScanopyMCPServer:
     """Build a complete MCP server runtime with all components wired.
 
@@ -21,18 +61,122 @@ def build_runtime(
         base_url: Base URL for Scanopy API.
         api_key: API key for authentication.
         confirm_string: Required confirmation string for writes.
+        metrics: Optional metrics registry shared by the server and client.
+        tracer: Optional tracer shared by the server and client.
+        batch_concurrency: Max concurrent upstream calls within one batch_call.
+        mirror_path: Optional SQLite path enabling the local inventory mirror.
+        mirror_max_age_s: Age after which mirrored data is re-synced on query.
+        cache_ttl_s: Seconds GET responses are cached (0 disables the cache).
+        search_memory_mb: Memory budget of the search_inventory index (0 disables
+            it). The index needs the response cache (cache_ttl_s > 0).
+        snapshot_dir: Optional directory where inventory snapshots are persisted.
+        registry: Optional prebuilt registry for the spec (shared between tenants).
+        tools: Optional prebuilt tool table (e.g. a memory-mapped catalog); the
+            spec is not scanned and spec refreshes are not supported.
+        encodings: Response encodings to ask the API for, most preferred first.
+        timeout_s: Upstream request timeout in seconds.
+        tool_timeouts: Upstream timeouts overriding timeout_s, by tool name.
+        retries: Times a failed GET is retried within the request deadline.
+        hedge: Hedge GETs slower than their tool's p95 upstream latency.
+        deadline_s: Overall time budget of each tool call (0 for none).
+        write_dedup_s: Seconds a completed write answers identical replays
+            without being resent (0 disables the ledger).
 
     Returns:
         Configured ScanopyMCPServer instance.
     """
-    # Register tools from OpenAPI spec
-    tools = ToolRegistry(openapi_spec, allowlist=allowlist).list_tools()
+    # Register tools from OpenAPI spec plus local meta-tools
+    if tools is None and registry is None:
+        registry = ToolRegistry(openapi_spec, allowlist=allowlist)
+        tools = registry.list_tools(include_meta=True)
+    else:
+        if tools is None:
+            tools = registry.built_tools()
+        else:
+            registry = None
+        for name, meta in ToolRegistry.meta_tools().items():
+            if name in tools:
+                raise ValueError(f"Duplicate operationId: {name}")
+            tools[name] = meta
+
+    metrics = metrics if metrics is not None else Metrics()
+    tracer = tracer if tracer is not None else Tracer()
 
     # Create HTTP client
-    client = ScanopyClient(base_url=base_url, api_key=api_key)
+    client = ScanopyClient(
+        base_url=base_url,
+        api_key=api_key,
+        metrics=metrics,
+        tracer=tracer,
+        max_connections=max(10, batch_concurrency),
+        cache=ResponseCache(cache_ttl_s, metrics=metrics) if cache_ttl_s > 0 else None,
+        encodings=encodings,
+        timeout_s=timeout_s,
+        tool_timeouts=tool_timeouts,
+        retries=retries,
+        hedge=hedge,
+    )
 
     # Create policy guard
     guard = PolicyGuard(allowlist=allowlist, confirm_string=confirm_string)
 
     # Wire up server
-    return ScanopyMCPServer(tools=tools, client=client, guard=guard)
+    server = ScanopyMCPServer(
+        tools=tools,
+        client=client,
+        guard=guard,
+        metrics=metrics,
+        tracer=tracer,
+        batch_concurrency=batch_concurrency,
+        registry=registry,
+        deadline_s=deadline_s,
+        write_ledger=WriteLedger(write_dedup_s, metrics=metrics) if write_dedup_s > 0 else None,
+    )
+
+    tool_index = ToolIndex(server.tools_list)
+    for name, meta in tool_search_tools().items():
+        server.register_meta_tool(name, meta, tool_index.handle_search)
+
+    if mirror_path:
+        mirror = InventoryMirror(
+            mirror_path,
+            fetch=server.tools_call,
+            max_age_s=mirror_max_age_s,
+            kinds=[kind for kind, tool in MIRROR_SOURCES.items() if tool in tools],
+            paged=paged_sources(tools),
+        )
+        handlers = {
+            QUERY_INVENTORY_TOOL: mirror.handle_query,
+            SYNC_INVENTORY_TOOL: mirror.handle_sync,
+        }
+        for name, meta in mirror_tools().items():
+            server.register_meta_tool(name, meta, handlers[name])
+
+    if search_memory_mb > 0 and cache_ttl_s > 0 and MIRROR_SOURCES["hosts"] in tools:
+        # Built from cached list responses; without the cache every search
+        # would download the full host, port and service lists
+        index = InventoryIndex(
+            fetch=server.tools_call,
+            max_bytes=int(search_memory_mb * (1 << 20)),
+            kinds=[kind for kind, tool in MIRROR_SOURCES.items() if tool in tools],
+            paged=paged_sources(tools),
+        )
+        for name, meta in search_tools().items():
+            server.register_meta_tool(name, meta, index.handle_search)
+
+    if MIRROR_SOURCES["hosts"] in tools:
+        snapshots = SnapshotStore(
+            fetch=server.tools_call,
+            directory=snapshot_dir,
+            kinds=[kind for kind, tool in MIRROR_SOURCES.items() if tool in tools],
+            paged=paged_sources(tools),
+        )
+        handlers = {
+            SNAPSHOT_INVENTORY_TOOL: snapshots.handle_snapshot,
+            LIST_SNAPSHOTS_TOOL: snapshots.handle_list,
+            DIFF_SNAPSHOTS_TOOL: snapshots.handle_diff,
+        }
+        for name, meta in snapshot_tools().items():
+            server.register_meta_tool(name, meta, handlers[name])
+
+    return server
@@ -0,0 +1,183 @@
+"""Structural interning of JSON schemas and shared definitions for tools/list."""
+
+import hashlib
+import json
+from collections.abc import Callable, Iterable, Mapping
+
+# Repeated subschemas smaller than this (as compact JSON) stay inline;
+# a reference costs about 40 bytes
+MIN_SHARED_BYTES = 96
+
+# JSON Schema keywords whose values are subschemas or subschema containers
+_SCHEMA_MAP_KEYS = ("properties", "patternProperties", "$defs", "definitions")
+_SCHEMA_KEYS = ("items", "additionalProperties", "not", "contains", "propertyNames")
+_SCHEMA_LIST_KEYS = ("allOf", "anyOf", "oneOf", "prefixItems")
+
+DEFS_REF_PREFIX = "#/$defs/"
+
+
+class SchemaInterner:
+    """Share one object per structurally identical schema.
+
+    Schemas are interned bottom-up: every dict and list is keyed by a digest
+    of its scalars and its children's digests, so each node is serialized
+    once no matter how deep it sits. Key order is part of the structure, so
+    property order is preserved. Interned schemas must not be mutated.
+    """
+
+    def __init__(self):
+        self._nodes: dict[bytes, object] = {}
+        self._digests: dict[int, bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def intern(self, schema):
+        """Return the shared instance equal to schema."""
+        return self._intern(schema)[0]
+
+    def _intern(self, node) -> tuple[object, bytes]:
+        if isinstance(node, Mapping):
+            known = self._digests.get(id(node))
+            if known is not None and self._nodes.get(known) is node:
+                return node, known
+            items = {}
+            parts = []
+            for key, value in node.items():
+                items[key], digest = self._intern(value)
+                parts.append(json.dumps(key).encode() + b":" + digest)
+            digest = _digest(b"{" + b",".join(parts) + b"}")
+            return self._store(digest, items), digest
+        if isinstance(node, list):
+            interned = [self._intern(value) for value in node]
+            digest = _digest(b"[" + b",".join(d for _, d in interned) + b"]")
+            return self._store(digest, [value for value, _ in interned]), digest
+        return node, _digest(json.dumps(node, default=str).encode())
+
+    def retain(self, schemas: Iterable) -> None:
+        """Forget every node not reachable from the given interned schemas.
+
+        Called after a spec refresh so schemas of removed or changed
+        operations are not kept alive by the interner.
+        """
+        nodes: dict[bytes, object] = {}
+        digests: dict[int, bytes] = {}
+        pending = list(schemas)
+        while pending:
+            node = pending.pop()
+            if not isinstance(node, (Mapping, list)):
+                continue
+            digest = self._digests.get(id(node))
+            if digest is None or digest in nodes or self._nodes.get(digest) is not node:
+                continue
+            nodes[digest] = node
+            digests[id(node)] = digest
+            pending.extend(node.values() if isinstance(node, Mapping) else node)
+        self._nodes, self._digests = nodes, digests
+
+    def _store(self, digest: bytes, node):
+        """Keep the first node seen for a digest."""
+        shared = self._nodes.setdefault(digest, node)
+        self._digests[id(shared)] = digest
+        return shared
+
+
+def share_definitions(
+    schemas: Iterable[Mapping], min_bytes: int = MIN_SHARED_BYTES
+) -> tuple[list[dict], dict[str, dict]]:
+    """Hoist subschemas repeated across schemas into shared definitions.
+
+    Subschemas (property schemas, array items, allOf members, ...) that occur
+    more than once and serialize to at least `min_bytes` are emitted once in
+    the returned definitions and replaced by `{"$ref": "#/$defs/<name>"}`.
+    Definitions may reference each other.
+
+    Returns:
+        The rewritten schemas (in input order) and the definitions by name.
+    """
+    schemas = list(schemas)
+    counts: dict[str, int] = {}
+    nodes: dict[str, Mapping] = {}
+    keys: dict[int, str] = {}
+
+    def key_of(node: Mapping) -> str:
+        key = keys.get(id(node))
+        if key is None:
+            key = keys[id(node)] = json.dumps(node, sort_keys=True, separators=(",", ":"))
+            nodes.setdefault(key, node)
+        return key
+
+    for schema in schemas:
+        for sub in _subschemas(schema):
+            key = key_of(sub)
+            counts[key] = counts.get(key, 0) + 1
+    candidates = {key for key, count in counts.items() if count > 1 and len(key) >= min_bytes}
+
+    # Recount, entering each candidate only once: a subschema that repeats
+    # only inside one shared definition stays inline there
+    counts = {}
+
+    def enter(node: Mapping) -> bool:
+        key = key_of(node)
+        return key not in candidates or counts[key] == 1
+
+    for schema in schemas:
+        for sub in _subschemas(schema, enter):
+            key = key_of(sub)
+            if key in candidates:
+                counts[key] = counts.get(key, 0) + 1
+    names = {key: _digest(key.encode()).hex()[:12] for key in candidates if counts.get(key, 0) > 1}
+
+    def rewrite(node: Mapping, top: bool = False):
+        if not top and isinstance(node, Mapping):
+            name = names.get(key_of(node))
+            if name is not None:
+                return {"$ref": DEFS_REF_PREFIX + name}
+        out = dict(node)
+        for key in _SCHEMA_MAP_KEYS:
+            if isinstance(out.get(key), Mapping):
+                out[key] = {
+                    k: rewrite(v) if isinstance(v, Mapping) else v for k, v in out[key].items()
+                }
+        for key in _SCHEMA_KEYS:
+            if isinstance(out.get(key), Mapping):
+                out[key] = rewrite(out[key])
+        for key in _SCHEMA_LIST_KEYS:
+            if isinstance(out.get(key), list):
+                out[key] = [rewrite(v) if isinstance(v, Mapping) else v for v in out[key]]
+        return out
+
+    defs = {name: rewrite(nodes[key], top=True) for key, name in names.items()}
+    return [rewrite(schema, top=True) for schema in schemas], defs
+
+
+def _subschemas(schema: Mapping, enter: Callable[[Mapping], bool] | None = None):
+    """Yield every nested subschema of a schema (not the schema itself).
+
+    Args:
+        schema: Schema to walk.
+        enter: Optional predicate called after a subschema is yielded; its
+            children are only walked when it returns true.
+    """
+    stack = [schema]
+    while stack:
+        node = stack.pop()
+        if node is not schema and enter is not None and not enter(node):
+            continue
+        children = []
+        for key in _SCHEMA_MAP_KEYS:
+            if isinstance(node.get(key), Mapping):
+                children.extend(v for v in node[key].values() if isinstance(v, Mapping))
+        for key in _SCHEMA_KEYS:
+            if isinstance(node.get(key), Mapping):
+                children.append(node[key])
+        for key in _SCHEMA_LIST_KEYS:
+            if isinstance(node.get(key), list):
+                children.extend(v for v in node[key] if isinstance(v, Mapping))
+        yield from children
+        stack.extend(children)
+
+
+def _digest(data: bytes) -> bytes:
+    """Return a 16-byte structural digest."""
+    return hashlib.blake2b(data, digest_size=16).digest()
@@ -0,0 +1,87 @@
+"""Slimmed tool input schemas: only what an agent needs to call a tool."""
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from scanopy_mcp.config import Config
+
+# Keys dropped with strip_descriptions / strip_examples
+_DESCRIPTION_KEYS = frozenset({"description", "title"})
+_EXAMPLE_KEYS = frozenset({"example", "examples", "externalDocs", "xml"})
+
+# Enum values listed in the hint that replaces a truncated enum
+_ENUM_HINT_VALUES = 5
+
+
+@dataclass(frozen=True)
+class SlimOptions:
+    """How far tool input schemas are cut down.
+
+    Attributes:
+        max_depth: Levels of nested properties kept (1 keeps only the tool's
+            own properties); deeper objects and arrays are reduced to their
+            type. None keeps every level.
+        strip_descriptions: Drop `description` and `title`.
+        strip_examples: Drop `example(s)`, `externalDocs`, `xml` and `x-*` keys.
+        max_enum: Enums with more values are replaced by a short hint so
+            clients do not reject valid values. None keeps all enums.
+    """
+
+    max_depth: int | None = 3
+    strip_descriptions: bool = True
+    strip_examples: bool = True
+    max_enum: int | None = 20
+
+    @classmethod
+    def from_config(cls, config: Config) -> "SlimOptions | None":
+        """Return the options set by SCANOPY_SCHEMA_* variables, or None if off."""
+        if not config.schema_slim:
+            return None
+        return cls(
+            max_depth=config.schema_max_depth or None,
+            strip_descriptions=not config.schema_keep_descriptions,
+            max_enum=config.schema_max_enum or None,
+        )
+
+    def apply(self, schema: Mapping) -> dict:
+        """Return a slimmed copy of a tool input schema.
+
+        `type`, `properties`, `items` and `required` are kept at every level
+        that survives, so clients can still build valid arguments.
+        """
+        return self._slim(schema, 0)
+
+    def _slim(self, node: Mapping, depth: int) -> dict:
+        out = {}
+        hint = None
+        truncated = self.max_depth is not None and depth >= self.max_depth
+        for key, value in node.items():
+            if self.strip_descriptions and key in _DESCRIPTION_KEYS:
+                continue
+            if self.strip_examples and (key in _EXAMPLE_KEYS or key.startswith("x-")):
+                continue
+            if key in ("properties", "patternProperties") and isinstance(value, Mapping):
+                if truncated:
+                    continue
+                out[key] = {
+                    name: self._slim(sub, depth + 1) if isinstance(sub, Mapping) else sub
+                    for name, sub in value.items()
+                }
+            elif key in ("items", "additionalProperties") and isinstance(value, Mapping):
+                if not truncated:
+                    out[key] = self._slim(value, depth + 1)
+            elif key in ("allOf", "anyOf", "oneOf") and isinstance(value, list):
+                if not truncated:
+                    out[key] = [
+                        self._slim(v, depth) if isinstance(v, Mapping) else v for v in value
+                    ]
+            elif key == "required" and truncated:
+                continue
+            elif key == "enum" and self.max_enum is not None and len(value) > self.max_enum:
+                shown = ", ".join(str(v) for v in value[:_ENUM_HINT_VALUES])
+                hint = f"One of {len(value)} values, e.g. {shown}"
+            else:
+                out[key] = value
+        if hint is not None:
+            out["description"] = f"{out['description']} ({hint})" if "description" in out else hint
+        return out
@@ -0,0 +1,391 @@
+"""In-memory search index over Scanopy inventory list responses."""
+
+import operator
+import re
+import threading
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+from scanopy_mcp.hashing import content_hash
+from scanopy_mcp.mirror import (
+    MIRROR_SOURCES,
+    fetch_pages,
+    host_interfaces,
+    port_number,
+    response_items,
+)
+
+# Meta-tool name served from the index
+SEARCH_INVENTORY_TOOL = "search_inventory"
+
+# Result limits for search_inventory
+DEFAULT_SEARCH_LIMIT = 50
+MAX_SEARCH_LIMIT = 500
+
+# Entity kinds the index is built from
+INDEXED_KINDS = ("hosts", "ports", "services")
+
+# Rough per-structure costs (CPython, 64-bit) used to enforce the memory budget
+_NODE_BYTES = 200
+_POSTING_BYTES = 120
+_HOST_BYTES = 400
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Any) -> set[str]:
+    """Split a hostname or name into lower-cased alphanumeric tokens."""
+    return set(_TOKEN_RE.findall(str(text).lower())) if text else set()
+
+
+class _Node:
+    """One character step in a PrefixTrie."""
+
+    __slots__ = ("children", "postings")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        self.postings: dict[tuple, str] | None = None
+
+
+class PrefixTrie:
+    """Map string keys to postings and look them up by prefix.
+
+    A posting links a source entity (kind, id) to the host it refers to, so
+    removing one entity never drops a host that another entity still maps.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self.nodes = 1
+        self.postings = 0
+
+    def add(self, key: str, source: tuple, host_id: str) -> None:
+        """Index source -> host_id under key."""
+        node = self._root
+        for char in key:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _Node()
+                self.nodes += 1
+            node = child
+        if node.postings is None:
+            node.postings = {}
+        if source not in node.postings:
+            self.postings += 1
+        node.postings[source] = host_id
+
+    def remove(self, key: str, source: tuple) -> None:
+        """Drop the posting for source under key, pruning empty nodes."""
+        path = [self._root]
+        for char in key:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        leaf = path[-1]
+        if not leaf.postings or source not in leaf.postings:
+            return
+        del leaf.postings[source]
+        self.postings -= 1
+        if not leaf.postings:
+            leaf.postings = None
+        for depth in range(len(key), 0, -1):
+            node = path[depth]
+            if node.children or node.postings:
+                break
+            del path[depth - 1].children[key[depth - 1]]
+            self.nodes -= 1
+
+    def find(self, prefix: str) -> set[str]:
+        """Return host ids indexed under any key starting with prefix."""
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        hosts: set[str] = set()
+        stack = [node]
+        while stack:
+            node = stack.pop()
+            if node.postings:
+                hosts.update(node.postings.values())
+            stack.extend(node.children.values())
+        return hosts
+
+    def exact(self, key: str) -> set[str]:
+        """Return host ids indexed under exactly key."""
+        node = self._root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return set()
+        return set(node.postings.values()) if node.postings else set()
+
+
+class InventoryIndex:
+    """Search hosts by hostname tokens, IP prefix, open port, service and tag.
+
+    The index is fed whole list responses but only re-indexes entities whose
+    content hash changed; a response object identical to the last one seen
+    (e.g. a fresh cache hit) is skipped outright. Indexing stops adding
+    entities once the approximate memory budget is reached.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, dict], Any] | None = None,
+        max_bytes: int = 32 << 20,
+        kinds: Iterable[str] | None = None,
+        paged: Iterable[str] = (),
+    ):
+        """Initialize the index.
+
+        Args:
+            fetch: Callable taking a list tool name and its arguments and
+                returning its response.
+            max_bytes: Approximate memory budget for index structures.
+            kinds: Kinds whose list tools are available (default: all indexed kinds).
+            paged: List tools that accept `limit` and `offset`.
+        """
+        self._fetch = fetch
+        self.max_bytes = max_bytes
+        self.kinds = list(INDEXED_KINDS if kinds is None else kinds)
+        self.paged = frozenset(paged)
+        self._lock = threading.Lock()
+        self.names = PrefixTrie()
+        self.ips = PrefixTrie()
+        self.ports = PrefixTrie()
+        self.services = PrefixTrie()
+        self.tags = PrefixTrie()
+        self.hosts: dict[str, dict] = {}
+        # (kind, id) -> (content hash, [(trie, key), ...])
+        self._entries: dict[tuple, tuple[str, list[tuple[PrefixTrie, str]]]] = {}
+        # Last response objects merged per kind (cache hits return the same objects)
+        self._last_pages: dict[str, list] = {}
+        # Kinds whose last update skipped entities for lack of memory
+        self._truncated_kinds: set[str] = set()
+
+    @property
+    def truncated(self) -> bool:
+        """Whether the last update of some kind left entities out of the index."""
+        return bool(self._truncated_kinds)
+
+    @property
+    def approx_bytes(self) -> int:
+        """Estimated memory used by the index."""
+        tries = (self.names, self.ips, self.ports, self.services, self.tags)
+        return (
+            sum(t.nodes * _NODE_BYTES + t.postings * _POSTING_BYTES for t in tries)
+            + len(self.hosts) * _HOST_BYTES
+        )
+
+    def refresh(self, kinds: Iterable[str] = INDEXED_KINDS) -> dict:
+        """Fetch and merge the given kinds.
+
+        Returns:
+            Per-kind update counts (see update()).
+        """
+        if self._fetch is None:
+            raise ValueError("InventoryIndex has no fetch callable")
+        counts = {}
+        for kind in kinds:
+            tool = MIRROR_SOURCES[kind]
+            pages = fetch_pages(self._fetch, tool, paged=tool in self.paged)
+            counts[kind] = self.update_pages(kind, pages)
+        return counts
+
+    def update(self, kind: str, response: Any) -> dict:
+        """Merge one list response into the index (see update_pages())."""
+        return self.update_pages(kind, [response])
+
+    def update_pages(self, kind: str, pages: Sequence[Any]) -> dict:
+        """Merge the pages listing every entity of a kind into the index.
+
+        Returns:
+            Counts of added, updated, removed and unchanged entities, or
+            {"skipped": True} when the same response objects were already indexed.
+        """
+        if kind not in INDEXED_KINDS:
+            raise ValueError(f"Unknown inventory kind: {kind}")
+        with self._lock:
+            last = self._last_pages.get(kind)
+            if last is not None and len(last) == len(pages) and all(map(operator.is_, last, pages)):
+                return {"skipped": True}
+
+            counts = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+            seen = set()
+            self._truncated_kinds.discard(kind)
+            items = [item for page in pages for item in response_items(page)]
+            for item in items:
+                source = (kind, str(item["id"]))
+                seen.add(source)
+                digest = content_hash(item)
+                previous = self._entries.get(source)
+                if previous and previous[0] == digest:
+                    counts["unchanged"] += 1
+                    continue
+                if previous:
+                    self._unindex(source)
+                elif self.approx_bytes >= self.max_bytes:
+                    self._truncated_kinds.add(kind)
+                    continue
+                self._index(source, digest, item)
+                counts["updated" if previous else "added"] += 1
+
+            for source in [s for s in self._entries if s[0] == kind and s not in seen]:
+                self._unindex(source)
+                counts["removed"] += 1
+
+            self._last_pages[kind] = list(pages)
+        return counts
+
+    def _index(self, source: tuple, digest: str, item: dict) -> None:
+        """Add postings for one entity."""
+        kind, entity_id = source
+        keys: list[tuple[PrefixTrie, str]] = []
+        if kind == "hosts":
+            host_id = entity_id
+            ips = [ip for _, ip in host_interfaces(item) if ip]
+            for token in tokenize(item.get("hostname")) | tokenize(item.get("name")):
+                keys.append((self.names, token))
+            keys.extend((self.ips, ip) for ip in ips)
+            for tag in item.get("tags") or []:
+                tag = tag.get("name") or tag.get("id") if isinstance(tag, dict) else tag
+                if tag:
+                    keys.append((self.tags, str(tag).lower()))
+            self.hosts[host_id] = {
+                "id": host_id,
+                "name": item.get("name"),
+                "hostname": item.get("hostname"),
+                "ips": ips,
+            }
+        else:
+            host_id = item.get("host_id")
+            if not host_id:
+                self._entries[source] = (digest, keys)
+                return
+            host_id = str(host_id)
+            if kind == "ports":
+                number, _ = port_number(item)
+                if number is not None:
+                    keys.append((self.ports, str(number)))
+            else:
+                for token in tokenize(item.get("name")):
+                    keys.append((self.services, token))
+
+        for trie, key in keys:
+            trie.add(key, source, host_id)
+        self._entries[source] = (digest, keys)
+
+    def _unindex(self, source: tuple) -> None:
+        """Remove every posting contributed by one entity."""
+        _, keys = self._entries.pop(source)
+        for trie, key in keys:
+            trie.remove(key, source)
+        if source[0] == "hosts":
+            self.hosts.pop(source[1], None)
+
+    def search(
+        self,
+        query: str | None = None,
+        ip_prefix: str | None = None,
+        port: int | None = None,
+        service: str | None = None,
+        tag: str | None = None,
+        limit: int = DEFAULT_SEARCH_LIMIT,
+    ) -> list[dict]:
+        """Return hosts matching every given criterion.
+
+        Args:
+            query: Hostname/name text; every token must prefix-match a host token.
+            ip_prefix: Leading part of an interface IP address.
+            port: Exact open port number.
+            service: Service name; every token must prefix-match.
+            tag: Exact tag name or id (case-insensitive).
+            limit: Maximum hosts to return.
+        """
+        with self._lock:
+            candidates: set[str] | None = None
+
+            def narrow(hosts: set[str]) -> None:
+                nonlocal candidates
+                candidates = hosts if candidates is None else candidates & hosts
+
+            for token in tokenize(query):
+                narrow(self.names.find(token))
+            if ip_prefix:
+                narrow(self.ips.find(str(ip_prefix)))
+            if port is not None:
+                narrow(self.ports.exact(str(int(port))))
+            for token in tokenize(service):
+                narrow(self.services.find(token))
+            if tag:
+                narrow(self.tags.exact(str(tag).lower()))
+
+            if candidates is None:
+                candidates = set(self.hosts)
+            limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
+            return [
+                dict(self.hosts[host_id])
+                for host_id in sorted(candidates)[:limit]
+                if host_id in self.hosts
+            ]
+
+    def stats(self) -> dict:
+        """Return entity counts and memory usage."""
+        with self._lock:
+            entities = {kind: 0 for kind in INDEXED_KINDS}
+            for kind, _ in self._entries:
+                entities[kind] += 1
+            return {
+                "entities": entities,
+                "approx_bytes": self.approx_bytes,
+                "max_bytes": self.max_bytes,
+                "truncated": self.truncated,
+            }
+
+    def handle_search(self, args: dict, confirm: str | None = None, dry_run: bool = False) -> dict:
+        """Serve search_inventory, refreshing the lists the search reads first."""
+        kinds = ["hosts"]
+        if args.get("port") is not None:
+            kinds.append("ports")
+        if args.get("service"):
+            kinds.append("services")
+        for kind in kinds:
+            if kind not in self.kinds:
+                raise ValueError(f"Cannot search {kind}: {MIRROR_SOURCES[kind]} is not available")
+        self.refresh(kinds)
+        hosts = self.search(
+            query=args.get("query"),
+            ip_prefix=args.get("ip_prefix"),
+            port=args.get("port"),
+            service=args.get("service"),
+            tag=args.get("tag"),
+            limit=args.get("limit") or DEFAULT_SEARCH_LIMIT,
+        )
+        return {"count": len(hosts), "hosts": hosts, "index": self.stats()}
+
+
+def search_tools() -> dict:
+    """Return meta-tool definitions served by the inventory index."""
+    return {
+        SEARCH_INVENTORY_TOOL: {
+            "kind": "meta",
+            "description": (
+                "Search hosts by partial hostname, IP prefix, open port, service name or tag "
+                "using a local index of Scanopy inventory."
+            ),
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Partial hostname or name"},
+                    "ip_prefix": {"type": "string", "description": "e.g. '10.0.3.'"},
+                    "port": {"type": "integer", "description": "Hosts exposing this port"},
+                    "service": {"type": "string", "description": "Hosts running this service"},
+                    "tag": {"type": "string", "description": "Hosts carrying this tag"},
+                    "limit": {"type": "integer", "maximum": MAX_SEARCH_LIMIT},
+                },
+            },
+        },
+    }
@@ -1,7 +1,18 @@
 """MCP server for Scanopy API."""
 
+import contextvars
+import time
+from collections.abc import Callable, Mapping, MutableMapping
+from concurrent.futures import ThreadPoolExecutor
+
 from scanopy_mcp.client import ScanopyClient
+from scanopy_mcp.deadlines import deadline
+from scanopy_mcp.idempotency import WriteLedger, idempotency_key, idempotent
+from scanopy_mcp.metrics import Metrics
 from scanopy_mcp.policy import PolicyGuard
+from scanopy_mcp.tool_registry import BATCH_CALL_TOOL, BATCH_MAX_CALLS, ToolRegistry
+from scanopy_mcp.tool_spec import ToolSpec, as_tool_spec
+from scanopy_mcp.tracing import Tracer
 
 
 class ScanopyMCPServer:
@@ -9,26 +20,102 @@ class ScanopyMCPServer:
 
     def __init__(
         self,
-        tools: dict,
+        tools: MutableMapping[str, ToolSpec | Mapping],
         client: ScanopyClient | None = None,
         guard: PolicyGuard | None = None,
+        metrics: Metrics | None = None,
+        tracer: Tracer | None = None,
+        batch_concurrency: int = 8,
+        registry: ToolRegistry | None = None,
+        deadline_s: float = 0.0,
+        write_ledger: WriteLedger | None = None,
     ):
         """Initialize the MCP server.
 
         Args:
-            tools: Dictionary of registered tools from ToolRegistry.
+            tools: Registered tools from ToolRegistry; tools given in dict form
+                are converted to ToolSpecs.
             client: Optional HTTP client for making requests.
             guard: Optional policy guard for write operations.
+            metrics: Optional metrics registry for call counts and latencies.
+            tracer: Optional tracer for tool call spans.
+            batch_concurrency: Max concurrent calls within one batch_call.
+            registry: Optional registry the tools came from, used to apply spec refreshes.
+            deadline_s: Time budget of each call, shared by all the upstream
+                attempts made for it, including batch entries (0 for none).
+            write_ledger: Optional ledger answering replayed writes with
+                their recorded result instead of sending them again.
         """
-        self._tools = tools
+        if isinstance(tools, dict):
+            tools = {name: as_tool_spec(name, tool) for name, tool in tools.items()}
+        self._tools: MutableMapping[str, ToolSpec] = tools
         self._client = client
         self._guard = guard
+        self.metrics = metrics if metrics is not None else Metrics()
+        self.tracer = tracer if tracer is not None else Tracer()
+        self.batch_concurrency = max(1, batch_concurrency)
+        self._meta_handlers = {BATCH_CALL_TOOL: self._batch_call}
+        self._registry = registry
+        self.deadline_s = deadline_s
+        self._ledger = write_ledger
+
+    def register_meta_tool(
+        self, name: str, meta: ToolSpec | Mapping, handler: Callable[..., dict]
+    ) -> None:
+        """Expose a locally served meta-tool next to the OpenAPI tools.
+
+        Args:
+            name: Tool name.
+            meta: ToolSpec, or dict with `kind: "meta"`, description and input_schema.
+            handler: Called as handler(args, confirm=..., dry_run=...).
+
+        Raises:
+            ValueError: If a tool with the same name already exists.
+        """
+        if name in self._tools:
+            raise ValueError(f"Duplicate operationId: {name}")
+        self._tools[name] = as_tool_spec(name, meta)
+        self._meta_handlers[name] = handler
+
+    def refresh_spec(self, openapi_spec: dict, registry: ToolRegistry | None = None) -> dict:
+        """Apply a reloaded OpenAPI spec, rebuilding only changed tools.
+
+        Meta-tools are kept. The tool table is swapped in one assignment, so
+        concurrent calls see either the old or the new set.
 
-    def tools_list(self) -> dict:
+        Args:
+            openapi_spec: The freshly loaded OpenAPI specification.
+            registry: Optional registry already built for the new spec (e.g.
+                shared with other tenants); the current one is left untouched.
+
+        Returns:
+            Sorted operationIds that were added, removed and changed.
+
+        Raises:
+            ValueError: If the server has no registry or a tool name clashes.
+        """
+        if self._registry is None:
+            raise ValueError("Server was built without a tool registry")
+        if registry is None:
+            changes = self._registry.refresh(openapi_spec)
+        else:
+            changes = registry.changes_since(self._registry)
+            self._registry = registry
+        if any(changes.values()):
+            tools = self._registry.built_tools()
+            for name, meta in self._tools.items():
+                if name in self._meta_handlers:
+                    if name in tools:
+                        raise ValueError(f"Duplicate operationId: {name}")
+                    tools[name] = meta
+            self._tools = tools
+        return changes
+
+    def tools_list(self) -> MutableMapping[str, ToolSpec]:
         """List all available tools.
 
         Returns:
-            Dictionary of tool metadata.
+            Mapping of tool names to ToolSpecs.
         """
         return self._tools
 
@@ -51,23 +138,130 @@ class ScanopyMCPServer:
         if name not in self._tools:
             raise ValueError(f"Tool not found: {name}")
 
+        start = time.perf_counter()
+        with (
+            self.metrics.tool(name),
+            self.tracer.span("mcp.tools_call", **{"mcp.tool": name}),
+            deadline(self.deadline_s),
+        ):
+            try:
+                result = self._call(name, args, confirm=confirm, dry_run=dry_run)
+            except Exception:
+                self.metrics.record_call(name, error=True)
+                raise
+            finally:
+                self.metrics.observe("total", time.perf_counter() - start)
+        self.metrics.record_call(name)
+        return result
+
+    def _call(self, name: str, args: dict, confirm: str | None, dry_run: bool) -> dict:
+        """Validate, authorize and execute a registered tool."""
         tool = self._tools[name]
-        method = tool["method"]
-        path = tool["path"]
-        required = tool.get("input_schema", {}).get("required", []) or []
-        missing = [field for field in required if field not in args]
-        if missing:
-            missing_list = ", ".join(missing)
-            raise ValueError(f"Missing required fields: {missing_list}")
 
-        is_write = method in {"POST", "PUT", "PATCH", "DELETE"}
+        with self.metrics.timer("validate"):
+            missing = sorted(field for field in tool.required if field not in args)
+            if missing:
+                missing_list = ", ".join(missing)
+                raise ValueError(f"Missing required fields: {missing_list}")
+
+            if tool.is_meta:
+                handler = self._meta_handlers.get(name)
+                if handler is None:
+                    raise ValueError(f"No handler for meta tool: {name}")
+            else:
+                handler = None
+                method = tool.method
+                path = tool.path
 
-        if dry_run and is_write:
-            return {"dry_run": True, "request": {"method": method, "path": path, "args": args}}
+                if dry_run and tool.is_write:
+                    return {
+                        "dry_run": True,
+                        "request": {"method": method, "path": path, "args": args},
+                    }
 
-        # Enforce policy for write operations
-        if is_write and self._guard:
-            self._guard.enforce_write(name, confirm=confirm)
+                # Enforce policy for write operations
+                if tool.is_write and self._guard:
+                    self._guard.enforce_write(name, confirm=confirm)
+
+        if handler is not None:
+            return handler(args, confirm=confirm, dry_run=dry_run)
+
+        if tool.is_write:
+            return self._call_write(name, method, path, args)
 
         # Pass all arguments - client will extract path params from them
         return self._client.request(method, path, json=args, params=args)
+
+    def _call_write(self, name: str, method: str, path: str, args: dict) -> dict:
+        """Send a write with its idempotency key, deduplicating replays.
+
+        A replay answered from the ledger is marked `"deduplicated": true`.
+        """
+        key = idempotency_key(name, args)
+
+        def send() -> dict:
+            with idempotent(key):
+                return self._client.request(method, path, json=args, params=args)
+
+        if self._ledger is None:
+            return send()
+        result, replayed = self._ledger.run(key, send)
+        if not replayed:
+            return result
+        if isinstance(result, dict):
+            return {**result, "deduplicated": True}
+        return {"data": result, "deduplicated": True}
+
+    def _batch_call(self, args: dict, confirm: str | None, dry_run: bool) -> dict:
+        """Run many tool calls concurrently with a bounded worker count.
+
+        Each entry goes through tools_call, so validation, dry-run and policy
+        rules apply per item. Write entries must carry their own 'confirm'.
+
+        Returns:
+            Per-item results in request order plus success/failure counts.
+
+        Raises:
+            ValueError: If 'calls' is not a list or exceeds the batch limit.
+        """
+        calls = args.get("calls")
+        if not isinstance(calls, list):
+            raise ValueError("'calls' must be a list")
+        if len(calls) > BATCH_MAX_CALLS:
+            raise ValueError(f"batch_call accepts at most {BATCH_MAX_CALLS} calls")
+        if not calls:
+            return {"results": [], "succeeded": 0, "failed": 0}
+
+        def run_one(index: int, entry: dict) -> dict:
+            name = entry.get("name") if isinstance(entry, dict) else None
+            item = {"index": index, "name": name}
+            try:
+                if not name:
+                    raise ValueError("Missing 'name' in batch entry")
+                tool = self._tools.get(name)
+                if tool is not None and tool.is_meta:
+                    raise ValueError(f"Meta tool cannot be batched: {name}")
+                item_args = dict(entry.get("arguments") or {})
+                item_dry_run = bool(item_args.pop("dry_run", dry_run))
+                item_confirm = item_args.pop("confirm", None)
+                item["result"] = self.tools_call(
+                    name, item_args, confirm=item_confirm, dry_run=item_dry_run
+                )
+                item["ok"] = True
+            except Exception as e:
+                item["ok"] = False
+                item["error"] = str(e)
+            return item
+
+        workers = min(self.batch_concurrency, len(calls))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch_call") as pool:
+            # Each task runs in a copy of this context so metrics and trace
+            # spans stay attributed to the batch
+            futures = [
+                pool.submit(contextvars.copy_context().run, run_one, index, entry)
+                for index, entry in enumerate(calls)
+            ]
+            results = [future.result() for future in futures]
+
+        succeeded = sum(1 for item in results if item["ok"])
+        return {"results": results, "succeeded": succeeded, "failed": len(results) - succeeded}
@@ -1,34 +1,274 @@
 """Session helper for Scanopy API."""
 
+import json
 import os
-from typing import Any
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, TypeVar
 
 import httpx
 
+# Assumed session lifetime when the login response does not state one
+DEFAULT_SESSION_TTL_S = 3600.0
+
+# A session this close to expiry is renewed before it is handed out
+REFRESH_MARGIN_S = 60.0
+
+# Seconds before a failed renewal of a still-valid session is retried
+RENEW_RETRY_S = 5.0
+
+T = TypeVar("T")
+
+
+def default_cache_path() -> str:
+    """Return where login sessions are persisted unless SCANOPY_SESSION_CACHE is set."""
+    base = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "scanopy-mcp", "session.json")
+
+
+class SessionManager:
+    """Log in to Scanopy once and reuse the session id until it expires.
+
+    The session id is cached in memory with its expiry and, when a cache path
+    is set, persisted to a file readable only by the current user so the next
+    run can skip the login. A session close to expiry is renewed proactively;
+    callers that hit a 401 should call invalidate() (or use call()). Concurrent
+    callers share a single in-progress login.
+    """
+
+    def __init__(
+        self,
+        login_url: str,
+        user: str,
+        password: str,
+        cache_path: str | None = None,
+        ttl_s: float = DEFAULT_SESSION_TTL_S,
+        refresh_margin_s: float = REFRESH_MARGIN_S,
+        timeout_s: float = 10.0,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize the manager.
+
+        Args:
+            login_url: URL to POST credentials to.
+            user: Login email.
+            password: Login password (never persisted).
+            cache_path: Optional file where the session id and expiry are kept.
+            ttl_s: Session lifetime assumed when the server does not send one.
+            refresh_margin_s: Renew sessions expiring within this many seconds.
+            timeout_s: Login request timeout in seconds.
+            clock: Wall-clock time source (expiries are persisted).
+        """
+        self.login_url = login_url
+        self.user = user
+        self._password = password
+        self.cache_path = cache_path
+        self.ttl_s = ttl_s
+        self.refresh_margin_s = refresh_margin_s
+        self.timeout_s = timeout_s
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._session_id: str | None = None
+        self._expires_at = 0.0
+        self._logging_in = False
+        self._generation = 0
+        self._error: BaseException | None = None
+        self._retry_at = 0.0
+        self.logins = 0
+        self._load()
+
+    def session_id(self) -> str:
+        """Return a valid session id, logging in if needed.
+
+        Raises:
+            httpx.HTTPError: If the login fails and no valid session is cached.
+            ValueError: If the login response carries no session id.
+        """
+        with self._cond:
+            while True:
+                now = self._clock()
+                if self._session_id and now < self._expires_at - self.refresh_margin_s:
+                    return self._session_id
+                if self._session_id and now < self._expires_at:
+                    if self._logging_in or now < self._retry_at:
+                        # Still valid while another caller renews it
+                        return self._session_id
+                if not self._logging_in:
+                    break
+                generation = self._generation
+                while self._logging_in and self._generation == generation:
+                    self._cond.wait()
+                if self._error is not None and self._generation == generation + 1:
+                    raise self._error
+            self._logging_in = True
+            stale, stale_expiry = self._session_id, self._expires_at
+
+        error: BaseException | None = None
+        try:
+            session_id, expires_at = self._login()
+        except Exception as exc:
+            error = exc
+
+        with self._cond:
+            self._logging_in = False
+            self._generation += 1
+            self._error = error
+            if error is None:
+                self._session_id, self._expires_at = session_id, expires_at
+            else:
+                self._retry_at = self._clock() + RENEW_RETRY_S
+            self._cond.notify_all()
+
+        if error is not None:
+            if stale and self._clock() < stale_expiry:
+                # A failed proactive renewal keeps the current session
+                return stale
+            raise error
+        self._save()
+        return session_id
+
+    def invalidate(self, session_id: str | None = None) -> None:
+        """Forget a session the server rejected (e.g. with 401).
+
+        Args:
+            session_id: The rejected id; ignored if a newer session replaced it.
+        """
+        with self._cond:
+            if session_id is not None and session_id != self._session_id:
+                return
+            self._session_id = None
+            self._expires_at = 0.0
+        if self.cache_path:
+            try:
+                os.remove(self.cache_path)
+            except FileNotFoundError:
+                pass
+
+    def call(self, func: Callable[[str], T]) -> T:
+        """Run func(session_id), logging in again once if it raises a 401."""
+        session_id = self.session_id()
+        try:
+            return func(session_id)
+        except httpx.HTTPStatusError as exc:
+            if exc.response.status_code != 401:
+                raise
+        self.invalidate(session_id)
+        return func(self.session_id())
+
+    def _login(self) -> tuple[str, float]:
+        """POST the credentials and return (session_id, expires_at)."""
+        self.logins += 1
+        with httpx.Client(timeout=self.timeout_s) as client:
+            resp = client.post(
+                self.login_url, json={"email": self.user, "password": self._password}
+            )
+            resp.raise_for_status()
+        now = self._clock()
+        data: Any = None
+        if resp.headers.get("content-type", "").startswith("application/json"):
+            data = resp.json()
+        data = data if isinstance(data, dict) else {}
+
+        session_id = data.get("session_id") or resp.cookies.get("session_id")
+        if not session_id:
+            raise ValueError("Login response did not contain a session_id")
+
+        expires_at = now + self.ttl_s
+        if isinstance(data.get("expires_in"), (int, float)):
+            expires_at = now + data["expires_in"]
+        else:
+            for cookie in resp.cookies.jar:
+                if cookie.name == "session_id" and cookie.expires:
+                    expires_at = float(cookie.expires)
+        return session_id, expires_at
+
+    def _load(self) -> None:
+        """Adopt a persisted session for the same login URL and user."""
+        if not self.cache_path:
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if (
+            isinstance(data, dict)
+            and data.get("login_url") == self.login_url
+            and data.get("user") == self.user
+            and isinstance(data.get("session_id"), str)
+            and isinstance(data.get("expires_at"), (int, float))
+            and data["expires_at"] > self._clock()
+        ):
+            self._session_id = data["session_id"]
+            self._expires_at = float(data["expires_at"])
+
+    def _save(self) -> None:
+        """Persist the current session with owner-only permissions."""
+        if not self.cache_path:
+            return
+        with self._cond:
+            data = {
+                "login_url": self.login_url,
+                "user": self.user,
+                "session_id": self._session_id,
+                "expires_at": self._expires_at,
+            }
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, self.cache_path)
+
+
+_managers: dict[tuple[str, str, str, str], SessionManager] = {}
+_managers_lock = threading.Lock()
+
+
+def session_manager() -> SessionManager | None:
+    """Return the shared SessionManager for the SCANOPY_LOGIN_* variables, if set."""
+    login_url = os.getenv("SCANOPY_LOGIN_URL")
+    user = os.getenv("SCANOPY_LOGIN_USER")
+    password = os.getenv("SCANOPY_LOGIN_PASSWORD")
+    if not (login_url and user and password):
+        return None
+
+    cache_path = os.getenv("SCANOPY_SESSION_CACHE", default_cache_path())
+    key = (login_url, user, password, cache_path)
+    with _managers_lock:
+        manager = _managers.get(key)
+        if manager is None:
+            manager = SessionManager(
+                login_url,
+                user,
+                password,
+                cache_path=cache_path or None,
+                ttl_s=float(os.getenv("SCANOPY_SESSION_TTL", str(DEFAULT_SESSION_TTL_S))),
+            )
+            _managers[key] = manager
+    return manager
+
 
 def get_session_id() -> str | None:
     """Return a session_id using env vars or optional login.
 
     Order:
     1) SCANOPY_SESSION_ID
-    2) SCANOPY_LOGIN_URL + SCANOPY_LOGIN_USER + SCANOPY_LOGIN_PASSWORD
+    2) SCANOPY_LOGIN_URL + SCANOPY_LOGIN_USER + SCANOPY_LOGIN_PASSWORD, via a
+       shared SessionManager that caches and renews the session
     """
     session_id = os.getenv("SCANOPY_SESSION_ID")
     if session_id:
         return session_id
 
-    login_url = os.getenv("SCANOPY_LOGIN_URL")
-    user = os.getenv("SCANOPY_LOGIN_USER")
-    password = os.getenv("SCANOPY_LOGIN_PASSWORD")
-    if not (login_url and user and password):
+    manager = session_manager()
+    if manager is None:
+        return None
+    try:
+        return manager.session_id()
+    except ValueError:
+        # Login succeeded but returned no session id
         return None
-
-    with httpx.Client(timeout=10.0) as client:
-        resp = client.post(login_url, json={"email": user, "password": password})
-        resp.raise_for_status()
-        data: Any = None
-        if resp.headers.get("content-type", "").startswith("application/json"):
-            data = resp.json()
-        if isinstance(data, dict) and data.get("session_id"):
-            return data["session_id"]
-        return resp.cookies.get("session_id")
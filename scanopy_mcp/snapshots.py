@@ -0,0 +1,252 @@
+"""Inventory snapshots of per-entity content hashes and their diffs."""
+
+import json
+import os
+import re
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Iterable
+from typing import Any
+
+from scanopy_mcp.hashing import content_hash
+from scanopy_mcp.mirror import MIRROR_SOURCES, fetch_pages, response_items
+
+# Meta-tool names served by the snapshot store
+SNAPSHOT_INVENTORY_TOOL = "snapshot_inventory"
+LIST_SNAPSHOTS_TOOL = "list_snapshots"
+DIFF_SNAPSHOTS_TOOL = "diff_snapshots"
+
+# Snapshots kept in memory (oldest are dropped; persisted files are kept)
+MAX_SNAPSHOTS = 50
+
+# Entities listed per added/removed/changed group in a diff
+DEFAULT_DIFF_LIMIT = 200
+
+_SNAPSHOT_ID_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+def entity_digest(item: dict) -> dict:
+    """Return the stored form of an entity: overall hash, label and field hashes."""
+    return {
+        "hash": content_hash(item),
+        "name": item.get("name") or item.get("hostname"),
+        "fields": {key: content_hash(value)[:12] for key, value in item.items()},
+    }
+
+
+def diff_entities(old: dict[str, dict], new: dict[str, dict], limit: int) -> dict:
+    """Compare two {id: digest} maps of one kind in linear time.
+
+    Returns:
+        Counts plus up to `limit` added, removed and changed entities; changed
+        entries name the top-level fields whose values differ.
+    """
+    added = [entity_id for entity_id in new if entity_id not in old]
+    removed = [entity_id for entity_id in old if entity_id not in new]
+    changed = [
+        entity_id
+        for entity_id, digest in new.items()
+        if entity_id in old and old[entity_id]["hash"] != digest["hash"]
+    ]
+
+    def changed_fields(entity_id: str) -> list[str]:
+        before, after = old[entity_id]["fields"], new[entity_id]["fields"]
+        return sorted(k for k in before.keys() | after.keys() if before.get(k) != after.get(k))
+
+    return {
+        "counts": {"added": len(added), "removed": len(removed), "changed": len(changed)},
+        "added": [{"id": i, "name": new[i]["name"]} for i in sorted(added)[:limit]],
+        "removed": [{"id": i, "name": old[i]["name"]} for i in sorted(removed)[:limit]],
+        "changed": [
+            {"id": i, "name": new[i]["name"], "fields": changed_fields(i)}
+            for i in sorted(changed)[:limit]
+        ],
+    }
+
+
+class SnapshotStore:
+    """Record per-entity content hashes of list tools and diff them.
+
+    Snapshots hold hashes rather than entities, so a diff between two points
+    in time returns only the ids and field names that changed.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str, dict], Any],
+        directory: str | None = None,
+        kinds: Iterable[str] | None = None,
+        paged: Iterable[str] = (),
+    ):
+        """Initialize the store.
+
+        Args:
+            fetch: Callable taking a list tool name and its arguments and
+                returning its response.
+            directory: Optional directory where snapshots are persisted as JSON.
+            kinds: Kinds captured when a snapshot names none (default: all).
+            paged: List tools that accept `limit` and `offset`.
+        """
+        self._fetch = fetch
+        self.directory = directory
+        self.kinds = list(kinds or MIRROR_SOURCES)
+        self.paged = frozenset(paged)
+        self._lock = threading.Lock()
+        self._snapshots: OrderedDict[str, dict] = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def take(self, kinds: Iterable[str] | None = None, label: str | None = None) -> dict:
+        """Fetch the given kinds and store their entity hashes.
+
+        Returns:
+            Summary of the new snapshot.
+
+        Raises:
+            ValueError: If an unknown kind is requested, or paging of a list
+                does not advance.
+        """
+        kinds = list(kinds or self.kinds)
+        unknown = [kind for kind in kinds if kind not in MIRROR_SOURCES]
+        if unknown:
+            raise ValueError(f"Unknown inventory kind: {', '.join(unknown)}")
+
+        entities = {}
+        for kind in kinds:
+            tool = MIRROR_SOURCES[kind]
+            pages = fetch_pages(self._fetch, tool, paged=tool in self.paged)
+            entities[kind] = {
+                str(item["id"]): entity_digest(item)
+                for page in pages
+                for item in response_items(page)
+            }
+        now = time.time()
+        snapshot_id = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime(now)) + "-" + secrets.token_hex(2)
+        snapshot = {"id": snapshot_id, "created_at": now, "label": label, "entities": entities}
+
+        with self._lock:
+            self._snapshots[snapshot_id] = snapshot
+            while len(self._snapshots) > MAX_SNAPSHOTS:
+                self._snapshots.popitem(last=False)
+        if self.directory:
+            path = os.path.join(self.directory, f"{snapshot_id}.json")
+            tmp = f"{path}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        return _summary(snapshot)
+
+    def get(self, snapshot_id: str) -> dict:
+        """Return a snapshot from memory or the snapshot directory.
+
+        Raises:
+            ValueError: If the snapshot does not exist.
+        """
+        with self._lock:
+            snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is not None:
+            return snapshot
+        if self.directory and _SNAPSHOT_ID_RE.match(snapshot_id):
+            path = os.path.join(self.directory, f"{snapshot_id}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+        raise ValueError(f"Unknown snapshot: {snapshot_id}")
+
+    def summaries(self) -> list[dict]:
+        """Return summaries of all known snapshots, oldest first."""
+        with self._lock:
+            known = dict(self._snapshots)
+        summaries = {snapshot_id: _summary(s) for snapshot_id, s in known.items()}
+        if self.directory:
+            for filename in os.listdir(self.directory):
+                snapshot_id = filename[: -len(".json")]
+                if filename.endswith(".json") and snapshot_id not in summaries:
+                    summaries[snapshot_id] = _summary(self.get(snapshot_id))
+        return sorted(summaries.values(), key=lambda s: (s["created_at"], s["id"]))
+
+    def diff(self, old_id: str, new_id: str, limit: int = DEFAULT_DIFF_LIMIT) -> dict:
+        """Diff two snapshots, kind by kind, over the kinds both contain."""
+        old, new = self.get(old_id), self.get(new_id)
+        kinds = [kind for kind in new["entities"] if kind in old["entities"]]
+        return {
+            "from": old_id,
+            "to": new_id,
+            "kinds": {
+                kind: diff_entities(old["entities"][kind], new["entities"][kind], limit)
+                for kind in kinds
+            },
+        }
+
+    def handle_snapshot(
+        self, args: dict, confirm: str | None = None, dry_run: bool = False
+    ) -> dict:
+        """Serve snapshot_inventory."""
+        return self.take(args.get("kinds"), label=args.get("label"))
+
+    def handle_list(self, args: dict, confirm: str | None = None, dry_run: bool = False) -> dict:
+        """Serve list_snapshots."""
+        return {"snapshots": self.summaries()}
+
+    def handle_diff(self, args: dict, confirm: str | None = None, dry_run: bool = False) -> dict:
+        """Serve diff_snapshots; a missing 'to' snapshots the current inventory first."""
+        old_id = args["from"]
+        new_id = args.get("to")
+        if not new_id:
+            kinds = list(self.get(old_id)["entities"])
+            new_id = self.take(kinds)["id"]
+        return self.diff(old_id, new_id, limit=args.get("limit") or DEFAULT_DIFF_LIMIT)
+
+
+def _summary(snapshot: dict) -> dict:
+    """Return a snapshot without its entity hashes."""
+    return {
+        "id": snapshot["id"],
+        "created_at": snapshot["created_at"],
+        "label": snapshot.get("label"),
+        "counts": {kind: len(items) for kind, items in snapshot["entities"].items()},
+    }
+
+
+def snapshot_tools() -> dict:
+    """Return meta-tool definitions served by the snapshot store."""
+    kinds = sorted(MIRROR_SOURCES)
+    return {
+        SNAPSHOT_INVENTORY_TOOL: {
+            "kind": "meta",
+            "description": (
+                "Record a snapshot of inventory content hashes (hosts, services, ports, "
+                "subnets, networks) to diff against later."
+            ),
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "kinds": {"type": "array", "items": {"type": "string", "enum": kinds}},
+                    "label": {"type": "string", "description": "Free-form note, e.g. 'pre-scan'"},
+                },
+            },
+        },
+        LIST_SNAPSHOTS_TOOL: {
+            "kind": "meta",
+            "description": "List recorded inventory snapshots.",
+            "input_schema": {"type": "object", "properties": {}},
+        },
+        DIFF_SNAPSHOTS_TOOL: {
+            "kind": "meta",
+            "description": (
+                "Show entities added, removed or changed between two snapshots "
+                "(omit 'to' to compare against the current inventory)."
+            ),
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "from": {"type": "string", "description": "Older snapshot id"},
+                    "to": {"type": "string", "description": "Newer snapshot id"},
+                    "limit": {"type": "integer", "description": "Max entities per group"},
+                },
+                "required": ["from"],
+            },
+        },
+    }
@@ -0,0 +1,246 @@
+"""Streaming OpenAPI parser that keeps only what the tool registry uses."""
+
+import codecs
+import json
+import re
+from collections.abc import Iterable, Iterator
+
+# Top-level sections kept; components keep only their schemas
+_TOP_KEYS = frozenset({"openapi", "info", "paths", "components"})
+
+# Path item and operation fields kept (everything else, notably responses,
+# is skipped without being decoded)
+_PATH_ITEM_KEYS = frozenset({"parameters"})
+_METHODS = frozenset({"get", "head", "post", "put", "patch", "delete"})
+_OPERATION_KEYS = frozenset({"operationId", "summary", "tags", "parameters", "requestBody"})
+
+# Dropped from kept schemas and parameters, except as property names
+_EXAMPLE_KEYS = frozenset({"example", "examples"})
+_PROPERTY_MAPS = frozenset({"properties", "patternProperties"})
+
+_STRING = re.compile(r'"(?:[^"\\]|\\.)*"', re.DOTALL)
+_SKIP_TO_BRACKET = re.compile(r'(?:[^"{}\[\]]+|"(?:[^"\\]|\\.)*")*', re.DOTALL)
+_SCALAR_END = re.compile(r"[\s,}\]]")
+_NON_WHITESPACE = re.compile(r"\S")
+_DECODABLE = frozenset('{["')
+_DECODER = json.JSONDecoder()
+_INCOMPLETE = object()
+
+# Bytes read per chunk when parsing a file
+READ_CHUNK = 64 * 1024
+
+
+def parse_spec(chunks: Iterable[bytes]) -> dict:
+    """Parse an OpenAPI JSON document from byte chunks, keeping only what tools need.
+
+    Kept: `openapi`, `info`, path items' `parameters` and, per operation,
+    `operationId`, `summary`, `tags`, `parameters` and `requestBody`, plus
+    `components.schemas`. Responses, descriptions of operations and other
+    sections are scanned past without being decoded, and `example(s)` keys
+    are dropped from what is kept. Only the value being decoded and the
+    current chunk are held in memory, never the whole document.
+
+    Raises:
+        ValueError: If the document is not valid JSON or not an object.
+    """
+    reader = _Reader(chunks)
+    spec = {}
+    for key in reader.members():
+        if key not in _TOP_KEYS:
+            reader.skip()
+        elif key == "paths":
+            spec["paths"] = {path: _path_item(reader) for path in reader.members()}
+        elif key == "components":
+            spec["components"] = {}
+            for section in reader.members():
+                if section == "schemas":
+                    spec["components"]["schemas"] = {
+                        name: _strip_examples(reader.value()) for name in reader.members()
+                    }
+                else:
+                    reader.skip()
+        else:
+            spec[key] = reader.value()
+    reader.end()
+    return spec
+
+
+def parse_spec_file(path: str) -> dict:
+    """Stream-parse an OpenAPI JSON file; see parse_spec()."""
+    with open(path, "rb") as f:
+        return parse_spec(iter(lambda: f.read(READ_CHUNK), b""))
+
+
+def _path_item(reader: "_Reader") -> dict:
+    item = {}
+    for key in reader.members():
+        if key in _PATH_ITEM_KEYS:
+            item[key] = _strip_examples(reader.value())
+        elif key.lower() in _METHODS:
+            item[key] = op = {}
+            for field in reader.members():
+                if field in _OPERATION_KEYS:
+                    op[field] = _strip_examples(reader.value())
+                else:
+                    reader.skip()
+        else:
+            reader.skip()
+    return item
+
+
+def _strip_examples(node, in_properties: bool = False):
+    """Drop example(s) keys from a decoded value, in place."""
+    if isinstance(node, dict):
+        for key in list(node):
+            if not in_properties and key in _EXAMPLE_KEYS:
+                del node[key]
+            else:
+                _strip_examples(node[key], key in _PROPERTY_MAPS and not in_properties)
+    elif isinstance(node, list):
+        for value in node:
+            _strip_examples(value)
+    return node
+
+
+class _Reader:
+    """Pull parser over a stream of UTF-8 chunks.
+
+    The buffer keeps only unread text, plus the text of the value being
+    decoded by value(), which is handed to the C JSON decoder in one piece.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks: Iterator[bytes] = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._buf = ""
+        self._pos = 0
+        self._mark: int | None = None
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Append the next chunk, dropping text no longer needed."""
+        if self._eof:
+            return False
+        keep = self._pos if self._mark is None else self._mark
+        if keep:
+            self._buf = self._buf[keep:]
+            self._pos -= keep
+            if self._mark is not None:
+                self._mark = 0
+        chunk = next(self._chunks, None)
+        if chunk is None:
+            self._eof = True
+            self._buf += self._decoder.decode(b"", final=True)
+        else:
+            self._buf += self._decoder.decode(chunk)
+        return True
+
+    def _peek(self) -> str:
+        """Return the next non-whitespace character ('' at the end)."""
+        while True:
+            match = _NON_WHITESPACE.search(self._buf, self._pos)
+            if match is not None:
+                self._pos = match.start()
+                return match.group()
+            self._pos = len(self._buf)
+            if not self._fill():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        if self._peek() != char:
+            raise ValueError(f"Invalid OpenAPI JSON: expected {char!r} at offset {self._pos}")
+        self._pos += 1
+
+    def _string(self) -> str:
+        """Read a JSON string token (the reader is at its opening quote)."""
+        while True:
+            match = _STRING.match(self._buf, self._pos)
+            if match is not None:
+                self._pos = match.end()
+                return json.loads(match.group())
+            if not self._fill():
+                raise ValueError("Invalid OpenAPI JSON: unterminated string")
+
+    def members(self) -> Iterator[str]:
+        """Iterate the keys of an object; the caller consumes each value."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self._peek() != '"':
+                raise ValueError(f"Invalid OpenAPI JSON: expected a key at offset {self._pos}")
+            key = self._string()
+            self._expect(":")
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == "}":
+                return
+            if char != ",":
+                raise ValueError(f"Invalid OpenAPI JSON: expected ',' or '}}' at {self._pos}")
+
+    def skip(self) -> None:
+        """Move past one value."""
+        if self._decoded() is _INCOMPLETE:
+            self._scan()
+
+    def value(self):
+        """Decode one value."""
+        value = self._decoded()
+        if value is not _INCOMPLETE:
+            return value
+        self._mark = self._pos
+        try:
+            self._scan()
+            return json.loads(self._buf[self._mark : self._pos])
+        finally:
+            self._mark = None
+
+    def _decoded(self):
+        """Decode the container or string at the reader if it is wholly buffered.
+
+        The C decoder is far faster than scanning in Python. Values that run
+        past the buffer (and scalars, which may) are left to _scan().
+        """
+        if self._peek() not in _DECODABLE:
+            return _INCOMPLETE
+        try:
+            value, self._pos = _DECODER.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            return _INCOMPLETE
+        return value
+
+    def _scan(self) -> None:
+        """Move past one value without decoding it, reading chunks as needed."""
+        char = self._peek()
+        if char == '"':
+            self._string()
+            return
+        if char not in _DECODABLE:
+            while True:
+                match = _SCALAR_END.search(self._buf, self._pos)
+                if match is not None:
+                    self._pos = match.start()
+                    return
+                if not self._fill():
+                    self._pos = len(self._buf)
+                    return
+        depth = 0
+        while True:
+            # Jump past text and whole strings to the next bracket
+            self._pos = _SKIP_TO_BRACKET.match(self._buf, self._pos).end()
+            if self._pos == len(self._buf) or self._buf[self._pos] == '"':
+                # End of the buffer, possibly inside a string: read on
+                if not self._fill():
+                    raise ValueError("Invalid OpenAPI JSON: unexpected end of document")
+                continue
+            depth += 1 if self._buf[self._pos] in "{[" else -1
+            self._pos += 1
+            if depth == 0:
+                return
+
+    def end(self) -> None:
+        """Check that nothing but whitespace follows the document."""
+        if self._peek():
+            raise ValueError(f"Invalid OpenAPI JSON: extra data at offset {self._pos}")
@@ -1,11 +1,32 @@
 """JSON-RPC stdio server for MCP protocol."""
 
+import contextlib
+import contextvars
 import json
 import sys
+import threading
+import time
+from collections.abc import Callable, Hashable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 
+from scanopy_mcp.cache import uncached
+from scanopy_mcp.cancellation import InFlightRequests, current_token
 from scanopy_mcp.config import Config
-from scanopy_mcp.openapi_loader import OpenAPILoader
+from scanopy_mcp.discovery import (
+    CANCEL_DISCOVERY_TOOL,
+    CREATE_DISCOVERY_TOOL,
+    LIST_DISCOVERIES_TOOL,
+    DiscoveryTracker,
+    extract_id,
+)
+from scanopy_mcp.metrics import Metrics, PrometheusFileWriter
+from scanopy_mcp.profiling import RequestProfiler
+from scanopy_mcp.schema_defs import share_definitions
 from scanopy_mcp.server import ScanopyMCPServer
+from scanopy_mcp.tenant_runtimes import TenantRuntimes
+from scanopy_mcp.tenants import DEFAULT_TENANT
+from scanopy_mcp.tool_search import tool_tags
+from scanopy_mcp.tracing import JsonlSpanExporter, Tracer
 
 
 class MCPStdioServer:
@@ -17,6 +38,7 @@ class MCPStdioServer:
         openapi_url: str,
         allowlist: set[str],
         openapi_spec: dict | None = None,
+        catalogs: dict[str, str] | None = None,
     ):
         """Initialize the stdio server.
 
@@ -25,41 +47,45 @@ class MCPStdioServer:
             openapi_url: URL to fetch OpenAPI spec from.
             allowlist: Set of write operation IDs that are allowed.
             openapi_spec: Optional pre-loaded OpenAPI spec (for testing).
+            catalogs: Optional tenant name -> compiled catalog file; tenants
+                listed here take their tools from the catalog instead of a
+                spec, and their tools are never refreshed.
         """
         self.config = config
         self.openapi_url = openapi_url
         self.allowlist = allowlist
-        self.openapi_spec = openapi_spec
-
-        # Lazy initialization of runtime
-        self._runtime: ScanopyMCPServer | None = None
-
-    def _get_runtime(self) -> ScanopyMCPServer:
-        """Get or create the MCP server runtime.
-
-        Returns:
-            Configured ScanopyMCPServer instance.
-        """
-        if self._runtime is None:
-            # Load OpenAPI spec
-            if self.openapi_spec is None:
-                loader = OpenAPILoader(url=self.openapi_url)
-                spec = loader.load()
-            else:
-                spec = self.openapi_spec
-
-            # Import runtime builder locally to avoid circular imports
-            from scanopy_mcp.runtime import build_runtime
-
-            self._runtime = build_runtime(
-                openapi_spec=spec,
-                allowlist=self.allowlist,
-                base_url=self.config.base_url,
-                api_key=self.config.api_key,
-                confirm_string=self.config.confirm_string,
-            )
-
-        return self._runtime
+        self.metrics = Metrics()
+        self.tracer = Tracer(JsonlSpanExporter(config.trace_file) if config.trace_file else None)
+        self.profiler = RequestProfiler(output_dir=config.profile_dir)
+        if config.profile_next or config.profile_tool:
+            self.profiler.arm(count=config.profile_next, tool=config.profile_tool)
+
+        self.runtimes = TenantRuntimes(
+            config,
+            openapi_url,
+            allowlist,
+            metrics=self.metrics,
+            tracer=self.tracer,
+            openapi_spec=openapi_spec,
+            catalogs=catalogs,
+            on_tools_changed=self._tools_changed,
+        )
+        self.tenants = self.runtimes.tenants
+        self._discoveries: dict[str, DiscoveryTracker] = {}
+        self._discoveries_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._inflight = InFlightRequests()
+
+    def _get_runtime(self, tenant: str | None = None) -> ScanopyMCPServer:
+        """Get or create the MCP server runtime of a tenant (see TenantRuntimes.get())."""
+        return self.runtimes.get(tenant)
+
+    def _tools_changed(self, tenant: str) -> None:
+        """Tell the client that a refreshed spec changed its tenant's tools."""
+        # The client may hold the old list whichever request is running, so
+        # this is not request-scoped
+        if tenant == self.config.tenant:
+            self._write({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
 
     def handle_request(self, request: dict) -> dict | None:
         """Handle a single JSON-RPC request.
@@ -74,15 +100,54 @@ class MCPStdioServer:
         params = request.get("params", {})
         req_id = request.get("id")
 
+        if method == "tools/call" and req_id is not None:
+            # Cancellable by notifications/cancelled; a cancelled call gets no response
+            with self._inflight.track(self._request_key(req_id)) as token:
+                if token.cancelled:
+                    return None
+                response = self._handle_profiled(method, params, req_id)
+            return None if token.cancelled else response
+        return self._handle_profiled(method, params, req_id)
+
+    def _handle_profiled(self, method: str | None, params: dict, req_id: int | None) -> dict | None:
+        """Handle a request, under the profiler if it claims it."""
+        if self.profiler.armed:
+            tool = params.get("name") if method == "tools/call" else None
+            if self.profiler.claim(method, tool):
+                with self.profiler.profile(tool or str(method)):
+                    return self._handle_traced(method, params, req_id)
+        return self._handle_traced(method, params, req_id)
+
+    def _handle_traced(self, method: str | None, params: dict, req_id: int | None) -> dict | None:
+        """Dispatch a request inside a handle_request span."""
+        meta = params.get("_meta") if isinstance(params, dict) else None
+        traceparent = meta.get("traceparent") if isinstance(meta, dict) else None
+        with self.tracer.span(
+            "mcp.handle_request", traceparent=traceparent, **{"rpc.method": str(method)}
+        ) as span:
+            response = self._dispatch(method, params, req_id)
+            if span is not None and response is not None and "error" in response:
+                span.set_error(response["error"]["message"])
+            return response
+
+    def _dispatch(self, method: str | None, params: dict, req_id: int | None) -> dict | None:
+        """Route a JSON-RPC request to its handler and wrap failures as errors."""
         try:
             if method in {"notifications/initialized", "initialized"}:
                 return None
+            if method == "notifications/cancelled":
+                self._handle_cancelled(params)
+                return None
             if method == "initialize":
                 return self._handle_initialize(req_id, params)
             elif method == "tools/list":
                 return self._handle_tools_list(req_id, params)
             elif method == "tools/call":
                 return self._handle_tools_call(req_id, params)
+            elif method == "server/metrics":
+                return self._handle_metrics(req_id, params)
+            elif method == "server/profile":
+                return self._handle_profile(req_id, params)
             else:
                 return {
                     "jsonrpc": "2.0",
@@ -96,6 +161,24 @@ class MCPStdioServer:
                 "error": {"code": -32603, "message": str(e)},
             }
 
+    def _request_key(self, req_id: int | str) -> Hashable:
+        """Key an in-flight request by its JSON-RPC id."""
+        return req_id
+
+    def _tenant(self) -> str:
+        """Return the tenant serving the request being handled (SCANOPY_TENANT)."""
+        return self.config.tenant
+
+    def _handle_cancelled(self, params: dict) -> None:
+        """Handle notifications/cancelled: abort the named in-flight request.
+
+        The request's upstream read is aborted and its connection dropped;
+        unknown or finished requests are ignored, as the spec allows.
+        """
+        request_id = params.get("requestId")
+        if request_id is not None:
+            self._inflight.cancel(self._request_key(request_id), params.get("reason"))
+
     def _handle_initialize(self, req_id: int, params: dict) -> dict:
         """Handle initialize request.
 
@@ -113,7 +196,7 @@ class MCPStdioServer:
                     "version": "0.1.0",
                 },
                 "capabilities": {
-                    "tools": {"listChanged": False},
+                    "tools": {"listChanged": True},
                 },
             },
         }
@@ -124,24 +207,25 @@ class MCPStdioServer:
         Returns:
             JSON-RPC response with list of available tools.
         """
-        runtime = self._get_runtime()
+        runtime = self._get_runtime(self._tenant())
         tools = runtime.tools_list()
 
         # Convert to MCP tool format
         mcp_tools = []
-        for name, meta in tools.items():
-            method = meta.get("method", "GET")
-            is_write = method in {"POST", "PUT", "PATCH", "DELETE"}
-
-            base_schema = meta.get("input_schema") or {"type": "object", "properties": {}}
-            # Copy schema to avoid mutating registry data
+        for name, tool in tools.items():
+            # Tools outside the exposed groups stay callable and findable via
+            # search_tools, so meta-tools are always listed
+            exposed = self.config.tool_tags
+            if exposed and not tool.is_meta and exposed.isdisjoint(tool_tags(tool)):
+                continue
+            # Copy schema properties to avoid mutating registry data
             input_schema = {
                 "type": "object",
-                "properties": dict(base_schema.get("properties", {})),
+                "properties": dict(tool.input_schema.get("properties", {})),
             }
-            required = set(base_schema.get("required", []) or [])
+            required = set(tool.required)
 
-            if is_write:
+            if tool.is_write:
                 input_schema["properties"]["dry_run"] = {
                     "type": "boolean",
                     "description": "If true, skip the write and return the request payload",
@@ -155,18 +239,28 @@ class MCPStdioServer:
             if required:
                 input_schema["required"] = sorted(required)
 
+            # Meta-tools have no method/path and carry their own description
             mcp_tools.append(
                 {
                     "name": name,
-                    "description": f"{meta['method']} {meta['path']}",
+                    "description": tool.title,
                     "inputSchema": input_schema,
                 }
             )
 
+        result = {"tools": mcp_tools}
+        if self.config.compact_schemas:
+            # Emit repeated subschemas once; tools reference them via #/$defs/
+            schemas, defs = share_definitions(tool["inputSchema"] for tool in mcp_tools)
+            for tool, schema in zip(mcp_tools, schemas):
+                tool["inputSchema"] = schema
+            if defs:
+                result["$defs"] = defs
+
         return {
             "jsonrpc": "2.0",
             "id": req_id,
-            "result": {"tools": mcp_tools},
+            "result": result,
         }
 
     def _handle_tools_call(self, req_id: int, params: dict) -> dict:
@@ -188,39 +282,205 @@ class MCPStdioServer:
         arguments = params.get("arguments", {})
         dry_run = bool(arguments.pop("dry_run", False))
         confirm = arguments.pop("confirm", None)
+        tenant = self._tenant()
 
-        runtime = self._get_runtime()
+        runtime = self._get_runtime(tenant)
         result = runtime.tools_call(name, arguments, confirm=confirm, dry_run=dry_run)
+        token = current_token()
+        if token is not None:
+            # Do not serialize a result nobody is waiting for
+            token.raise_if_cancelled()
+
+        if not dry_run:
+            self._track_discovery(name, params, arguments, result, tenant)
+
+        start = time.perf_counter()
+        with self.tracer.span("mcp.serialize"):
+            text = json.dumps(result)
+        self.metrics.observe("serialize", time.perf_counter() - start, tool=name)
 
         return {
             "jsonrpc": "2.0",
             "id": req_id,
             "result": {
-                "content": [{"type": "text", "text": json.dumps(result)}],
+                "content": [{"type": "text", "text": text}],
             },
         }
 
+    def _discovery_tracker(self, tenant: str) -> DiscoveryTracker:
+        """Get or create the discovery status scheduler of a tenant."""
+        with self._discoveries_lock:
+            if tenant not in self._discoveries:
+                self._discoveries[tenant] = DiscoveryTracker(
+                    poll=lambda: self._poll_discoveries(tenant),
+                    min_interval_s=self.config.discovery_poll_min_s,
+                    max_interval_s=self.config.discovery_poll_max_s,
+                )
+            return self._discoveries[tenant]
+
+    def _poll_discoveries(self, tenant: str) -> dict:
+        """List a tenant's discoveries, bypassing fresh cached listings."""
+        with uncached():
+            return self._get_runtime(tenant).tools_call(LIST_DISCOVERIES_TOOL, {})
+
+    def _track_discovery(
+        self,
+        name: str,
+        params: dict,
+        arguments: dict,
+        result: dict,
+        tenant: str = DEFAULT_TENANT,
+    ) -> None:
+        """Start or stop discovery progress tracking after a discovery tool call.
+
+        Tracking starts when create_discovery is called with an MCP
+        `_meta.progressToken`; a successful cancel_discovery ends it.
+        """
+        if name == CREATE_DISCOVERY_TOOL:
+            meta = params.get("_meta") or {}
+            token = meta.get("progressToken") if isinstance(meta, dict) else None
+            discovery_id = extract_id(result)
+            if token is not None and discovery_id:
+                self._discovery_tracker(tenant).track(discovery_id, token, self._notifier())
+        elif name == CANCEL_DISCOVERY_TOOL and tenant in self._discoveries:
+            tracker = self._discoveries[tenant]
+            for key in ("id", "discovery_id", "session_id"):
+                if arguments.get(key) and tracker.cancel(str(arguments[key])):
+                    break
+
+    def _notifier(self) -> Callable[[dict], None]:
+        """Return the callable that delivers notifications for the current request."""
+        return self._write
+
+    def _write(self, message: dict) -> None:
+        """Write one JSON-RPC message to stdout.
+
+        Responses and background notifications share stdout, so writes are
+        serialized to keep each message on its own line.
+        """
+        line = json.dumps(message)
+        with self._write_lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def _handle_metrics(self, req_id: int, params: dict) -> dict:
+        """Handle server/metrics request.
+
+        Args:
+            params: Optional 'format' of "json" (default) or "prometheus".
+
+        Returns:
+            JSON-RPC response with a metrics snapshot.
+        """
+        if params.get("format") == "prometheus":
+            result = {"format": "prometheus", "text": self.metrics.to_prometheus()}
+        else:
+            result = self.metrics.snapshot()
+        return {"jsonrpc": "2.0", "id": req_id, "result": result}
+
+    def _handle_profile(self, req_id: int, params: dict) -> dict:
+        """Handle server/profile request.
+
+        Args:
+            params: 'count' and/or 'tool' arm the profiler for the next N
+                requests or for calls to one tool; optional 'dir' and
+                'memory' control output. 'enabled': false disarms it and
+                empty params only report status.
+
+        Returns:
+            JSON-RPC response with the profiler status.
+        """
+        if params.get("enabled") is False:
+            self.profiler.disarm()
+        elif "count" in params or "tool" in params:
+            self.profiler.arm(
+                count=params.get("count"),
+                tool=params.get("tool"),
+                output_dir=params.get("dir"),
+                memory=bool(params.get("memory", True)),
+            )
+        return {"jsonrpc": "2.0", "id": req_id, "result": self.profiler.status()}
+
     def run(self) -> None:
         """Run the stdio server.
 
         Reads JSON-RPC requests from stdin and writes responses to stdout.
         """
-        for line in sys.stdin:
-            line = line.strip()
-            if not line:
-                continue
-
-            try:
-                request = json.loads(line)
-                response = self.handle_request(request)
-                if response is not None:
-                    print(json.dumps(response))
-                    sys.stdout.flush()
-            except json.JSONDecodeError:
-                error_response = {
-                    "jsonrpc": "2.0",
-                    "id": None,
-                    "error": {"code": -32700, "message": "Parse error"},
-                }
-                print(json.dumps(error_response))
-                sys.stdout.flush()
+        with self._background():
+            self._serve(sys.stdin)
+
+    @contextlib.contextmanager
+    def _background(self) -> Iterator[None]:
+        """Run the metrics file writer while serving and stop background work after."""
+        writer = None
+        if self.config.metrics_file:
+            writer = PrometheusFileWriter(
+                self.metrics, self.config.metrics_file, interval_s=self.config.metrics_interval_s
+            )
+            writer.start()
+        try:
+            yield
+        finally:
+            for tracker in self._discoveries.values():
+                tracker.stop()
+            if writer is not None:
+                writer.stop()
+
+    def _serve(self, lines: Iterable[str]) -> None:
+        """Dispatch newline-delimited JSON-RPC messages until input ends.
+
+        tools/call requests run on a thread pool, so the loop keeps reading
+        (e.g. a notifications/cancelled for a slow call) and responses may
+        arrive out of order. At the end of input, calls still in flight are
+        drained before returning.
+        """
+        workers = self.config.stdio_concurrency
+        pool = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="mcp-call")
+            if workers > 1
+            else None
+        )
+        try:
+            for line in lines:
+                line = line.strip()
+                if not line:
+                    continue
+
+                try:
+                    size = {"messaging.message.body.size": len(line)}
+                    with self.tracer.span("mcp.stdio.message", **size):
+                        with self.tracer.span("jsonrpc.parse"):
+                            request = json.loads(line)
+                        if pool is not None and _is_call(request):
+                            # Register now so a cancel for a queued call applies
+                            self._inflight.reserve(self._request_key(request["id"]))
+                            pool.submit(contextvars.copy_context().run, self._reply, request)
+                            continue
+                        response = self.handle_request(request)
+                    if response is not None:
+                        self._write(response)
+                except json.JSONDecodeError:
+                    error_response = {
+                        "jsonrpc": "2.0",
+                        "id": None,
+                        "error": {"code": -32700, "message": "Parse error"},
+                    }
+                    self._write(error_response)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=True)
+
+    def _reply(self, request: dict) -> None:
+        """Handle a request on a pool thread and write its response."""
+        response = self.handle_request(request)
+        if response is not None:
+            self._write(response)
+
+
+def _is_call(request: object) -> bool:
+    """Return whether a message is a tools/call request expecting a response."""
+    return (
+        isinstance(request, dict)
+        and request.get("method") == "tools/call"
+        and request.get("id") is not None
+    )
@@ -0,0 +1,213 @@
+"""Per-tenant MCP runtimes, built on first use and refreshed from their specs."""
+
+import os
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from scanopy_mcp.catalog import Catalog, CatalogTools
+from scanopy_mcp.config import Config
+from scanopy_mcp.metrics import Metrics
+from scanopy_mcp.openapi_loader import OpenAPILoader
+from scanopy_mcp.schema_slim import SlimOptions
+from scanopy_mcp.server import ScanopyMCPServer
+from scanopy_mcp.tenants import (
+    DEFAULT_TENANT,
+    RegistryPool,
+    Tenant,
+    configured_tenants,
+    spec_url,
+)
+from scanopy_mcp.tool_registry import ToolRegistry
+from scanopy_mcp.tracing import Tracer
+
+
+class _TenantState:
+    """Lazily built runtime and spec bookkeeping for one tenant."""
+
+    __slots__ = ("tenant", "openapi_url", "loader", "spec", "registry", "runtime", "lock")
+
+    def __init__(self, tenant: Tenant, openapi_url: str):
+        self.tenant = tenant
+        self.openapi_url = openapi_url
+        self.loader: OpenAPILoader | None = None
+        self.spec: dict | None = None
+        self.registry: ToolRegistry | None = None
+        self.runtime: ScanopyMCPServer | None = None
+        self.lock = threading.Lock()
+
+
+class TenantRuntimes:
+    """The ScanopyMCPServer runtime of every configured tenant.
+
+    A tenant's runtime is built on first use. When its spec comes from a URL,
+    the spec is re-fetched once the loader's TTL has passed and applied
+    incrementally; lookups in between only compare timestamps.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        openapi_url: str,
+        allowlist: Iterable[str],
+        metrics: Metrics,
+        tracer: Tracer,
+        openapi_spec: dict | None = None,
+        catalogs: dict[str, str] | None = None,
+        on_tools_changed: Callable[[str], None] | None = None,
+    ):
+        """Initialize the tenant table.
+
+        Args:
+            config: Configuration for Scanopy API.
+            openapi_url: URL to fetch the default tenant's OpenAPI spec from.
+            allowlist: Write operation IDs the default tenant allows.
+            metrics: Metrics registry shared by every runtime.
+            tracer: Tracer shared by every runtime.
+            openapi_spec: Optional pre-loaded OpenAPI spec (for testing).
+            catalogs: Optional tenant name -> compiled catalog file; tenants
+                listed here take their tools from the catalog instead of a
+                spec, and their tools are never refreshed.
+            on_tools_changed: Called with the tenant name after a refreshed spec
+                changed its tools.
+
+        Raises:
+            ValueError: If the tenants file is invalid or config.tenant is unknown.
+        """
+        self.config = config
+        self.openapi_spec = openapi_spec
+        self.catalogs = catalogs or {}
+        self.metrics = metrics
+        self.tracer = tracer
+        self._on_tools_changed = on_tools_changed
+        self.tenants = configured_tenants(config, allowlist)
+        if config.tenant not in self.tenants:
+            raise ValueError(f"Unknown tenant: {config.tenant}")
+
+        self._open_catalogs: dict[str, Catalog] = {}
+        self._registries = RegistryPool(SlimOptions.from_config(config), lazy=config.lazy_tools)
+        self._states = {
+            name: _TenantState(tenant, spec_url(tenant, openapi_url))
+            for name, tenant in self.tenants.items()
+        }
+
+    def get(self, tenant: str | None = None) -> ScanopyMCPServer:
+        """Get or create the runtime of a tenant.
+
+        Args:
+            tenant: Tenant name (default: the tenant configured by SCANOPY_*).
+
+        Returns:
+            Configured ScanopyMCPServer instance.
+
+        Raises:
+            ValueError: If the tenant is unknown.
+        """
+        name = tenant or DEFAULT_TENANT
+        state = self._states.get(name)
+        if state is None:
+            raise ValueError(f"Unknown tenant: {name}")
+
+        runtime = state.runtime
+        if runtime is not None and (state.loader is None or time.time() < state.loader.expires_at):
+            return runtime
+        with state.lock:
+            if state.runtime is None:
+                self._build(state)
+            elif state.loader is not None:
+                self._refresh(state)
+            return state.runtime
+
+    def _build(self, state: _TenantState) -> None:
+        """Load a tenant's spec and wire its runtime."""
+        tenant = state.tenant
+        with self.tracer.span("mcp.runtime.load", **{"mcp.tenant": tenant.name}):
+            tools = None
+            if tenant.name in self.catalogs:
+                # Tools come precompiled; no spec download, no refresh
+                path = self.catalogs[tenant.name]
+                if path not in self._open_catalogs:
+                    self._open_catalogs[path] = Catalog(path)
+                tools = CatalogTools(self._open_catalogs[path])
+                spec = {}
+            elif self.openapi_spec is None:
+                state.loader = OpenAPILoader(
+                    url=state.openapi_url,
+                    metrics=self.metrics,
+                    streaming=self.config.spec_streaming,
+                    encodings=self.config.encodings,
+                    timeout_s=self.config.spec_timeout_s,
+                )
+                with self.tracer.span("openapi.load", **{"url.full": state.openapi_url}):
+                    spec = state.loader.load()
+            else:
+                spec = self.openapi_spec
+            state.spec = spec
+            if tools is None:
+                state.registry = self._registries.registry(spec, tenant.allowlist)
+
+            # Import runtime builder locally to avoid circular imports
+            from scanopy_mcp.runtime import build_runtime
+
+            state.runtime = build_runtime(
+                openapi_spec=state.registry.spec if state.registry is not None else spec,
+                allowlist=set(tenant.allowlist),
+                base_url=tenant.base_url,
+                api_key=tenant.api_key,
+                confirm_string=tenant.confirm_string,
+                metrics=self.metrics,
+                tracer=self.tracer,
+                batch_concurrency=self.config.batch_concurrency,
+                mirror_path=_tenant_path(self.config.mirror_path, tenant.name),
+                mirror_max_age_s=self.config.mirror_max_age_s,
+                cache_ttl_s=self.config.cache_ttl_s,
+                search_memory_mb=self.config.search_memory_mb,
+                snapshot_dir=_tenant_dir(self.config.snapshot_dir, tenant.name),
+                registry=state.registry,
+                tools=tools,
+                encodings=self.config.encodings,
+                timeout_s=self.config.timeout_s,
+                tool_timeouts=self.config.tool_timeouts,
+                retries=self.config.retries,
+                hedge=self.config.hedge_reads,
+                deadline_s=self.config.deadline_s,
+                write_dedup_s=self.config.write_dedup_s,
+            )
+
+    def _refresh(self, state: _TenantState) -> None:
+        """Apply a re-fetched OpenAPI spec and announce tool changes.
+
+        Another thread may have refreshed the tenant while this one waited
+        for its lock; the loader then returns the same spec object. A failed
+        re-fetch keeps the current tools.
+        """
+        try:
+            spec = state.loader.load()
+        except Exception:
+            return
+        if spec is state.spec:
+            return
+        state.spec = spec
+        with self.tracer.span("mcp.runtime.refresh", **{"mcp.tenant": state.tenant.name}):
+            registry = self._registries.registry(
+                spec, state.tenant.allowlist, previous=state.registry
+            )
+            changes = state.runtime.refresh_spec(registry.spec, registry=registry)
+            state.registry = registry
+        if any(changes.values()) and self._on_tools_changed is not None:
+            self._on_tools_changed(state.tenant.name)
+
+
+def _tenant_path(path: str | None, tenant: str) -> str | None:
+    """Give non-default tenants their own file next to a configured path."""
+    if not path or tenant == DEFAULT_TENANT or path == ":memory:":
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{tenant}{ext}"
+
+
+def _tenant_dir(directory: str | None, tenant: str) -> str | None:
+    """Give non-default tenants their own subdirectory of a configured directory."""
+    if not directory or tenant == DEFAULT_TENANT:
+        return directory
+    return os.path.join(directory, tenant)
@@ -0,0 +1,168 @@
+"""Several Scanopy instances served from one process."""
+
+import json
+import os
+import re
+import threading
+import weakref
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.hashing import content_hash
+from scanopy_mcp.schema_slim import SlimOptions
+from scanopy_mcp.tool_registry import ToolRegistry
+
+# Tenant built from the SCANOPY_* environment variables
+DEFAULT_TENANT = "default"
+
+# Tenant names also name per-tenant mirror files and snapshot directories
+_TENANT_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass(frozen=True)
+class Tenant:
+    """Connection settings for one Scanopy instance."""
+
+    name: str
+    base_url: str
+    api_key: str
+    confirm_string: str
+    allowlist: frozenset[str]
+    http_token: str | None = None
+
+
+def load_tenants(
+    path: str, confirm_string: str, allowlist: Iterable[str], http_token: str | None = None
+) -> dict[str, Tenant]:
+    """Load additional tenants from a JSON file.
+
+    The file maps tenant names to settings::
+
+        {"site-b": {"base_url": "https://b.example", "api_key_env": "SITE_B_KEY"}}
+
+    `api_key` may be given inline or read from the variable named by
+    `api_key_env`; likewise `http_token` and `http_token_env`, the bearer
+    token HTTP clients of the tenant send. `confirm_string`, `allowlist` and
+    `http_token` default to the values of the default tenant.
+
+    Raises:
+        ValueError: If the file is malformed or a tenant lacks a URL or key.
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    if not isinstance(raw, dict):
+        raise ValueError(f"Tenants file must contain an object: {path}")
+
+    tenants = {}
+    for name, settings in raw.items():
+        if not _TENANT_NAME_RE.match(name):
+            raise ValueError(f"Invalid tenant name: {name!r}")
+        if name == DEFAULT_TENANT:
+            raise ValueError(f"Tenant name '{DEFAULT_TENANT}' is reserved")
+        if not isinstance(settings, dict):
+            raise ValueError(f"Tenant '{name}' settings must be an object")
+        api_key = settings.get("api_key")
+        if not api_key and settings.get("api_key_env"):
+            api_key = os.getenv(settings["api_key_env"])
+        if not settings.get("base_url") or not api_key:
+            raise ValueError(f"Tenant '{name}' needs base_url and api_key (or api_key_env)")
+        token = settings.get("http_token")
+        if not token and settings.get("http_token_env"):
+            token = os.getenv(settings["http_token_env"])
+            if not token:
+                raise ValueError(f"Tenant '{name}' http_token_env is not set")
+        tenants[name] = Tenant(
+            name=name,
+            base_url=str(settings["base_url"]).rstrip("/"),
+            api_key=api_key,
+            confirm_string=settings.get("confirm_string") or confirm_string,
+            allowlist=frozenset(settings.get("allowlist", allowlist)),
+            http_token=token or http_token,
+        )
+    return tenants
+
+
+def configured_tenants(config: Config, allowlist: Iterable[str]) -> dict[str, Tenant]:
+    """Return the default tenant from config plus any from SCANOPY_TENANTS_FILE."""
+    tenants = {
+        DEFAULT_TENANT: Tenant(
+            name=DEFAULT_TENANT,
+            base_url=config.base_url,
+            api_key=config.api_key,
+            confirm_string=config.confirm_string,
+            allowlist=frozenset(allowlist),
+            http_token=config.http_token,
+        )
+    }
+    if config.tenants_file:
+        tenants.update(
+            load_tenants(
+                config.tenants_file, config.confirm_string, allowlist, http_token=config.http_token
+            )
+        )
+    return tenants
+
+
+def spec_url(tenant: Tenant, default_url: str) -> str:
+    """Return where a tenant's OpenAPI spec is loaded from."""
+    if tenant.name == DEFAULT_TENANT:
+        return default_url
+    return f"{tenant.base_url}/openapi.json"
+
+
+class RegistryPool:
+    """Share specs and built tools between tenants by spec content hash.
+
+    Tenants whose specs hash the same get one spec object and, per allowlist,
+    one ToolRegistry (and so one set of tool definitions). Registries are held
+    weakly and disappear once no tenant runtime uses them.
+    """
+
+    def __init__(self, slim: SlimOptions | None = None, lazy: bool = False):
+        """Initialize the pool.
+
+        Args:
+            slim: Optional schema slimming applied by every registry built.
+            lazy: Build registries that resolve tools on first use.
+        """
+        self.slim = slim
+        self.lazy = lazy
+        self._registries: weakref.WeakValueDictionary[tuple, ToolRegistry] = (
+            weakref.WeakValueDictionary()
+        )
+        self._lock = threading.Lock()
+
+    def registry(
+        self, spec: dict, allowlist: Iterable[str], previous: ToolRegistry | None = None
+    ) -> ToolRegistry:
+        """Return the shared registry for a spec and allowlist.
+
+        Args:
+            spec: Loaded OpenAPI specification.
+            allowlist: Write operation IDs the tenant allows.
+            previous: Registry the tenant used before a spec refresh; tools of
+                unchanged operations are carried over from it.
+        """
+        digest = content_hash(spec)
+        key = (digest, frozenset(allowlist))
+        with self._lock:
+            registry = self._registries.get(key)
+            if registry is None:
+                shared_spec = next(
+                    (r.spec for (d, _), r in self._registries.items() if d == digest), spec
+                )
+                registry = ToolRegistry(
+                    shared_spec,
+                    allowlist=set(key[1]),
+                    previous=previous,
+                    slim=self.slim,
+                    lazy=self.lazy,
+                )
+                registry.list_tools()
+                self._registries[key] = registry
+        return registry
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._registries)
@@ -1,6 +1,13 @@
 """Tool registry for scanning OpenAPI spec and registering MCP tools."""
 
-from collections.abc import Mapping
+import sys
+import threading
+from collections.abc import Iterator, Mapping, MutableMapping
+
+from scanopy_mcp.hashing import canonical_json, content_hash
+from scanopy_mcp.schema_defs import SchemaInterner
+from scanopy_mcp.schema_slim import SlimOptions
+from scanopy_mcp.tool_spec import WRITE_METHODS, ToolSpec
 
 # Standard HTTP methods we support (excluding OPTIONS, TRACE, etc.)
 _STANDARD_METHODS = {"get", "head", "post", "put", "patch", "delete"}
@@ -14,61 +21,351 @@ _OPENAPI_PATH_METADATA = {
     "parameters",
 }
 
+# Synthetic tool that fans out many tool calls in one MCP request
+BATCH_CALL_TOOL = "batch_call"
+
+# Upper bound on entries accepted by a single batch_call
+BATCH_MAX_CALLS = 100
+
+_SCHEMA_REF_PREFIX = "#/components/schemas/"
+
 
 class ToolRegistry:
     """Registry for MCP tools derived from OpenAPI specification."""
 
-    def __init__(self, openapi_spec: Mapping, allowlist: set[str]):
+    def __init__(
+        self,
+        openapi_spec: Mapping,
+        allowlist: set[str],
+        previous: "ToolRegistry | None" = None,
+        slim: SlimOptions | None = None,
+        lazy: bool = False,
+    ):
         """Initialize the registry.
 
         Args:
             openapi_spec: OpenAPI specification as a dictionary.
             allowlist: Set of write operation IDs that are allowed.
+            previous: Optional registry for an earlier spec; tools of unchanged
+                operations are reused from it instead of being rebuilt.
+            slim: Optional options for cutting input schemas down to what
+                agents need; see schema_report() for the bytes saved.
+            lazy: Index operations only and build each tool on first use;
+                list_tools() then returns a LazyToolTable.
+
+        Input schemas are interned, so identical (sub)schemas inlined into
+        many tools, such as a shared request body, are held once. The
+        interner is carried over from previous and pruned to the live tools
+        after each build.
         """
         self.spec = openapi_spec
         self.allowlist = allowlist
         self._components = self.spec.get("components", {}).get("schemas", {})
+        # operationId -> (operation hash, built tool) from the last build
+        self._built: dict[str, tuple[str, ToolSpec]] = dict(previous._built) if previous else {}
+        self._schemas = previous._schemas if previous else SchemaInterner()
+        self.slim = slim
+        # operationId -> (full, slimmed) input schema bytes, when slimming
+        self._schema_bytes: dict[str, tuple[int, int]] = (
+            dict(previous._schema_bytes) if previous and previous.slim == slim else {}
+        )
+        self.lazy = lazy
+        # Lazy mode: operationId -> (path, method, path item, operation), the
+        # tools built so far for this spec in _built, and the ones of the
+        # previous spec to reuse while their operation hash is unchanged
+        self._index: dict[str, tuple[str, str, Mapping, Mapping]] | None = None
+        self._carried: dict[str, tuple[str, ToolSpec]] = {}
+        self._op_digests: dict[str, str] = {}
+        self._ref_cache: dict[str, set[str]] = {}
+        # Equal tag, required and path parameter values of the tools built
+        # for the current spec, stored once; reset with each spec
+        self._shared: dict = {}
+        self._lock = threading.Lock()
+        if lazy:
+            self._carried, self._built = self._built, {}
+
+    def refresh(self, openapi_spec: Mapping) -> dict:
+        """Switch to a new spec, rebuilding only operations whose content changed.
+
+        An operation's hash covers its path, method, path-level parameters and
+        every component schema it references, directly or transitively.
+
+        Args:
+            openapi_spec: The freshly loaded OpenAPI specification.
+
+        Returns:
+            Sorted operationIds that were added, removed and changed.
+
+        Raises:
+            ValueError: If duplicate operationId is found.
+        """
+        previous = self._digests()
+        self.spec = openapi_spec
+        self._components = self.spec.get("components", {}).get("schemas", {})
+        if self.lazy:
+            with self._lock:
+                self._carried = {**self._carried, **self._built}
+                self._built = {}
+                self._index = None
+                self._op_digests = {}
+                self._ref_cache = {}
+        self.list_tools()
+        return _changes(previous, self._digests())
+
+    def changes_since(self, previous: "ToolRegistry") -> dict:
+        """Return operationIds added, removed and changed relative to another registry."""
+        return _changes(previous._digests(), self._digests())
 
-    def list_tools(self) -> dict:
+    def built_tools(self) -> "dict[str, ToolSpec] | LazyToolTable":
+        """Return the tools from the last build without re-scanning the spec."""
+        if self.lazy:
+            if self._index is None:
+                return self.list_tools()
+            return LazyToolTable(self)
+        if not self._built:
+            return self.list_tools()
+        return {op_id: tool for op_id, (_, tool) in self._built.items()}
+
+    def list_tools(self, include_meta: bool = False) -> "dict[str, ToolSpec] | LazyToolTable":
         """List all available tools from the OpenAPI spec.
 
+        Args:
+            include_meta: Also include synthetic meta-tools such as batch_call.
+
         Returns:
-            Dictionary mapping operation IDs to tool metadata.
+            Dictionary mapping operation IDs to ToolSpecs, or in lazy mode a
+            LazyToolTable that builds each tool when it is first looked up.
             Write operations not in allowlist are excluded.
 
         Raises:
             ValueError: If duplicate operationId is found.
         """
+        if self.lazy:
+            if self._index is None:
+                index = {}
+                for path, method, ops, op in self._operations():
+                    if op["operationId"] in index:
+                        raise ValueError(f"Duplicate operationId: {op['operationId']}")
+                    index[op["operationId"]] = (path, method, ops, op)
+                self._index = index
+                self._shared = {}
+                self._carried = {k: v for k, v in self._carried.items() if k in index}
+                self._schemas.retain(tool.input_schema for _, tool in self._carried.values())
+                for op_id in self._schema_bytes.keys() - index.keys():
+                    del self._schema_bytes[op_id]
+            tools = LazyToolTable(self)
+        else:
+            tools = self._build_all()
+
+        if include_meta:
+            for name, meta in self.meta_tools().items():
+                if name in tools:
+                    raise ValueError(f"Duplicate operationId: {name}")
+                tools[name] = meta
+
+        return tools
+
+    def _build_all(self) -> dict[str, ToolSpec]:
+        """Build every tool, reusing those of unchanged operations."""
+        tools = {}
+        built = {}
+        ref_cache: dict[str, set[str]] = {}
+        self._shared = {}
+
+        for path, method, ops, op in self._operations():
+            op_id = op["operationId"]
+
+            # Check for duplicate operationId AFTER filtering
+            if op_id in tools:
+                raise ValueError(f"Duplicate operationId: {op_id}")
+
+            # Reuse the previously built tool when the operation is unchanged
+            digest = self._operation_hash(path, method, ops, op, ref_cache)
+            cached = self._built.get(op_id)
+            if cached is not None and cached[0] == digest:
+                tool = cached[1]
+            else:
+                tool = self._build_tool(path, method, ops, op)
+            tools[op_id] = tool
+            built[op_id] = (digest, tool)
+
+        self._built = built
+        for op_id in self._schema_bytes.keys() - built.keys():
+            del self._schema_bytes[op_id]
+        self._schemas.retain(tool.input_schema for tool in tools.values())
+        return tools
+
+    def _resolve(self, op_id: str) -> ToolSpec:
+        """Return the tool of an indexed operation, building it on first use (lazy mode).
+
+        Raises:
+            KeyError: If the operation is not exposed.
+        """
+        entry = self._built.get(op_id)
+        if entry is None:
+            with self._lock:
+                entry = self._built.get(op_id)
+                if entry is None:
+                    path, method, ops, op = self._index[op_id]
+                    digest = self._digest(op_id)
+                    cached = self._carried.get(op_id)
+                    if cached is not None and cached[0] == digest:
+                        tool = cached[1]
+                    else:
+                        tool = self._build_tool(path, method, ops, op)
+                    entry = self._built[op_id] = (digest, tool)
+        return entry[1]
+
+    def _build_tool(self, path: str, method: str, path_item: Mapping, op: Mapping) -> ToolSpec:
+        """Build the tool of one operation."""
+        op_id = op["operationId"]
+        schema = self._build_input_schema(path_item, op)
+        if self.slim is not None:
+            slimmed = self.slim.apply(schema)
+            self._schema_bytes[op_id] = (len(canonical_json(schema)), len(canonical_json(slimmed)))
+            schema = slimmed
+        return ToolSpec.http(
+            op_id,
+            method,
+            path,
+            self._schemas.intern(schema),
+            summary=op.get("summary"),
+            tags=op.get("tags") or (),
+            shared=self._shared,
+        )
+
+    def _digests(self) -> dict[str, str]:
+        """Return operationId -> operation hash for every exposed operation."""
+        if not self.lazy:
+            return {op_id: digest for op_id, (digest, _) in self._built.items()}
+        if self._index is None:
+            self.list_tools()
+        with self._lock:
+            return {op_id: self._digest(op_id) for op_id in self._index}
+
+    def _digest(self, op_id: str) -> str:
+        """Return the memoized hash of an indexed operation (lazy mode, lock held)."""
+        digest = self._op_digests.get(op_id)
+        if digest is None:
+            path, method, ops, op = self._index[op_id]
+            digest = self._operation_hash(path, method, ops, op, self._ref_cache)
+            self._op_digests[op_id] = digest
+        return digest
+
+    def schema_report(self) -> dict:
+        """Report input schema bytes per tool before and after slimming.
+
+        Sizes are of compact canonical JSON. Without slim options both sizes
+        are the size of the schema as built.
+
+        Returns:
+            Per-tool full, slim and saved bytes (largest saving first) and totals.
+        """
         tools = {}
+        for op_id, tool in self.built_tools().items():
+            full, slim = (
+                self._schema_bytes.get(op_id) or (len(canonical_json(tool.input_schema)),) * 2
+            )
+            tools[op_id] = {"full_bytes": full, "slim_bytes": slim, "saved_bytes": full - slim}
+        full_total = sum(t["full_bytes"] for t in tools.values())
+        slim_total = sum(t["slim_bytes"] for t in tools.values())
+        return {
+            "tools": dict(sorted(tools.items(), key=lambda item: -item[1]["saved_bytes"])),
+            "full_bytes": full_total,
+            "slim_bytes": slim_total,
+            "saved_bytes": full_total - slim_total,
+        }
+
+    @staticmethod
+    def meta_tools() -> dict[str, ToolSpec]:
+        """List synthetic tools that are served locally rather than by OpenAPI.
+
+        Meta-tools have `is_meta` set and no HTTP method or path.
 
+        Returns:
+            Dictionary mapping meta-tool names to ToolSpecs.
+        """
+        return {
+            BATCH_CALL_TOOL: ToolSpec.meta(
+                BATCH_CALL_TOOL,
+                "Run several tool calls concurrently and return per-call results. "
+                "Write calls need their own 'confirm' in arguments.",
+                {
+                    "type": "object",
+                    "properties": {
+                        "calls": {
+                            "type": "array",
+                            "maxItems": BATCH_MAX_CALLS,
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "name": {"type": "string"},
+                                    "arguments": {"type": "object"},
+                                },
+                                "required": ["name"],
+                            },
+                        }
+                    },
+                    "required": ["calls"],
+                },
+            )
+        }
+
+    def _operations(self) -> Iterator[tuple[str, str, Mapping, Mapping]]:
+        """Yield (path, method, path_item, operation) for every exposed operation."""
         for path, ops in self.spec.get("paths", {}).items():
             for method, op in ops.items():
                 # Skip OpenAPI metadata keys
                 if method in _OPENAPI_PATH_METADATA or method.lower() not in _STANDARD_METHODS:
                     continue
 
-                op_id = op.get("operationId")
-                if not op_id:
+                if not op.get("operationId"):
                     continue
 
                 # Filter write operations by allowlist FIRST
-                is_write = method.lower() in {"post", "put", "patch", "delete"}
-                if is_write and op_id not in self.allowlist:
+                is_write = method.upper() in WRITE_METHODS
+                if is_write and op["operationId"] not in self.allowlist:
                     continue
 
-                # Check for duplicate operationId AFTER filtering
-                if op_id in tools:
-                    raise ValueError(f"Duplicate operationId: {op_id}")
-
-                input_schema = self._build_input_schema(ops, op)
+                yield path, method, ops, op
 
-                tools[op_id] = {
-                    "method": method.upper(),
-                    "path": path,
-                    "input_schema": input_schema,
-                }
+    def _operation_hash(
+        self,
+        path: str,
+        method: str,
+        path_item: Mapping,
+        operation: Mapping,
+        ref_cache: dict[str, set[str]],
+    ) -> str:
+        """Hash everything an operation's tool is built from."""
+        params = path_item.get("parameters")
+        refs = set()
+        for name in _schema_refs((params, operation)):
+            refs |= self._transitive_refs(name, ref_cache)
+        return content_hash(
+            {
+                "path": path,
+                "method": method,
+                "parameters": params,
+                "operation": operation,
+                "components": {name: self._components.get(name) for name in sorted(refs)},
+            }
+        )
 
-        return tools
+    def _transitive_refs(self, name: str, ref_cache: dict[str, set[str]]) -> set[str]:
+        """Return a component and every component reachable from it."""
+        if name in ref_cache:
+            return ref_cache[name]
+        seen = {name}
+        pending = [name]
+        while pending:
+            current = pending.pop()
+            for ref in _schema_refs(self._components.get(current)):
+                if ref not in seen:
+                    seen.add(ref)
+                    pending.append(ref)
+        ref_cache[name] = seen
+        return seen
 
     def _build_input_schema(self, path_item: Mapping, operation: Mapping) -> dict:
         """Build JSON schema for tool inputs from OpenAPI params and request body."""
@@ -79,6 +376,7 @@ class ToolRegistry:
             name = param.get("name")
             if not name:
                 continue
+            name = sys.intern(name)
             param_schema = self._resolve_schema(param.get("schema", {}))
             schema["properties"][name] = param_schema or {}
             if param.get("required") or param.get("in") == "path":
@@ -91,7 +389,7 @@ class ToolRegistry:
                 for prop, prop_schema in body_schema.get("properties", {}).items():
                     if prop_schema.get("readOnly") is True:
                         continue
-                    schema["properties"][prop] = prop_schema
+                    schema["properties"][sys.intern(prop)] = prop_schema
                 for req in body_schema.get("required", []) or []:
                     prop_schema = body_schema.get("properties", {}).get(req, {})
                     if prop_schema.get("readOnly") is True:
@@ -143,7 +441,7 @@ class ToolRegistry:
         # Resolve $ref first
         while "$ref" in current:
             ref = current.get("$ref", "")
-            if not ref.startswith("#/components/schemas/"):
+            if not ref.startswith(_SCHEMA_REF_PREFIX):
                 break
             name = ref.split("/")[-1]
             current = self._components.get(name, {})
@@ -167,3 +465,98 @@ class ToolRegistry:
             return merged
 
         return current or {}
+
+
+class LazyToolTable(MutableMapping):
+    """Tool table of a lazy ToolRegistry.
+
+    Names and membership come from the registry's operation index; a tool's
+    input schema is built when the tool is first looked up and memoized in
+    the registry, so every table of the registry shares it. Tools added to
+    the table (meta-tools) are held by the table itself.
+    """
+
+    def __init__(self, registry: ToolRegistry):
+        self._registry = registry
+        self._index = registry._index
+        self._extra: dict[str, ToolSpec] = {}
+
+    def __getitem__(self, name: str) -> ToolSpec:
+        tool = self._extra.get(name)
+        if tool is not None:
+            return tool
+        if name not in self._index:
+            raise KeyError(name)
+        if self._index is not self._registry._index:
+            # A table from before a spec refresh: build without memoizing
+            return self._registry._build_tool(*self._index[name])
+        return self._registry._resolve(name)
+
+    def describe(self, name: str) -> ToolSpec:
+        """Return a tool without building its input schema.
+
+        Built tools are returned as they are; others come with name, method,
+        path, summary and tags from the operation index and an empty schema,
+        enough to list or index them.
+        """
+        tool = self._extra.get(name)
+        if tool is not None:
+            return tool
+        if name not in self._index:
+            raise KeyError(name)
+        entry = self._registry._built.get(name) if self._index is self._registry._index else None
+        if entry is not None:
+            return entry[1]
+        path, method, _, op = self._index[name]
+        return ToolSpec.http(
+            name, method, path, summary=op.get("summary"), tags=op.get("tags") or ()
+        )
+
+    def __setitem__(self, name: str, tool: ToolSpec) -> None:
+        if name in self._index:
+            raise ValueError(f"Duplicate operationId: {name}")
+        self._extra[name] = tool
+
+    def __delitem__(self, name: str) -> None:
+        del self._extra[name]
+
+    def __contains__(self, name) -> bool:
+        return name in self._extra or name in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._index
+        yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._extra)
+
+    def resolved(self) -> int:
+        """Return how many operation tools have been built so far."""
+        return sum(1 for op_id in self._index if op_id in self._registry._built)
+
+
+def _changes(previous: dict[str, str], current: dict[str, str]) -> dict:
+    """Diff two operationId -> operation hash maps."""
+    return {
+        "added": sorted(current.keys() - previous.keys()),
+        "removed": sorted(previous.keys() - current.keys()),
+        "changed": sorted(
+            op_id for op_id in current.keys() & previous.keys() if current[op_id] != previous[op_id]
+        ),
+    }
+
+
+def _schema_refs(node) -> set[str]:
+    """Collect component schema names referenced anywhere within node."""
+    refs = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, Mapping):
+            ref = current.get("$ref")
+            if isinstance(ref, str) and ref.startswith(_SCHEMA_REF_PREFIX):
+                refs.add(ref[len(_SCHEMA_REF_PREFIX) :])
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple)):
+            stack.extend(current)
+    return refs
@@ -0,0 +1,174 @@
+"""Keyword index over tools, served by the search_tools meta-tool."""
+
+import bisect
+import threading
+from collections.abc import Callable, Iterable, Mapping
+
+from scanopy_mcp.search_index import tokenize
+from scanopy_mcp.tool_registry import LazyToolTable
+from scanopy_mcp.tool_spec import ToolSpec
+
+# Meta-tool name served by the tool index
+SEARCH_TOOLS_TOOL = "search_tools"
+
+# Tools returned per search unless a limit is given
+DEFAULT_TOOL_LIMIT = 10
+MAX_TOOL_LIMIT = 50
+
+# Score per matched query token, by where it matched
+_FIELD_WEIGHTS = {"name": 3, "tag": 2, "path": 2, "summary": 1}
+
+
+def tool_tags(tool: ToolSpec, ungrouped: str = "other") -> tuple[str, ...]:
+    """Return a tool's groups: its OpenAPI tags, 'meta' or the ungrouped name."""
+    if tool.is_meta:
+        return ("meta",)
+    return tool.tags or (ungrouped,)
+
+
+class ToolIndex:
+    """Inverted keyword index over tool names, paths, summaries and tags.
+
+    The index is built once per tool table and rebuilt only when the table
+    changes (a spec refresh swaps it, a registered meta-tool grows it).
+    Indexing a lazy table builds no input schemas; only the tools a search
+    returns are built.
+    Query tokens match indexed tokens by prefix, so 'disc' finds discovery
+    operations.
+    """
+
+    def __init__(self, tools: Callable[[], Mapping[str, ToolSpec]]):
+        """Initialize the index.
+
+        Args:
+            tools: Returns the current tool table.
+        """
+        self._tools = tools
+        self._lock = threading.Lock()
+        self._source: Mapping[str, ToolSpec] | None = None
+        self._source_len = 0
+        # token -> {tool name: weight}, plus the sorted tokens for prefix lookups
+        self._postings: dict[str, dict[str, int]] = {}
+        self._tokens: list[str] = []
+        self._groups: dict[str, list[str]] = {}
+
+    def _current(self) -> Mapping[str, ToolSpec]:
+        """Return the tool table, rebuilding the index if it changed."""
+        tools = self._tools()
+        if tools is not self._source or len(tools) != self._source_len:
+            with self._lock:
+                if tools is not self._source or len(tools) != self._source_len:
+                    self._build(tools)
+                    self._source, self._source_len = tools, len(tools)
+        return tools
+
+    def _build(self, tools: Mapping[str, ToolSpec]) -> None:
+        """Index every tool of a table."""
+        postings: dict[str, dict[str, int]] = {}
+        groups: dict[str, list[str]] = {}
+
+        def add(tokens: Iterable[str], name: str, weight: int) -> None:
+            for token in tokens:
+                entry = postings.setdefault(token, {})
+                entry[name] = max(entry.get(name, 0), weight)
+
+        # Index lazy tables from their operation index, leaving schemas unbuilt
+        describe = tools.describe if isinstance(tools, LazyToolTable) else tools.__getitem__
+        for name in tools:
+            tool = describe(name)
+            add(tokenize(name), name, _FIELD_WEIGHTS["name"])
+            add(tokenize(tool.path), name, _FIELD_WEIGHTS["path"])
+            add(tokenize(tool.summary or tool.description), name, _FIELD_WEIGHTS["summary"])
+            for tag in tool_tags(tool):
+                add(tokenize(tag), name, _FIELD_WEIGHTS["tag"])
+                groups.setdefault(tag, []).append(name)
+
+        self._postings = postings
+        self._tokens = sorted(postings)
+        self._groups = {tag: sorted(names) for tag, names in sorted(groups.items())}
+
+    def groups(self) -> dict[str, int]:
+        """Return tool counts per group (tag)."""
+        self._current()
+        return {tag: len(names) for tag, names in self._groups.items()}
+
+    def search(self, query: str = "", tag: str | None = None, limit: int = DEFAULT_TOOL_LIMIT):
+        """Rank tools matching every query token, optionally within one group.
+
+        Returns:
+            Matching ToolSpecs, best first.
+        """
+        tools = self._current()
+        candidates: dict[str, int] | None = None
+        if tag is not None:
+            candidates = dict.fromkeys(self._groups.get(tag, ()), 0)
+
+        for token in tokenize(query):
+            scores: dict[str, int] = {}
+            start = bisect.bisect_left(self._tokens, token)
+            for indexed in self._tokens[start:]:
+                if not indexed.startswith(token):
+                    break
+                # Exact token matches rank above prefix matches
+                bonus = 1 if indexed == token else 0
+                for name, weight in self._postings[indexed].items():
+                    scores[name] = max(scores.get(name, 0), weight + bonus)
+            if candidates is None:
+                candidates = scores
+            else:
+                candidates = {
+                    name: score + scores[name]
+                    for name, score in candidates.items()
+                    if name in scores
+                }
+            if not candidates:
+                break
+
+        if candidates is None:
+            return []
+        ranked = sorted(candidates.items(), key=lambda item: (-item[1], item[0]))
+        return [tools[name] for name, _ in ranked[: max(1, min(limit, MAX_TOOL_LIMIT))]]
+
+    def handle_search(self, args: dict, confirm: str | None = None, dry_run: bool = False) -> dict:
+        """Serve search_tools."""
+        query = args.get("query") or ""
+        tag = args.get("tag")
+        if not query and not tag:
+            return {"groups": self.groups(), "tools": []}
+        found = self.search(query, tag=tag, limit=args.get("limit") or DEFAULT_TOOL_LIMIT)
+        return {
+            "count": len(found),
+            "tools": [
+                {
+                    "name": tool.name,
+                    "description": tool.title,
+                    "summary": tool.summary,
+                    "tags": list(tool_tags(tool)),
+                    # Writes also take 'confirm' (and 'dry_run'), as in tools/list
+                    "write": tool.is_write,
+                    "inputSchema": tool.input_schema,
+                }
+                for tool in found
+            ],
+        }
+
+
+def tool_search_tools() -> dict:
+    """Return meta-tool definitions served by the tool index."""
+    return {
+        SEARCH_TOOLS_TOOL: {
+            "kind": "meta",
+            "description": (
+                "Find Scanopy API tools by keyword (operation name, path, summary or tag). "
+                "Call without arguments to list tool groups."
+            ),
+            "input_schema": {
+                "type": "object",
+                "properties": {
+                    "query": {"type": "string", "description": "Keywords, e.g. 'start discovery'"},
+                    "tag": {"type": "string", "description": "Only tools in this group"},
+                    "limit": {"type": "integer", "maximum": MAX_TOOL_LIMIT},
+                },
+            },
+        },
+    }
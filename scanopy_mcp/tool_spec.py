@@ -0,0 +1,144 @@
+"""Compact, immutable tool metadata shared by the registry, server and transports."""
+
+import re
+import sys
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, replace
+
+# HTTP methods that modify upstream state
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+_PATH_PARAM_RE = re.compile(r"{([^}]+)}")
+
+
+@dataclass(frozen=True, slots=True)
+class ToolSpec:
+    """One tool: an OpenAPI operation or a locally served meta-tool.
+
+    Flags used on every call (`is_write`, `required`, `path_params`) are
+    computed once when the tool is built. Names, methods and paths are
+    interned, and tools built with the same `shared` table (one registry
+    build) share equal required sets and path parameter tuples, so thousands
+    of tools cost little beyond their schemas.
+    """
+
+    name: str
+    method: str | None
+    path: str | None
+    input_schema: Mapping
+    description: str | None = None
+    summary: str | None = None
+    tags: tuple[str, ...] = ()
+    is_meta: bool = False
+    is_write: bool = False
+    required: frozenset[str] = frozenset()
+    path_params: tuple[str, ...] = ()
+
+    @classmethod
+    def http(
+        cls,
+        name: str,
+        method: str,
+        path: str,
+        input_schema: Mapping | None = None,
+        summary: str | None = None,
+        tags: Iterable[str] = (),
+        shared: dict | None = None,
+    ) -> "ToolSpec":
+        """Build the tool for an OpenAPI operation (summary and tags as in the spec).
+
+        Equal tag, required and path parameter values are taken from and
+        stored in `shared`, if given.
+        """
+        method = sys.intern(method.upper())
+        input_schema = input_schema or _empty_schema()
+        return cls(
+            name=sys.intern(name),
+            method=method,
+            path=sys.intern(path),
+            input_schema=input_schema,
+            summary=summary or None,
+            tags=_share(tuple(sys.intern(tag) for tag in tags), shared),
+            is_write=method in WRITE_METHODS,
+            required=_required(input_schema, shared),
+            path_params=_share(tuple(sys.intern(p) for p in _PATH_PARAM_RE.findall(path)), shared),
+        )
+
+    @classmethod
+    def meta(cls, name: str, description: str, input_schema: Mapping | None = None) -> "ToolSpec":
+        """Build a locally served meta-tool."""
+        input_schema = input_schema or _empty_schema()
+        return cls(
+            name=sys.intern(name),
+            method=None,
+            path=None,
+            input_schema=input_schema,
+            description=description,
+            is_meta=True,
+            required=_required(input_schema),
+        )
+
+    @classmethod
+    def from_dict(cls, name: str, tool: Mapping) -> "ToolSpec":
+        """Build a tool from its dict form (see to_dict())."""
+        if tool.get("kind") == "meta":
+            return cls.meta(name, tool.get("description") or "", tool.get("input_schema"))
+        spec = cls.http(
+            name,
+            tool["method"],
+            tool["path"],
+            tool.get("input_schema"),
+            summary=tool.get("summary"),
+            tags=tool.get("tags") or (),
+        )
+        if tool.get("description"):
+            spec = replace(spec, description=tool["description"])
+        return spec
+
+    @property
+    def title(self) -> str:
+        """Human-readable description: the meta-tool text or 'METHOD /path'."""
+        return self.description or f"{self.method} {self.path}"
+
+    def to_dict(self) -> dict:
+        """Return the JSON-serializable dict form of the tool."""
+        if self.is_meta:
+            return {
+                "kind": "meta",
+                "description": self.description,
+                "input_schema": self.input_schema,
+            }
+        tool = {"method": self.method, "path": self.path, "input_schema": self.input_schema}
+        if self.description:
+            tool["description"] = self.description
+        if self.summary:
+            tool["summary"] = self.summary
+        if self.tags:
+            tool["tags"] = list(self.tags)
+        return tool
+
+
+def as_tool_spec(name: str, tool: "ToolSpec | Mapping") -> ToolSpec:
+    """Return tool as a ToolSpec, converting the dict form if needed."""
+    if isinstance(tool, ToolSpec):
+        return tool
+    return ToolSpec.from_dict(name, tool)
+
+
+def _empty_schema() -> dict:
+    """Return a new input schema for a tool without parameters.
+
+    A fresh dict per tool, so editing one tool's schema leaves others alone.
+    """
+    return {"type": "object", "properties": {}}
+
+
+def _required(input_schema: Mapping, shared: dict | None = None) -> frozenset[str]:
+    """Return the schema's required property names as a frozenset."""
+    names = frozenset(sys.intern(name) for name in input_schema.get("required") or ())
+    return _share(names, shared)
+
+
+def _share(value, shared: dict | None):
+    """Return the instance in shared equal to value, storing it if new."""
+    return value if shared is None else shared.setdefault(value, value)
@@ -0,0 +1,223 @@
+"""Lightweight span tracing compatible with OpenTelemetry's data model.
+
+Spans follow a request through the stdio, server and client layers and are
+written as OTLP/JSON-shaped lines to a local file. No OpenTelemetry SDK or
+exporter is required.
+"""
+
+import json
+import os
+import secrets
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Span currently active in this context (set by Tracer.span)
+_current_span: ContextVar["Span | None"] = ContextVar("scanopy_mcp_current_span", default=None)
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_span_id",
+        "start_time_unix_nano",
+        "end_time_unix_nano",
+        "attributes",
+        "events",
+        "status_code",
+        "status_message",
+    )
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: str | None = None):
+        """Start a span.
+
+        Args:
+            name: Operation name.
+            trace_id: 32-hex-digit trace id shared by all spans of a request.
+            parent_span_id: 16-hex-digit id of the parent span, if any.
+        """
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.start_time_unix_nano = time.time_ns()
+        self.end_time_unix_nano: int | None = None
+        self.attributes: dict = {}
+        self.events: list[dict] = []
+        self.status_code = "STATUS_CODE_UNSET"
+        self.status_message = ""
+
+    def set_attribute(self, key: str, value) -> None:
+        """Set a span attribute (str, bool, int or float)."""
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes) -> None:
+        """Record a timestamped event on the span."""
+        self.events.append(
+            {"name": name, "time_unix_nano": time.time_ns(), "attributes": attributes}
+        )
+
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed."""
+        self.status_code = "STATUS_CODE_ERROR"
+        self.status_message = message
+
+    @property
+    def traceparent(self) -> str:
+        """W3C trace context header value for this span."""
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict:
+        """Return the span in OTLP/JSON encoding."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": "SPAN_KIND_INTERNAL",
+            "startTimeUnixNano": str(self.start_time_unix_nano),
+            "endTimeUnixNano": str(self.end_time_unix_nano or self.start_time_unix_nano),
+            "attributes": _otlp_attributes(self.attributes),
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        if self.events:
+            span["events"] = [
+                {
+                    "name": event["name"],
+                    "timeUnixNano": str(event["time_unix_nano"]),
+                    "attributes": _otlp_attributes(event["attributes"]),
+                }
+                for event in self.events
+            ]
+        return span
+
+
+def _otlp_attributes(attributes: dict) -> list[dict]:
+    """Encode attributes as OTLP key/value pairs."""
+    encoded = []
+    for key, value in attributes.items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        encoded.append({"key": key, "value": typed})
+    return encoded
+
+
+def parse_traceparent(value: str | None) -> tuple[str, str] | None:
+    """Parse a W3C traceparent header into (trace_id, parent_span_id)."""
+    if not value:
+        return None
+    parts = value.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        int(parts[1], 16)
+        int(parts[2], 16)
+    except ValueError:
+        return None
+    if set(parts[1]) == {"0"} or set(parts[2]) == {"0"}:
+        return None
+    return parts[1], parts[2]
+
+
+class JsonlSpanExporter:
+    """Append finished spans to a JSONL file, one span per line."""
+
+    def __init__(self, path: str):
+        """Initialize the exporter.
+
+        Args:
+            path: File to append spans to (created if missing).
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def export(self, span: Span) -> None:
+        """Write a finished span."""
+        line = json.dumps(span.to_dict(), separators=(",", ":"))
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class Tracer:
+    """Create spans and hand finished ones to an exporter.
+
+    Without an exporter the tracer is disabled and `span` does no work.
+    """
+
+    def __init__(self, exporter: JsonlSpanExporter | None = None):
+        """Initialize the tracer.
+
+        Args:
+            exporter: Destination for finished spans; None disables tracing.
+        """
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        """Whether spans are being recorded."""
+        return self.exporter is not None
+
+    @contextmanager
+    def span(
+        self, name: str, traceparent: str | None = None, **attributes
+    ) -> Iterator[Span | None]:
+        """Run the enclosed block inside a new span.
+
+        Args:
+            name: Operation name.
+            traceparent: Optional W3C traceparent to continue when there is
+                no active span (e.g. supplied by the MCP client).
+            **attributes: Initial span attributes.
+
+        Yields:
+            The active span, or None when tracing is disabled.
+        """
+        if self.exporter is None:
+            yield None
+            return
+
+        parent = _current_span.get()
+        if parent is not None:
+            span = Span(name, parent.trace_id, parent.span_id)
+        else:
+            remote = parse_traceparent(traceparent)
+            if remote is not None:
+                span = Span(name, remote[0], remote[1])
+            else:
+                span = Span(name, secrets.token_hex(16))
+        span.attributes.update(attributes)
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as exc:
+            span.set_error(f"{type(exc).__name__}: {exc}")
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time_unix_nano = time.time_ns()
+            self.exporter.export(span)
+
+
+def current_span() -> Span | None:
+    """Return the span active in this context, if any."""
+    return _current_span.get()
@@ -0,0 +1,262 @@
+"""Pre-fork worker mode for the HTTP transport."""
+
+import os
+import secrets
+import selectors
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+
+from scanopy_mcp.catalog import compile_catalog
+from scanopy_mcp.config import Config
+from scanopy_mcp.http_server import MCPHTTPServer
+from scanopy_mcp.openapi_loader import OpenAPILoader
+from scanopy_mcp.schema_slim import SlimOptions
+from scanopy_mcp.tenants import RegistryPool, configured_tenants, spec_url
+
+# Seconds workers get to finish in-flight requests on shutdown
+SHUTDOWN_GRACE_S = 5.0
+
+# Minimum seconds between restarts of the same worker slot
+RESPAWN_DELAY_S = 1.0
+
+
+class PreforkHTTPServer:
+    """Serve the HTTP transport from several forked worker processes.
+
+    The supervisor loads every tenant's spec once, compiles the tools into
+    catalog files that workers memory-map read-only, binds the listening
+    socket and forks. Workers accept from the shared socket, so the kernel
+    spreads connections over them and JSON work runs on all cores. Session
+    ids are signed with a shared key, and notifications are relayed through
+    the supervisor to every worker so any worker can stream them. Cancels
+    for a request the receiving worker is not handling are relayed the
+    same way, to reach the worker that is.
+
+    Catalogs are compiled once, in prepare(), and workers never re-fetch
+    the spec: tool changes upstream take effect after a restart.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        openapi_url: str,
+        allowlist: set[str],
+        workers: int | None = None,
+        openapi_spec: dict | None = None,
+        host: str | None = None,
+        port: int | None = None,
+    ):
+        """Initialize the supervisor.
+
+        Args:
+            config: Configuration for Scanopy API.
+            openapi_url: URL to fetch OpenAPI spec from.
+            allowlist: Set of write operation IDs that are allowed.
+            workers: Worker processes (default: config.http_workers).
+            openapi_spec: Optional pre-loaded OpenAPI spec (for testing).
+            host: Bind address (default: config.http_host).
+            port: Bind port, 0 for any free port (default: config.http_port).
+        """
+        self.config = config
+        self.openapi_url = openapi_url
+        self.allowlist = allowlist
+        self.workers = max(1, workers if workers is not None else config.http_workers)
+        self.openapi_spec = openapi_spec
+        self.host = host if host is not None else config.http_host
+        self.port = port if port is not None else config.http_port
+        self._socket: socket.socket | None = None
+        self._catalog_dir: str | None = None
+        self._catalogs: dict[str, str] = {}
+        self._secret = secrets.token_bytes(32)
+        # worker pid -> (slot, supervisor end of its relay socket)
+        self._children: dict[int, tuple[int, socket.socket]] = {}
+        self._stopping = False
+
+    @property
+    def address(self) -> tuple[str, int]:
+        """Bound (host, port); the port is known once prepare() ran."""
+        if self._socket is None:
+            return self.host, self.port
+        return self._socket.getsockname()[:2]
+
+    def prepare(self) -> None:
+        """Compile tool catalogs and bind the listening socket (before forking)."""
+        if self._socket is not None:
+            return
+        self._catalog_dir = tempfile.mkdtemp(prefix="scanopy-mcp-catalog-")
+        pool = RegistryPool(SlimOptions.from_config(self.config))
+        paths: dict[int, str] = {}
+        registries = []
+        for name, tenant in configured_tenants(self.config, self.allowlist).items():
+            spec = self.openapi_spec
+            if spec is None:
+                spec = OpenAPILoader(
+                    spec_url(tenant, self.openapi_url),
+                    streaming=self.config.spec_streaming,
+                    encodings=self.config.encodings,
+                    timeout_s=self.config.spec_timeout_s,
+                ).load()
+            registry = pool.registry(spec, tenant.allowlist)
+            # Keep registries alive so tenants with equal specs share one catalog
+            registries.append(registry)
+            if id(registry) not in paths:
+                paths[id(registry)] = os.path.join(self._catalog_dir, f"catalog-{len(paths)}.bin")
+                compile_catalog(registry.built_tools(), paths[id(registry)])
+            self._catalogs[name] = paths[id(registry)]
+
+        self._socket = socket.create_server((self.host, self.port), backlog=128)
+
+    def run(self) -> None:
+        """Fork the workers and supervise them until SIGTERM or SIGINT."""
+        self.prepare()
+        previous = {
+            sig: signal.signal(sig, self._on_signal) for sig in (signal.SIGTERM, signal.SIGINT)
+        }
+        selector = selectors.DefaultSelector()
+        try:
+            for slot in range(self.workers):
+                self._spawn(slot, selector)
+            self._supervise(selector)
+        finally:
+            for sig, handler in previous.items():
+                signal.signal(sig, handler)
+            self._terminate()
+            selector.close()
+            self._socket.close()
+            shutil.rmtree(self._catalog_dir, ignore_errors=True)
+
+    def stop(self) -> None:
+        """Ask run() to shut the workers down."""
+        self._stopping = True
+
+    def _on_signal(self, signum, frame) -> None:
+        self.stop()
+
+    def _spawn(self, slot: int, selector: selectors.BaseSelector) -> None:
+        """Fork one worker for a slot."""
+        parent_end, child_end = socket.socketpair()
+        pid = os.fork()
+        if pid == 0:
+            parent_end.close()
+            code = 0
+            try:
+                self._worker(child_end)
+            except BaseException:
+                code = 1
+            finally:
+                os._exit(code)
+        child_end.close()
+        self._children[pid] = (slot, parent_end)
+        selector.register(parent_end, selectors.EVENT_READ, data=pid)
+
+    def _worker(self, relay: socket.socket) -> None:
+        """Body of a worker process."""
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, signal.SIG_DFL)
+        server = MCPHTTPServer(
+            self.config,
+            self.openapi_url,
+            self.allowlist,
+            catalogs=self._catalogs,
+            listen_socket=self._socket,
+            session_secret=self._secret,
+            relay=relay,
+        )
+        server.bind()
+        signal.signal(signal.SIGTERM, lambda signum, frame: _shutdown_in_thread(server))
+        server.run()
+
+    def _supervise(self, selector: selectors.BaseSelector) -> None:
+        """Relay notifications and cancels between workers and replace workers that exit."""
+        buffers: dict[int, bytes] = {}
+        last_spawn: dict[int, float] = {}
+        while not self._stopping:
+            for key, _ in selector.select(timeout=0.5):
+                pid = key.data
+                try:
+                    data = key.fileobj.recv(65536)
+                except OSError:
+                    data = b""
+                if not data:
+                    selector.unregister(key.fileobj)
+                    continue
+                *lines, buffers[pid] = (buffers.get(pid, b"") + data).split(b"\n")
+                for line in lines:
+                    self._broadcast(line + b"\n")
+
+            while True:
+                try:
+                    pid, _ = os.waitpid(-1, os.WNOHANG)
+                except ChildProcessError:
+                    pid = 0
+                if pid == 0:
+                    break
+                slot, relay = self._children.pop(pid, (None, None))
+                if relay is None:
+                    continue
+                buffers.pop(pid, None)
+                if _registered(selector, relay):
+                    selector.unregister(relay)
+                relay.close()
+                if not self._stopping:
+                    wait = last_spawn.get(slot, 0.0) + RESPAWN_DELAY_S - time.monotonic()
+                    if wait > 0:
+                        time.sleep(wait)
+                    last_spawn[slot] = time.monotonic()
+                    self._spawn(slot, selector)
+
+    def _broadcast(self, line: bytes) -> None:
+        """Send one relayed line to every worker."""
+        for _, relay in list(self._children.values()):
+            try:
+                relay.settimeout(1.0)
+                relay.sendall(line)
+            except OSError:
+                # A stuck or exiting worker loses this notification
+                pass
+
+    def _terminate(self) -> None:
+        """Stop every worker, forcefully after the grace period."""
+        for pid in list(self._children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline = time.monotonic() + SHUTDOWN_GRACE_S
+        while self._children and time.monotonic() < deadline:
+            try:
+                pid, _ = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                time.sleep(0.05)
+                continue
+            _, relay = self._children.pop(pid, (None, None))
+            if relay is not None:
+                relay.close()
+        for pid, (_, relay) in list(self._children.items()):
+            try:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+            relay.close()
+        self._children.clear()
+
+
+def _registered(selector: selectors.BaseSelector, fileobj) -> bool:
+    """Return whether a file object is still registered with a selector."""
+    try:
+        selector.get_key(fileobj)
+    except KeyError:
+        return False
+    return True
+
+
+def _shutdown_in_thread(server: MCPHTTPServer) -> None:
+    """Stop serve_forever() from a signal handler without deadlocking it."""
+    threading.Thread(target=server.shutdown, daemon=True).start()
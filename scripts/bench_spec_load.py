@@ -0,0 +1,133 @@
+"""Measure peak memory of loading an OpenAPI spec, whole vs streamed.
+
+Measures with tracemalloc, from a spec file:
+- the whole-document load (bytes read, decoded into one dict), as done by
+  OpenAPILoader by default, and
+- the streaming load (SCANOPY_SPEC_STREAMING=1), which keeps only what
+  tools are built from.
+
+Without --spec a synthetic spec with responses and examples is written to
+a temporary file first.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from scanopy_mcp.spec_stream import parse_spec_file
+
+
+def synthetic_spec(resources: int) -> dict:
+    """Return a spec shaped like Scanopy's: CRUD operations with rich responses."""
+    paths = {}
+    schemas = {}
+    for i in range(resources):
+        name = f"Thing{i}"
+        schemas[name] = {
+            "type": "object",
+            "description": f"A thing number {i} as stored by the server.",
+            "properties": {
+                "id": {"type": "string", "format": "uuid", "readOnly": True},
+                "name": {"type": "string", "example": f"thing-{i}"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["name"],
+        }
+        item = {"$ref": f"#/components/schemas/{name}"}
+        example = {"id": "00000000-0000-0000-0000-000000000000", "name": f"thing-{i}"}
+        responses = {
+            code: {
+                "description": f"Response {code}",
+                "content": {
+                    "application/json": {
+                        "schema": {
+                            "type": "object",
+                            "properties": {
+                                "success": {"type": "boolean"},
+                                "data": {"type": "array", "items": item},
+                                "error": {"type": "string", "nullable": True},
+                            },
+                        },
+                        "examples": {"default": {"value": {"success": True, "data": [example]}}},
+                    }
+                },
+            }
+            for code in ("200", "400", "401", "404")
+        }
+        body = {"content": {"application/json": {"schema": item, "example": example}}}
+        paths[f"/api/v1/things{i}"] = {
+            "get": {
+                "operationId": f"list_things{i}",
+                "summary": f"List things {i}",
+                "description": "Returns every thing visible to the caller. " * 4,
+                "tags": ["things"],
+                "responses": responses,
+            },
+            "post": {
+                "operationId": f"create_thing{i}",
+                "tags": ["things"],
+                "requestBody": body,
+                "responses": responses,
+            },
+        }
+    return {
+        "openapi": "3.1.0",
+        "info": {"title": "Synthetic", "version": "1"},
+        "paths": paths,
+        "components": {"schemas": schemas},
+    }
+
+
+def measure(load):
+    """Return (result, peak bytes, bytes still held, seconds)."""
+    tracemalloc.start()
+    try:
+        start = time.perf_counter()
+        result = load()
+        seconds = time.perf_counter() - start
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, peak, current, seconds
+
+
+def load_whole(path: str) -> dict:
+    """Load the way httpx Response.json() does: all bytes, then one dict."""
+    with open(path, "rb") as f:
+        content = f.read()
+    return json.loads(content)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--spec", help="OpenAPI spec file (default: synthetic)")
+    parser.add_argument("--resources", type=int, default=1000)
+    args = parser.parse_args()
+
+    path = args.spec
+    if path is None:
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(synthetic_spec(args.resources), f)
+    try:
+        report = {"spec_bytes": os.path.getsize(path)}
+        for mode, load in (("whole", load_whole), ("streaming", parse_spec_file)):
+            spec, peak, held, seconds = measure(lambda load=load: load(path))
+            report[mode] = {
+                "operations": sum(len(item) for item in spec.get("paths", {}).values()),
+                "peak_mb": round(peak / (1 << 20), 2),
+                "held_mb": round(held / (1 << 20), 2),
+                "seconds": round(seconds, 3),
+            }
+            del spec
+    finally:
+        if args.spec is None:
+            os.unlink(path)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
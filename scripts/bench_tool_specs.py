@@ -0,0 +1,114 @@
+"""Measure memory per tool of ToolSpec against the former nested-dict form.
+
+Builds a synthetic OpenAPI spec, then measures with tracemalloc:
+- the full registry build (schemas included), and
+- the per-tool container alone: ToolSpec vs the old {"method", "path",
+  "input_schema"} dict, with schemas shared by both.
+"""
+
+import argparse
+import json
+import tracemalloc
+
+from scanopy_mcp.tool_registry import ToolRegistry
+from scanopy_mcp.tool_spec import ToolSpec
+
+
+def synthetic_spec(resources: int) -> dict:
+    """Return a spec with a list/get/update/delete operation set per resource."""
+    paths = {}
+    schemas = {}
+    for i in range(resources):
+        name = f"Thing{i}"
+        schemas[name] = {
+            "type": "object",
+            "properties": {
+                "id": {"type": "string", "format": "uuid", "readOnly": True},
+                "name": {"type": "string"},
+                "description": {"type": "string"},
+                "tags": {"type": "array", "items": {"type": "string"}},
+            },
+            "required": ["name"],
+        }
+        body = {
+            "content": {"application/json": {"schema": {"$ref": f"#/components/schemas/{name}"}}}
+        }
+        id_param = [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}]
+        paths[f"/api/v1/things{i}"] = {
+            "get": {
+                "operationId": f"list_things{i}",
+                "parameters": [{"name": "limit", "in": "query", "schema": {"type": "integer"}}],
+            },
+        }
+        paths[f"/api/v1/things{i}/{{id}}"] = {
+            "parameters": id_param,
+            "get": {"operationId": f"get_thing{i}"},
+            "put": {"operationId": f"update_thing{i}", "requestBody": body},
+            "delete": {"operationId": f"delete_thing{i}"},
+        }
+    return {"paths": paths, "components": {"schemas": schemas}}
+
+
+def measure(build):
+    """Return (result, bytes allocated and still held by it)."""
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+
+def legacy_dicts(tools: dict) -> dict:
+    """Rebuild the former per-tool dicts, sharing the same schemas."""
+    return {
+        name: {
+            # The old registry stored method.upper(), a fresh string per tool
+            "method": "".join(tool.method),
+            "path": tool.path,
+            "input_schema": tool.input_schema,
+        }
+        for name, tool in tools.items()
+    }
+
+
+def tool_specs(tools: dict) -> dict:
+    """Rebuild the ToolSpecs from fresh strings, sharing the same schemas."""
+    return {
+        name: ToolSpec.http("".join(name), "".join(tool.method), tool.path, tool.input_schema)
+        for name, tool in tools.items()
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resources", type=int, default=1000)
+    args = parser.parse_args()
+
+    spec = synthetic_spec(args.resources)
+    allowlist = {
+        op["operationId"]
+        for item in spec["paths"].values()
+        for op in item.values()
+        if isinstance(op, dict) and "operationId" in op
+    }
+
+    tools, build_bytes = measure(ToolRegistry(spec, allowlist=allowlist).list_tools)
+    _, dict_bytes = measure(lambda: legacy_dicts(tools))
+    _, spec_bytes = measure(lambda: tool_specs(tools))
+
+    count = len(tools)
+    report = {
+        "tools": count,
+        "registry_build_bytes_per_tool": round(build_bytes / count, 1),
+        "container_bytes_per_tool": {
+            "dict": round(dict_bytes / count, 1),
+            "tool_spec": round(spec_bytes / count, 1),
+        },
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
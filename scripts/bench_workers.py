@@ -0,0 +1,158 @@
+"""Measure HTTP transport throughput at 1, 2 and 4 pre-fork workers.
+
+A mock Scanopy API in its own process serves one large host list. For each
+worker count, PreforkHTTPServer is started against it and a pool of client
+threads, each with its own MCP session and keep-alive connection, calls
+get_all_hosts for a fixed time. Connections are spread over the workers
+by the kernel, so the report shows how requests per second scale with
+workers on this machine (compare with the CPU count it prints).
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.http_server import SESSION_HEADER
+from scanopy_mcp.workers import PreforkHTTPServer
+
+SPEC = {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}}
+
+
+def host_list(hosts: int) -> bytes:
+    """Return a Scanopy-shaped host list response body."""
+    data = [
+        {
+            "id": f"00000000-0000-0000-0000-{i:012d}",
+            "name": f"host-{i}",
+            "hostname": f"host-{i}.corp.example",
+            "description": "Discovered by network scan",
+            "interfaces": [{"subnet_id": "s1", "ip_address": f"10.0.{i >> 8 & 255}.{i & 255}"}],
+            "tags": ["bench"],
+        }
+        for i in range(hosts)
+    ]
+    return json.dumps({"success": True, "data": data}).encode()
+
+
+def upstream(body: bytes) -> ThreadingHTTPServer:
+    """Bind a mock API answering every GET with body."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):  # noqa: A002
+            pass
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    return httpd
+
+
+def drive(url: str, clients: int, seconds: float) -> dict:
+    """Call get_all_hosts from `clients` threads for `seconds`; return counts and rates."""
+    call = {
+        "jsonrpc": "2.0",
+        "id": 2,
+        "method": "tools/call",
+        "params": {"name": "get_all_hosts", "arguments": {}},
+    }
+    start = threading.Barrier(clients + 1)
+    stop = threading.Event()
+    counts = [0] * clients
+    errors = [0] * clients
+    received = [0] * clients
+
+    def client(slot: int) -> None:
+        with httpx.Client(timeout=60) as http:
+            init = http.post(url, json={"jsonrpc": "2.0", "id": 1, "method": "initialize"})
+            headers = {SESSION_HEADER: init.headers[SESSION_HEADER]}
+            start.wait()
+            while not stop.is_set():
+                response = http.post(url, json=call, headers=headers)
+                if response.status_code == 200:
+                    counts[slot] += 1
+                    received[slot] += len(response.content)
+                else:
+                    errors[slot] += 1
+
+    threads = [threading.Thread(target=client, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    start.wait()
+    began = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - began
+    return {
+        "requests": sum(counts),
+        "errors": sum(errors),
+        "requests_per_s": round(sum(counts) / elapsed, 1),
+        "mb_per_s": round(sum(received) / elapsed / (1 << 20), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hosts", type=int, default=2000, help="Hosts in the mocked list")
+    parser.add_argument("--clients", type=int, default=16, help="Concurrent client sessions")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Measured time per run")
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    args = parser.parse_args()
+
+    fork = multiprocessing.get_context("fork")
+    body = host_list(args.hosts)
+    api = upstream(body)
+    api_process = fork.Process(target=api.serve_forever, daemon=True)
+    api_process.start()
+    api.socket.close()
+    base_url = "http://%s:%d" % api.server_address[:2]
+
+    report = {
+        "cpus": os.cpu_count(),
+        "hosts": args.hosts,
+        "upstream_bytes": len(body),
+        "clients": args.clients,
+        "seconds": args.seconds,
+        "workers": {},
+    }
+    try:
+        for workers in (int(n) for n in args.workers.split(",")):
+            config = Config(base_url=base_url, api_key="key", confirm_string="CONFIRM")
+            server = PreforkHTTPServer(
+                config, "", set(), workers=workers, openapi_spec=SPEC, host="127.0.0.1", port=0
+            )
+            server.prepare()
+            url = "http://%s:%d/mcp" % server.address
+            process = fork.Process(target=server.run)
+            process.start()
+            try:
+                # Warm up every worker's runtime and upstream pool before measuring
+                drive(url, args.clients, 1.0)
+                report["workers"][str(workers)] = drive(url, args.clients, args.seconds)
+            finally:
+                process.terminate()
+                process.join()
+    finally:
+        api_process.terminate()
+        api_process.join()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
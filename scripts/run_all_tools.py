@@ -1,15 +1,255 @@
 import argparse
+import itertools
 import json
-import os
+import re
 import subprocess
 import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
 from typing import Any
 
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+READ_METHODS = {"GET", "HEAD"}
+
+# HTTP tools are described as "METHOD /path"; meta-tools carry free text
+_HTTP_DESCRIPTION_RE = re.compile(r"^([A-Z]+) /")
+
+# List tools used to discover ids for tools with required *_id arguments
+LIST_MAP = {
+    "list_networks": ("network_id",),
+    "list_subnets": ("subnet_id",),
+    "get_all_hosts": ("host_id",),
+    "list_ports": ("port_id",),
+    "list_services": ("service_id",),
+    "list_discoveries": ("discovery_id",),
+    "get_daemons": ("daemon_id",),
+}
+
+
+class StdioSession:
+    """Persistent JSON-RPC session with one `scanopy_mcp.main` process.
+
+    Requests are written to the server's stdin and responses are matched back
+    to their callers by JSON-RPC id, so many calls can be in flight at once.
+    """
+
+    def __init__(self, cmd: list[str]):
+        self._stderr = tempfile.TemporaryFile()
+        self._proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=self._stderr,
+        )
+        self._ids = itertools.count(1)
+        self._pending: dict[Any, Future] = {}
+        self._lock = threading.Lock()
+        self._closed_error: RuntimeError | None = None
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _stderr_text(self) -> str:
+        self._stderr.seek(0)
+        return self._stderr.read().decode(errors="replace")
+
+    def _read_loop(self) -> None:
+        for line in self._proc.stdout:
+            try:
+                message = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(message, dict) or "id" not in message:
+                # Notifications are not matched to any caller
+                continue
+            with self._lock:
+                future = self._pending.pop(message["id"], None)
+            if future is not None:
+                future.set_result(message)
+
+        self._proc.wait()
+        error = RuntimeError(self._stderr_text() or "server exited")
+        with self._lock:
+            self._closed_error = error
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            future.set_exception(error)
+
+    def call_async(self, method: str, params: dict | None = None) -> Future:
+        """Send a request and return a future resolved with its response."""
+        req_id = next(self._ids)
+        future: Future = Future()
+        payload = {"jsonrpc": "2.0", "id": req_id, "method": method, "params": params or {}}
+        with self._lock:
+            if self._closed_error is not None:
+                raise self._closed_error
+            self._pending[req_id] = future
+        try:
+            self._proc.stdin.write((json.dumps(payload) + "\n").encode())
+            self._proc.stdin.flush()
+        except (BrokenPipeError, OSError):
+            with self._lock:
+                self._pending.pop(req_id, None)
+            self._reader.join()
+            raise RuntimeError(self._stderr_text() or "server exited") from None
+        return future
+
+    def call(self, method: str, params: dict | None = None, timeout: float = 60.0) -> dict:
+        """Send a request and wait for its response."""
+        return self.call_async(method, params).result(timeout=timeout)
+
+    def close(self) -> None:
+        """Close stdin and wait for the server process to exit."""
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self._proc.kill()
+        self._reader.join(timeout=10)
+        self._stderr.close()
+
+
+def percentile(values: list[float], pct: float) -> float | None:
+    """Return the nearest-rank percentile of values, or None if empty."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def summarize_latencies(samples: dict[str, dict], elapsed_s: float) -> dict:
+    """Build per-tool and overall latency, throughput and error rate stats."""
+    tools = {}
+    total = 0
+    errors = 0
+    for name, sample in sorted(samples.items()):
+        latencies = sample["latencies_ms"]
+        count = len(latencies)
+        total += count
+        errors += sample["errors"]
+        tools[name] = {
+            "count": count,
+            "errors": sample["errors"],
+            "error_rate": sample["errors"] / count if count else 0.0,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "throughput_rps": count / elapsed_s if elapsed_s > 0 else 0.0,
+        }
+    all_latencies = [lat for sample in samples.values() for lat in sample["latencies_ms"]]
+    return {
+        "requests": total,
+        "errors": errors,
+        "error_rate": errors / total if total else 0.0,
+        "elapsed_s": elapsed_s,
+        "throughput_rps": total / elapsed_s if elapsed_s > 0 else 0.0,
+        "p50_ms": percentile(all_latencies, 50),
+        "p95_ms": percentile(all_latencies, 95),
+        "p99_ms": percentile(all_latencies, 99),
+        "tools": tools,
+    }
+
+
+def run_load(
+    session: StdioSession,
+    calls: list[tuple[str, dict]],
+    rate: float,
+    duration_s: float,
+    concurrency: int,
+) -> dict:
+    """Issue tool calls round-robin at a target rate over one session.
+
+    Calls are scheduled open-loop at `rate` per second; at most `concurrency`
+    requests are in flight at once.
+    """
+    samples: dict[str, dict] = {name: {"latencies_ms": [], "errors": 0} for name, _ in calls}
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(concurrency)
+    interval = 1.0 / rate if rate > 0 else 0.0
+    total = max(1, int(rate * duration_s)) if rate > 0 else len(calls)
+
+    def record(name: str, sent_at: float, future: Future) -> None:
+        latency_ms = (time.perf_counter() - sent_at) * 1000
+        try:
+            failed = "error" in future.result()
+        except Exception:
+            failed = True
+        with lock:
+            samples[name]["latencies_ms"].append(latency_ms)
+            if failed:
+                samples[name]["errors"] += 1
+        slots.release()
+
+    started = time.perf_counter()
+    futures = []
+    for i, (name, arguments) in zip(range(total), itertools.cycle(calls)):
+        delay = started + i * interval - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        slots.acquire()
+        sent_at = time.perf_counter()
+        try:
+            future = session.call_async("tools/call", {"name": name, "arguments": dict(arguments)})
+        except RuntimeError:
+            slots.release()
+            raise
+        future.add_done_callback(lambda f, n=name, s=sent_at: record(n, s, f))
+        futures.append(future)
+
+    for future in futures:
+        try:
+            future.result()
+        except Exception:
+            pass
+    elapsed_s = time.perf_counter() - started
+
+    stats = summarize_latencies(samples, elapsed_s)
+    stats.update({"target_rate": rate, "concurrency": concurrency})
+    return stats
+
+
+def tool_method(tool: dict) -> str | None:
+    """Return the HTTP method of a listed tool, or None for meta-tools."""
+    match = _HTTP_DESCRIPTION_RE.match(tool.get("description") or "")
+    return match.group(1) if match else None
+
+
+def build_arguments(required: list[str], cache: dict[str, str]) -> dict[str, Any]:
+    """Fill required tool arguments from cached ids and placeholder values."""
+    args_payload: dict[str, Any] = {}
+    for field in required:
+        if field in cache:
+            args_payload[field] = cache[field]
+        elif field.endswith("_id") and field != "id":
+            args_payload[field] = cache.get(field)
+        elif field == "id":
+            # choose any cached id
+            args_payload[field] = cache.get("host_id") or cache.get("network_id")
+        elif field in {"tags", "interfaces", "ports", "services", "bindings"}:
+            args_payload[field] = []
+        elif field in {"hidden"}:
+            args_payload[field] = False
+        else:
+            args_payload[field] = ""
+    return args_payload
+
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--out", required=True)
     parser.add_argument("--dry-run-writes", action="store_true")
+    parser.add_argument(
+        "--load", action="store_true", help="Run a concurrent load test of read tools"
+    )
+    parser.add_argument("--rate", type=float, default=10.0, help="Target calls per second")
+    parser.add_argument("--duration", type=float, default=10.0, help="Load duration in seconds")
+    parser.add_argument("--concurrency", type=int, default=4, help="Max in-flight calls")
+    parser.add_argument("--tools", default="", help="Comma-separated tools to load test")
     args = parser.parse_args()
 
     report: dict[str, Any] = {
@@ -18,28 +258,16 @@ def main() -> None:
         "dry_run": bool(args.dry_run_writes),
     }
 
-    def rpc_call(payload: dict) -> dict:
-        proc = subprocess.run(
-            [sys.executable, "-m", "scanopy_mcp.main"],
-            input=(json.dumps(payload) + "\n").encode(),
-            capture_output=True,
-        )
-        if proc.returncode != 0:
-            raise RuntimeError(proc.stderr.decode())
-        return json.loads(proc.stdout)
+    session: StdioSession | None = None
 
     def call_tool(name: str, arguments: dict) -> dict:
-        req = {
-            "jsonrpc": "2.0",
-            "id": 1000 + len(report["results"]),
-            "method": "tools/call",
-            "params": {"name": name, "arguments": arguments},
-        }
-        return rpc_call(req)
+        return session.call("tools/call", {"name": name, "arguments": arguments})
 
     try:
+        session = StdioSession([sys.executable, "-m", "scanopy_mcp.main"])
+
         # tools/list
-        resp = rpc_call({"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}})
+        resp = session.call("tools/list")
         tools = resp.get("result", {}).get("tools", [])
         report["tools"] = tools
 
@@ -52,16 +280,7 @@ def main() -> None:
 
         # cache some ids from list endpoints
         cache: dict[str, str] = {}
-        list_map = {
-            "list_networks": ("network_id",),
-            "list_subnets": ("subnet_id",),
-            "get_all_hosts": ("host_id",),
-            "list_ports": ("port_id",),
-            "list_services": ("service_id",),
-            "list_discoveries": ("discovery_id",),
-            "get_daemons": ("daemon_id",),
-        }
-        for list_tool, keys in list_map.items():
+        for list_tool, keys in LIST_MAP.items():
             if any(t["name"] == list_tool for t in tools):
                 try:
                     resp = call_tool(list_tool, {})
@@ -76,31 +295,24 @@ def main() -> None:
                     continue
 
         # execute read tools
+        read_calls: list[tuple[str, dict]] = []
         for tool in tools:
             name = tool["name"]
-            method = tool.get("description", "").split(" ")[0].upper()
-            is_write = method in {"POST", "PUT", "PATCH", "DELETE"}
-            args_payload: dict[str, Any] = {}
-
-            required = required_by_tool.get(name, [])
-            for field in required:
-                if field in cache:
-                    args_payload[field] = cache[field]
-                elif field.endswith("_id") and field != "id":
-                    args_payload[field] = cache.get(field)
-                elif field == "id":
-                    # choose any cached id
-                    args_payload[field] = cache.get("host_id") or cache.get("network_id")
-                elif field in {"tags", "interfaces", "ports", "services", "bindings"}:
-                    args_payload[field] = []
-                elif field in {"hidden"}:
-                    args_payload[field] = False
-                else:
-                    args_payload[field] = ""
+            method = tool_method(tool)
+            if method not in READ_METHODS | WRITE_METHODS:
+                # Meta-tools (batch_call, sync_inventory, ...) fan out to other
+                # tools or change local state; only API operations are run
+                report["results"][name] = {"status": "skipped"}
+                continue
+            is_write = method in WRITE_METHODS
+            args_payload = build_arguments(required_by_tool.get(name, []), cache)
 
             if is_write and args_payload and args_payload.get("id") == "":
                 args_payload.pop("id", None)
 
+            if not is_write and all(v not in (None, "") for v in args_payload.values()):
+                read_calls.append((name, dict(args_payload)))
+
             if is_write and args.dry_run_writes:
                 args_payload["dry_run"] = True
 
@@ -115,8 +327,25 @@ def main() -> None:
                 }
             except Exception as exc:
                 report["results"][name] = {"status": "error", "error": str(exc)}
+
+        if args.load:
+            selected = {name for name in args.tools.split(",") if name}
+            if selected:
+                read_calls = [call for call in read_calls if call[0] in selected]
+            if not read_calls:
+                raise RuntimeError("No read tools available for load test")
+            report["load"] = run_load(
+                session,
+                read_calls,
+                rate=args.rate,
+                duration_s=args.duration,
+                concurrency=max(1, args.concurrency),
+            )
     except Exception as exc:
         report["error"] = str(exc)
+    finally:
+        if session is not None:
+            session.close()
 
     with open(args.out, "w", encoding="utf-8") as f:
         json.dump(report, f, indent=2)
@@ -0,0 +1,72 @@
+"""Report tool input schema bytes saved by schema slimming.
+
+Usage:
+    PYTHONPATH=. python3 scripts/schema_report.py --spec openapi.json --max-depth 2
+    PYTHONPATH=. python3 scripts/schema_report.py --spec https://scanopy.example.com/openapi.json
+"""
+
+import argparse
+import json
+
+import httpx
+
+from scanopy_mcp.schema_slim import SlimOptions
+from scanopy_mcp.tool_registry import ToolRegistry
+
+
+def load_spec(source: str) -> dict:
+    """Load an OpenAPI spec from a file path or URL."""
+    if source.startswith(("http://", "https://")):
+        resp = httpx.get(source, timeout=30.0)
+        resp.raise_for_status()
+        return resp.json()
+    with open(source, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Report bytes saved by schema slimming")
+    parser.add_argument("--spec", required=True, help="OpenAPI spec file or URL")
+    parser.add_argument("--max-depth", type=int, default=3, help="0 keeps every level")
+    parser.add_argument("--max-enum", type=int, default=20, help="0 keeps every enum")
+    parser.add_argument("--keep-descriptions", action="store_true")
+    parser.add_argument("--keep-examples", action="store_true")
+    parser.add_argument("--top", type=int, default=20, help="Tools listed (0 for all)")
+    args = parser.parse_args()
+
+    options = SlimOptions(
+        max_depth=args.max_depth or None,
+        strip_descriptions=not args.keep_descriptions,
+        strip_examples=not args.keep_examples,
+        max_enum=args.max_enum or None,
+    )
+    spec = load_spec(args.spec)
+    # Report on every operation, not just allowlisted writes
+    operation_ids = {
+        op["operationId"]
+        for item in spec.get("paths", {}).values()
+        for op in item.values()
+        if isinstance(op, dict) and op.get("operationId")
+    }
+    registry = ToolRegistry(spec, allowlist=operation_ids, slim=options)
+    registry.list_tools()
+    report = registry.schema_report()
+
+    tools = list(report["tools"].items())
+    if args.top:
+        tools = tools[: args.top]
+    width = max((len(name) for name, _ in tools), default=4)
+    print(f"{'tool':<{width}}  {'full':>8}  {'slim':>8}  {'saved':>8}")
+    for name, sizes in tools:
+        print(
+            f"{name:<{width}}  {sizes['full_bytes']:>8}  {sizes['slim_bytes']:>8}  "
+            f"{sizes['saved_bytes']:>8}"
+        )
+    full, saved = report["full_bytes"], report["saved_bytes"]
+    share = saved / full * 100 if full else 0.0
+    slim = report["slim_bytes"]
+    print(f"\n{len(report['tools'])} tools: {full} -> {slim} bytes ({share:.1f}% saved)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""Tests for the batch_call meta-tool."""
+
+import threading
+import time
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.policy import PolicyGuard
+from scanopy_mcp.server import ScanopyMCPServer
+from scanopy_mcp.stdio_server import MCPStdioServer
+from scanopy_mcp.tool_registry import ToolRegistry
+
+SPEC = {
+    "paths": {
+        "/api/v1/hosts/{id}": {
+            "get": {
+                "operationId": "get_host_by_id",
+                "parameters": [{"name": "id", "in": "path", "required": True}],
+            }
+        },
+        "/api/v1/networks": {"post": {"operationId": "create_network"}},
+    }
+}
+
+
+class RecordingClient:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def request(self, method, path, json=None, params=None):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+            self.calls.append((method, path, dict(params or {})))
+        return {"id": (params or {}).get("id")}
+
+
+def _server(client, concurrency=4):
+    tools = ToolRegistry(SPEC, allowlist={"create_network"}).list_tools(include_meta=True)
+    guard = PolicyGuard(allowlist={"create_network"}, confirm_string="CONFIRM")
+    return ScanopyMCPServer(
+        tools=tools, client=client, guard=guard, batch_concurrency=concurrency
+    )
+
+
+def test_registry_only_includes_batch_call_on_request():
+    """batch_call should be added next to OpenAPI tools when asked for."""
+    assert "batch_call" not in ToolRegistry(SPEC, allowlist=set()).list_tools()
+    tools = ToolRegistry(SPEC, allowlist=set()).list_tools(include_meta=True)
+    assert tools["batch_call"].is_meta
+
+
+def test_batch_call_runs_concurrently_with_bound():
+    """Calls should run in parallel without exceeding the concurrency limit."""
+    client = RecordingClient(delay=0.05)
+    server = _server(client, concurrency=3)
+    calls = [{"name": "get_host_by_id", "arguments": {"id": str(i)}} for i in range(9)]
+
+    result = server.tools_call("batch_call", {"calls": calls})
+
+    assert result["succeeded"] == 9
+    assert [item["result"]["id"] for item in result["results"]] == [str(i) for i in range(9)]
+    assert 1 < client.max_active <= 3
+
+
+def test_batch_call_applies_policy_and_reports_per_item_errors():
+    """Writes need their own confirm; failures should not abort the batch."""
+    client = RecordingClient()
+    server = _server(client)
+
+    result = server.tools_call(
+        "batch_call",
+        {
+            "calls": [
+                {"name": "create_network", "arguments": {"name": "a"}},
+                {"name": "create_network", "arguments": {"name": "b", "confirm": "CONFIRM"}},
+                {"name": "get_host_by_id", "arguments": {}},
+                {"name": "batch_call", "arguments": {"calls": []}},
+            ]
+        },
+    )
+
+    oks = [item["ok"] for item in result["results"]]
+    assert oks == [False, True, False, False]
+    assert "confirm" in result["results"][0]["error"]
+    assert "Missing required fields" in result["results"][2]["error"]
+    assert client.calls == [("POST", "/api/v1/networks", {"name": "b"})]
+
+
+def test_stdio_lists_batch_call_with_description():
+    """tools/list should expose batch_call with its own description."""
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    server = MCPStdioServer(config=config, openapi_url="", allowlist=set(), openapi_spec=SPEC)
+
+    response = server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+
+    tools = {t["name"]: t for t in response["result"]["tools"]}
+    assert "concurrently" in tools["batch_call"]["description"]
+    assert tools["batch_call"]["inputSchema"]["required"] == ["calls"]
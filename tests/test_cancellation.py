@@ -0,0 +1,141 @@
+"""Tests for cancelling in-flight requests (notifications/cancelled)."""
+
+import json
+import socket
+import threading
+import time
+
+import httpx
+import pytest
+
+from scanopy_mcp.cancellation import (
+    CancellableTransport,
+    InFlightRequests,
+    RequestCancelledError,
+)
+from scanopy_mcp.config import Config
+from scanopy_mcp.http_server import MCPHTTPServer, _current_session, _Session
+from scanopy_mcp.stdio_server import MCPStdioServer
+from scanopy_mcp.workers import PreforkHTTPServer
+
+SPEC = {"paths": {"/api/v1/hosts": {"get": {"operationId": "hosts.list"}}}}
+
+
+def _call(req_id: int) -> str:
+    request = {
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "method": "tools/call",
+        "params": {"name": "hosts.list", "arguments": {}},
+    }
+    return json.dumps(request)
+
+
+def _cancel(req_id: int) -> str:
+    params = {"requestId": req_id, "reason": "user aborted"}
+    return json.dumps({"jsonrpc": "2.0", "method": "notifications/cancelled", "params": params})
+
+
+def test_cancel_reserved_request_applies_when_it_starts():
+    """A cancel for a queued request should take effect once it runs."""
+    inflight = InFlightRequests()
+    inflight.reserve(7)
+    assert inflight.cancel(7, "too slow")
+    with inflight.track(7) as token:
+        assert token.cancelled
+        with pytest.raises(RequestCancelledError, match="too slow"):
+            token.raise_if_cancelled()
+    assert len(inflight) == 0
+    assert not inflight.cancel(7)
+
+
+def test_cancellable_transport_aborts_body_read():
+    """Cancelling mid-body should stop the read with RequestCancelledError."""
+    inflight = InFlightRequests()
+
+    def body():
+        yield b'{"data": ['
+        inflight.cancel(1)
+        yield b"1, 2, 3]}"
+
+    transport = CancellableTransport(
+        httpx.MockTransport(lambda request: httpx.Response(200, stream=_Stream(body())))
+    )
+    with httpx.Client(transport=transport) as client, inflight.track(1):
+        with pytest.raises(RequestCancelledError):
+            client.get("http://test/api/v1/hosts")
+
+
+def test_cancellable_transport_passes_untracked_requests_through():
+    """Requests outside a tracked block should read normally."""
+    transport = CancellableTransport(httpx.MockTransport(lambda request: httpx.Response(200)))
+    with httpx.Client(transport=transport) as client:
+        assert client.get("http://test/").status_code == 200
+
+
+def test_stdio_cancels_slow_call_without_responding(mocker):
+    """A cancelled tools/call should get no response while others still do."""
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    server = MCPStdioServer(config=config, openapi_url="", allowlist=set(), openapi_spec=SPEC)
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return httpx.Response(200, json={"hosts": []}, request=httpx.Request("GET", "http://test"))
+
+    mocker.patch("httpx.Client.request", side_effect=slow)
+    written = []
+    mocker.patch.object(server, "_write", side_effect=written.append)
+
+    def lines():
+        yield _call(1)
+        assert started.wait(5)
+        yield _cancel(1)
+        yield json.dumps({"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+        release.set()
+
+    server._serve(lines())
+
+    assert [message["id"] for message in written] == [2]
+    assert len(server._inflight) == 0
+
+
+class _Stream(httpx.SyncByteStream):
+    def __init__(self, chunks):
+        self._chunks = chunks
+
+    def __iter__(self):
+        yield from self._chunks
+
+
+def test_cancel_is_relayed_to_the_worker_handling_the_request():
+    """A worker not handling the request should pass the cancel to the others."""
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    supervisor = PreforkHTTPServer(config, "", set(), openapi_spec=SPEC)
+    workers = []
+    for pid in (1, 2):
+        supervisor_end, worker_end = socket.socketpair()
+        supervisor_end.settimeout(5)
+        supervisor._children[pid] = (pid, supervisor_end)
+        worker = MCPHTTPServer(config, "", set(), openapi_spec=SPEC, relay=worker_end)
+        threading.Thread(target=worker._read_relay, daemon=True).start()
+        workers.append((worker, supervisor_end))
+
+    (receiver, receiver_relay), (handler, _) = workers
+    token = handler._inflight.reserve(("s1", 7))
+    reset = _current_session.set(_Session("s1", "default"))
+    try:
+        receiver.handle_request(json.loads(_cancel(7)))
+    finally:
+        _current_session.reset(reset)
+    supervisor._broadcast(receiver_relay.recv(4096))
+
+    for _ in range(100):
+        if token.cancelled:
+            break
+        time.sleep(0.01)
+    assert token.cancelled and token.reason == "user aborted"
+    for _, relay in supervisor._children.values():
+        relay.close()
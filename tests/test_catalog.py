@@ -0,0 +1,51 @@
+"""Tests for scanopy_mcp.catalog."""
+
+import pytest
+
+from scanopy_mcp.catalog import Catalog, CatalogTools, compile_catalog
+
+SCHEMA = {"type": "object", "properties": {"name": {"type": "string"}}, "required": ["name"]}
+TOOLS = {
+    "get_all_hosts": {"method": "GET", "path": "/api/v1/hosts", "input_schema": SCHEMA},
+    "create_host": {"method": "POST", "path": "/api/v1/hosts", "input_schema": SCHEMA},
+}
+
+
+def test_catalog_roundtrip(tmp_path):
+    """A compiled catalog should map back to the same tool definitions."""
+    path = str(tmp_path / "catalog.bin")
+    compile_catalog(TOOLS, path)
+
+    catalog = Catalog(path)
+    try:
+        assert list(catalog) == list(TOOLS)
+        assert len(catalog) == 2
+        assert "create_host" in catalog
+        tool = catalog.get("create_host")
+        assert (tool.method, tool.path, tool.is_write) == ("POST", "/api/v1/hosts", True)
+        assert tool.required == frozenset({"name"})
+        assert tool.to_dict() == TOOLS["create_host"]
+        with pytest.raises(KeyError):
+            catalog.get("missing")
+    finally:
+        catalog.close()
+
+
+def test_catalog_rejects_other_files(tmp_path):
+    path = tmp_path / "not-a-catalog.bin"
+    path.write_bytes(b"{}" * 16)
+    with pytest.raises(ValueError, match="Not a tool catalog"):
+        Catalog(str(path))
+
+
+def test_catalog_tools_overlay(tmp_path):
+    """Runtime additions should sit on top of the read-only catalog."""
+    path = str(tmp_path / "catalog.bin")
+    compile_catalog(TOOLS, path)
+    tools = CatalogTools(Catalog(path))
+
+    tools["batch_call"] = {"kind": "meta"}
+    assert list(tools) == ["get_all_hosts", "create_host", "batch_call"]
+    assert len(tools) == 3
+    assert tools["get_all_hosts"] is tools["get_all_hosts"]
+    assert tools["batch_call"].is_meta
@@ -1,6 +1,17 @@
 """Tests for scanopy_mcp.client."""
 
-from scanopy_mcp.client import ScanopyClient
+import gzip
+import json
+import time
+
+import httpx
+import pytest
+
+from scanopy_mcp.cache import ResponseCache, uncached
+from scanopy_mcp.client import HEDGE_MIN_SAMPLES, ScanopyClient
+from scanopy_mcp.compression import accept_encoding, parse_encodings
+from scanopy_mcp.deadlines import DeadlineExceededError, deadline
+from scanopy_mcp.metrics import Metrics
 
 
 def test_auth_header_is_bearer():
@@ -11,9 +22,9 @@ def test_auth_header_is_bearer():
 
 def test_request_includes_base_url(mocker):
     """Client should prepend base URL to request path."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {"result": "ok"}
-    mock_response.raise_for_status = mocker.Mock()
+    mock_response = httpx.Response(
+        200, json={"result": "ok"}, request=httpx.Request("GET", "http://test")
+    )
     httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
 
     client = ScanopyClient(base_url="http://test", api_key="key123")
@@ -26,9 +37,7 @@ def test_request_includes_base_url(mocker):
 
 def test_request_passes_json_body(mocker):
     """Client should pass JSON body in POST requests."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {"id": 1}
-    mock_response.raise_for_status = mocker.Mock()
+    mock_response = httpx.Response(200, json={"id": 1}, request=httpx.Request("GET", "http://test"))
     httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
 
     client = ScanopyClient(base_url="http://test", api_key="key123")
@@ -41,9 +50,9 @@ def test_request_passes_json_body(mocker):
 
 def test_request_substitutes_path_params(mocker):
     """Client should substitute {id} placeholders in path."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {"id": 123}
-    mock_response.raise_for_status = mocker.Mock()
+    mock_response = httpx.Response(
+        200, json={"id": 123}, request=httpx.Request("GET", "http://test")
+    )
     httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
 
     client = ScanopyClient(base_url="http://test", api_key="key123")
@@ -58,9 +67,9 @@ def test_request_substitutes_path_params(mocker):
 
 def test_request_sends_query_params_for_get(mocker):
     """Client should send query params for GET requests."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {"hosts": []}
-    mock_response.raise_for_status = mocker.Mock()
+    mock_response = httpx.Response(
+        200, json={"hosts": []}, request=httpx.Request("GET", "http://test")
+    )
     httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
 
     client = ScanopyClient(base_url="http://test", api_key="key123")
@@ -73,9 +82,9 @@ def test_request_sends_query_params_for_get(mocker):
 
 def test_request_includes_path_param_in_body_for_put(mocker):
     """PUT should include id in body even when used in path."""
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {"ok": True}
-    mock_response.raise_for_status = mocker.Mock()
+    mock_response = httpx.Response(
+        200, json={"ok": True}, request=httpx.Request("GET", "http://test")
+    )
     httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
 
     client = ScanopyClient(base_url="http://test", api_key="key123")
@@ -88,3 +97,177 @@ def test_request_includes_path_param_in_body_for_put(mocker):
 
     call_kwargs = httpx_mock.call_args[1]
     assert call_kwargs["json"]["id"] == "abc"
+
+
+def test_cached_get_skips_upstream_until_a_write(mocker):
+    """Fresh GETs should come from the cache; any write should clear it."""
+    mock_response = httpx.Response(
+        200, json={"data": []}, request=httpx.Request("GET", "http://test")
+    )
+    httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
+
+    client = ScanopyClient(base_url="http://test", api_key="key123", cache=ResponseCache(60))
+    first = client.request("GET", "/api/v1/hosts", params={"limit": 5})
+    assert client.request("GET", "/api/v1/hosts", params={"limit": 5}) is first
+    assert httpx_mock.call_count == 1
+
+    client.request("POST", "/api/v1/hosts", params={"name": "new"})
+    client.request("GET", "/api/v1/hosts", params={"limit": 5})
+    assert httpx_mock.call_count == 3
+
+
+def test_uncached_get_goes_upstream_and_refreshes_cache():
+    """GETs inside uncached() should skip fresh hits but still store the response."""
+    bodies = iter([{"data": [1]}, {"data": [2]}])
+    client = ScanopyClient(base_url="http://test", api_key="key123", cache=ResponseCache(60))
+    client._http = httpx.Client(
+        transport=httpx.MockTransport(lambda request: httpx.Response(200, json=next(bodies)))
+    )
+
+    assert client.request("GET", "/api/v1/discoveries") == {"data": [1]}
+    with uncached():
+        assert client.request("GET", "/api/v1/discoveries") == {"data": [2]}
+    assert client.request("GET", "/api/v1/discoveries") == {"data": [2]}
+
+
+def test_compressed_responses_record_wire_and_decoded_bytes(mocker):
+    """Client should negotiate compression and count wire bytes next to decoded ones."""
+    body = json.dumps({"data": [{"ip": "10.0.0.1", "port": 443}] * 200}).encode()
+
+    def handler(request):
+        assert request.headers["accept-encoding"].split(",")[0] == "gzip"
+        # A stream, as from the network, so wire bytes are counted while decoding
+        return httpx.Response(
+            200, headers={"content-encoding": "gzip"}, stream=httpx.ByteStream(gzip.compress(body))
+        )
+
+    metrics = Metrics()
+    client = ScanopyClient(
+        base_url="http://test", api_key="key123", metrics=metrics, encodings=("gzip",)
+    )
+    client._http = httpx.Client(transport=httpx.MockTransport(handler))
+
+    assert client.request("GET", "/api/v1/hosts")["data"][0]["port"] == 443
+    snapshot = metrics.snapshot()
+    assert snapshot["bytes_in"] == len(body)
+    assert snapshot["bytes_in_wire"] == len(gzip.compress(body))
+    assert snapshot["bytes_in_wire"] * 10 < snapshot["bytes_in"]
+
+
+def test_accept_encoding_skips_missing_decoders(mocker):
+    mocker.patch("scanopy_mcp.compression.available_encodings", return_value=("gzip", "deflate"))
+    assert accept_encoding(("zstd", "br", "gzip", "deflate")) == "gzip, deflate;q=0.9"
+    assert accept_encoding(("zstd",)) == "identity"
+    assert parse_encodings("zstd, GZIP") == ("zstd", "gzip")
+    assert parse_encodings("none") == ()
+    with pytest.raises(ValueError, match="lz4"):
+        parse_encodings("lz4")
+
+
+def test_expired_get_revalidates_with_conditional_headers():
+    """An expired entry should be revalidated; a 304 keeps the cached object."""
+    now = [0.0]
+    seen = []
+
+    def handler(request):
+        seen.append(request.headers.get("if-none-match"))
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"'}, json={"data": [1, 2, 3]})
+
+    metrics = Metrics()
+    cache = ResponseCache(10, metrics=metrics, clock=lambda: now[0])
+    client = ScanopyClient(base_url="http://test", api_key="key123", cache=cache)
+    client._http = httpx.Client(transport=httpx.MockTransport(handler))
+
+    first = client.request("GET", "/api/v1/hosts")
+    assert client.request("GET", "/api/v1/hosts") is first
+    now[0] = 11.0
+    assert client.request("GET", "/api/v1/hosts") is first
+    assert client.request("GET", "/api/v1/hosts") is first
+    assert seen == [None, '"v1"']
+
+    stats = metrics.snapshot()["caches"]["upstream_get"]
+    assert (stats["hits"], stats["revalidations"], stats["misses"]) == (2, 1, 1)
+    assert stats["revalidate_rate"] == 0.25
+
+
+def test_tool_timeout_is_capped_by_request_deadline():
+    """Per-tool timeouts should apply, but never past the request deadline."""
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return httpx.Response(200, json={})
+
+    metrics = Metrics()
+    client = ScanopyClient(
+        base_url="http://test", api_key="key123", metrics=metrics, tool_timeouts={"slow": 60}
+    )
+    client._http = httpx.Client(transport=httpx.MockTransport(handler))
+
+    client.request("GET", "/api/v1/hosts")
+    with metrics.tool("slow"):
+        client.request("GET", "/api/v1/hosts")
+        with deadline(2):
+            client.request("GET", "/api/v1/hosts")
+    assert timeouts[:2] == [10.0, 60]
+    assert 1.5 < timeouts[2] <= 2
+
+
+def test_passed_deadline_fails_without_a_request():
+    """No upstream attempt should start once the deadline has passed."""
+    seen = []
+    client = ScanopyClient(base_url="http://test", api_key="key123")
+    client._http = httpx.Client(
+        transport=httpx.MockTransport(lambda request: seen.append(request) or httpx.Response(200))
+    )
+    with deadline(0.001):
+        time.sleep(0.01)
+        with pytest.raises(DeadlineExceededError):
+            client.request("GET", "/api/v1/hosts")
+    assert seen == []
+
+
+def test_get_retries_unavailable_upstream_but_writes_do_not(mocker):
+    """GETs should be retried on 503; writes should fail on the first one."""
+    mocker.patch("scanopy_mcp.client.RETRY_BACKOFF_S", 0.001)
+    statuses = [503, 503, 200, 503]
+
+    def handler(request):
+        status = statuses.pop(0)
+        return httpx.Response(status, json={"ok": status == 200})
+
+    client = ScanopyClient(base_url="http://test", api_key="key123", retries=2)
+    client._http = httpx.Client(transport=httpx.MockTransport(handler))
+
+    assert client.request("GET", "/api/v1/hosts") == {"ok": True}
+    with pytest.raises(httpx.HTTPStatusError):
+        client.request("POST", "/api/v1/networks", json={"name": "lab"})
+    assert statuses == []
+
+
+def test_slow_get_is_hedged_and_fast_copy_wins():
+    """A GET slower than the tool's p95 should be raced by a second copy."""
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if len(calls) == 1:
+            time.sleep(0.5)
+            return httpx.Response(200, json={"copy": "first"})
+        return httpx.Response(200, json={"copy": "hedge"})
+
+    metrics = Metrics()
+    for _ in range(HEDGE_MIN_SAMPLES):
+        metrics.observe("upstream", 0.02, tool="get_hosts")
+    client = ScanopyClient(base_url="http://test", api_key="key123", metrics=metrics, hedge=True)
+    client._http = httpx.Client(transport=httpx.MockTransport(handler))
+
+    start = time.perf_counter()
+    with metrics.tool("get_hosts"):
+        assert client.request("GET", "/api/v1/hosts") == {"copy": "hedge"}
+    assert time.perf_counter() - start < 0.4
+    assert len(calls) == 2
+    assert metrics.snapshot()["hedges"] == {"sent": 1, "won": 1}
+    client.close()
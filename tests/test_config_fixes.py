@@ -33,3 +33,16 @@ def test_config_accepts_valid_confirm_string(monkeypatch):
 
     cfg = load_config()
     assert cfg.confirm_string == "I CONFIRM"
+
+
+def test_config_parses_tool_timeouts(monkeypatch):
+    """SCANOPY_TOOL_TIMEOUTS should map tools to seconds and reject bad pairs."""
+    monkeypatch.setenv("SCANOPY_BASE_URL", "http://test")
+    monkeypatch.setenv("SCANOPY_API_KEY", "test_key")
+    monkeypatch.setenv("SCANOPY_TOOL_TIMEOUTS", "get_hosts=2.5, create_discovery=30")
+
+    assert load_config().tool_timeouts == {"get_hosts": 2.5, "create_discovery": 30.0}
+
+    monkeypatch.setenv("SCANOPY_TOOL_TIMEOUTS", "get_hosts")
+    with pytest.raises(ValueError, match="tool=seconds"):
+        load_config()
@@ -0,0 +1,144 @@
+"""Tests for scanopy_mcp.discovery."""
+
+import httpx
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.discovery import DiscoveryTracker
+from scanopy_mcp.stdio_server import MCPStdioServer
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _tracker(responses, clock):
+    calls = []
+
+    def poll():
+        calls.append(clock.now)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    tracker = DiscoveryTracker(poll=poll, min_interval_s=1.0, max_interval_s=4.0, clock=clock)
+    return tracker, calls
+
+
+def test_tracker_reports_progress_until_terminal_phase():
+    """Progress notifications should follow state changes until completion."""
+    clock = FakeClock()
+    responses = [
+        {"data": [{"id": "d1", "phase": "Scanning", "processed": 3, "total_to_process": 10}]},
+        {"data": [{"id": "d1", "phase": "Complete", "processed": 10, "total_to_process": 10}]},
+    ]
+    tracker, _ = _tracker(responses, clock)
+    sent = []
+    tracker.track("d1", "tok", sent.append)
+
+    clock.now = 1.0
+    tracker.poll_once()
+    clock.now = 2.0
+    assert tracker.poll_once() is None
+
+    params = [m["params"] for m in sent]
+    assert all(m["method"] == "notifications/progress" for m in sent)
+    assert [p["progress"] for p in params] == [0.0, 3.0, 10.0]
+    assert params[-1]["total"] == 10
+    assert "Complete" in params[-1]["message"]
+    assert tracker.active == []
+
+
+def test_tracker_progress_only_increases():
+    """State changes that do not advance progress should not be notified."""
+    clock = FakeClock()
+    responses = [
+        {"data": [{"id": "d1", "phase": "Scanning", "processed": 0}]},
+        {"data": [{"id": "d1", "phase": "Scanning", "processed": 4}]},
+        {"data": [{"id": "d1", "phase": "Processing", "processed": 2}]},
+        {"data": [{"id": "d1", "phase": "Complete", "processed": 4}]},
+    ]
+    tracker, _ = _tracker(responses, clock)
+    sent = []
+    tracker.track("d1", "tok", sent.append)
+    for now in (1.0, 2.0, 3.0, 4.0):
+        clock.now = now
+        tracker.poll_once()
+
+    assert [m["params"]["progress"] for m in sent] == [0.0, 4.0, 5.0]
+
+
+def test_tracker_backs_off_and_shares_one_poll():
+    """Unchanged discoveries back off; due discoveries share a single poll."""
+    clock = FakeClock()
+    response = {"data": [{"id": "a", "phase": "Scanning"}, {"id": "b", "phase": "Scanning"}]}
+    tracker, calls = _tracker([response], clock)
+    tracker.track("a", 1, lambda m: None)
+    tracker.track("b", 2, lambda m: None)
+
+    clock.now = 1.0
+    assert tracker.poll_once() == 1.0  # first observation resets to min interval
+    clock.now = 2.0
+    assert tracker.poll_once() == 1.5  # unchanged, so backoff
+    assert len(calls) == 2
+
+
+def test_cancel_stops_tracking_with_final_notification():
+    """Cancelling by session id should end tracking."""
+    clock = FakeClock()
+    response = {"data": [{"id": "d1", "session_id": "s1", "phase": "Scanning"}]}
+    tracker, _ = _tracker([response], clock)
+    sent = []
+    tracker.track("d1", "tok", sent.append)
+    clock.now = 1.0
+    tracker.poll_once()
+
+    assert tracker.cancel("s1") is True
+    assert tracker.active == []
+    assert "cancelled" in sent[-1]["params"]["message"]
+
+
+def test_stdio_tracks_create_discovery_with_progress_token(mocker):
+    """create_discovery with a progressToken should start tracking."""
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    server = MCPStdioServer(
+        config=config,
+        openapi_url="",
+        allowlist={"create_discovery"},
+        openapi_spec={
+            "paths": {
+                "/api/v1/discoveries": {
+                    "post": {"operationId": "create_discovery"},
+                    "get": {"operationId": "list_discoveries"},
+                }
+            }
+        },
+    )
+    mock_response = httpx.Response(
+        200,
+        json={"success": True, "data": {"id": "d1"}},
+        request=httpx.Request("GET", "http://test"),
+    )
+    mocker.patch("httpx.Client.request", return_value=mock_response)
+    written = []
+    mocker.patch.object(server, "_write", side_effect=written.append)
+
+    server.handle_request(
+        {
+            "jsonrpc": "2.0",
+            "id": 1,
+            "method": "tools/call",
+            "params": {
+                "name": "create_discovery",
+                "arguments": {"confirm": "CONFIRM"},
+                "_meta": {"progressToken": "p1"},
+            },
+        }
+    )
+    tracker = server._discoveries["default"]
+    try:
+        assert tracker.active == ["d1"]
+        assert written[0]["params"]["progressToken"] == "p1"
+    finally:
+        tracker.stop()
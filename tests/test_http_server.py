@@ -0,0 +1,114 @@
+"""Tests for scanopy_mcp.http_server over loopback."""
+
+import queue
+import threading
+
+import httpx
+import pytest
+
+from scanopy_mcp.client import ScanopyClient
+from scanopy_mcp.config import Config
+from scanopy_mcp.http_server import SESSION_HEADER, MCPHTTPServer
+
+SPEC = {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}}
+
+
+@pytest.fixture
+def http_server():
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    server = MCPHTTPServer(
+        config=config, openapi_url="", allowlist=set(), openapi_spec=SPEC, host="127.0.0.1", port=0
+    )
+    server.bind()
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    host, port = server.address
+    try:
+        yield server, f"http://{host}:{port}/mcp"
+    finally:
+        server.shutdown()
+        thread.join(timeout=5)
+
+
+def _initialize(url):
+    response = httpx.post(url, json={"jsonrpc": "2.0", "id": 1, "method": "initialize"})
+    assert response.status_code == 200
+    return response.headers[SESSION_HEADER]
+
+
+def test_sessions_share_one_runtime(http_server, mocker):
+    """Concurrent clients should be served by the same runtime and upstream pool."""
+    server, url = http_server
+    # Patch the upstream client rather than httpx, which the test client uses too
+    upstream = mocker.patch.object(ScanopyClient, "request", return_value={"data": []})
+
+    sessions = [_initialize(url) for _ in range(2)]
+    assert sessions[0] != sessions[1]
+
+    call = {
+        "jsonrpc": "2.0",
+        "id": 2,
+        "method": "tools/call",
+        "params": {"name": "get_all_hosts", "arguments": {}},
+    }
+    for session in sessions:
+        response = httpx.post(url, json=call, headers={SESSION_HEADER: session})
+        assert response.json()["result"]["content"][0]["text"] == '{"data": []}'
+
+    assert upstream.call_count == 2
+    assert server.metrics.snapshot()["tools"]["get_all_hosts"]["calls"] == 2
+
+
+def test_session_rules_and_batches(http_server):
+    """Requests need a known session; notification-only posts get 202."""
+    _, url = http_server
+    listing = {"jsonrpc": "2.0", "id": 3, "method": "tools/list"}
+
+    assert httpx.post(url, json=listing).status_code == 400
+    assert httpx.post(url, json=listing, headers={SESSION_HEADER: "nope"}).status_code == 404
+
+    session = _initialize(url)
+    headers = {SESSION_HEADER: session}
+    initialized = {"jsonrpc": "2.0", "method": "notifications/initialized"}
+    assert httpx.post(url, json=initialized, headers=headers).status_code == 202
+
+    batch = httpx.post(url, json=[initialized, listing], headers=headers).json()
+    assert [r["id"] for r in batch] == [3]
+
+    assert httpx.delete(url, headers=headers).status_code == 204
+    assert httpx.post(url, json=listing, headers=headers).status_code == 404
+
+
+def test_foreign_origin_is_rejected(http_server):
+    """Browser requests from other sites must not reach the server."""
+    _, url = http_server
+    response = httpx.post(
+        url,
+        json={"jsonrpc": "2.0", "id": 1, "method": "initialize"},
+        headers={"Origin": "https://evil.example"},
+    )
+    assert response.status_code == 403
+
+
+def test_get_stream_delivers_notifications(http_server):
+    """Server-initiated notifications should arrive on the session's event stream."""
+    server, url = http_server
+    session = _initialize(url)
+    lines = queue.Queue()
+
+    def listen():
+        headers = {SESSION_HEADER: session, "Accept": "text/event-stream"}
+        with httpx.stream("GET", url, headers=headers, timeout=10) as response:
+            for line in response.iter_lines():
+                if line:
+                    lines.put(line)
+
+    threading.Thread(target=listen, daemon=True).start()
+    assert lines.get(timeout=5) == ": stream open"
+
+    server._write({"jsonrpc": "2.0", "method": "notifications/tools/list_changed"})
+    received = [lines.get(timeout=5) for _ in range(2)]
+    assert received == [
+        "event: message",
+        'data: {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}',
+    ]
@@ -0,0 +1,135 @@
+"""Tests for idempotency keys and the write ledger."""
+
+import threading
+import time
+
+import httpx
+import pytest
+
+from scanopy_mcp.cancellation import CancelToken, RequestCancelledError, activate
+from scanopy_mcp.client import ScanopyClient
+from scanopy_mcp.deadlines import DeadlineExceededError, deadline
+from scanopy_mcp.idempotency import IDEMPOTENCY_HEADER, WriteLedger, idempotency_key
+from scanopy_mcp.metrics import Metrics
+from scanopy_mcp.server import ScanopyMCPServer
+
+TOOLS = {
+    "create_network": {"method": "POST", "path": "/api/v1/networks"},
+    "get_networks": {"method": "GET", "path": "/api/v1/networks"},
+}
+
+
+def _server(handler, ledger=None):
+    client = ScanopyClient(base_url="http://test", api_key="key123")
+    client._http = httpx.Client(transport=httpx.MockTransport(handler))
+    return ScanopyMCPServer(tools=dict(TOOLS), client=client, write_ledger=ledger)
+
+
+def test_key_ignores_argument_order_but_not_tool():
+    """Keys should depend on the tool and argument values only."""
+    key = idempotency_key("create_network", {"name": "lab", "cidr": "10.0.0.0/24"})
+    assert key == idempotency_key("create_network", {"cidr": "10.0.0.0/24", "name": "lab"})
+    assert key != idempotency_key("update_network", {"name": "lab", "cidr": "10.0.0.0/24"})
+    assert key != idempotency_key("create_network", {"name": "lab2", "cidr": "10.0.0.0/24"})
+
+
+def test_only_writes_carry_idempotency_key():
+    """Writes should send their key upstream; reads should not."""
+    keys = []
+
+    def handler(request):
+        keys.append(request.headers.get(IDEMPOTENCY_HEADER))
+        return httpx.Response(200, json={"id": len(keys)})
+
+    server = _server(handler)
+    server.tools_call("get_networks", {})
+    server.tools_call("create_network", {"name": "lab"})
+    server.tools_call("create_network", {"name": "lab"})
+    expected = idempotency_key("create_network", {"name": "lab"})
+    assert keys == [None, expected, expected]
+
+
+def test_replayed_write_returns_recorded_result():
+    """A replay within the TTL should not reach the API again."""
+    seen = []
+
+    def handler(request):
+        seen.append(request)
+        return httpx.Response(200, json={"id": len(seen)})
+
+    metrics = Metrics()
+    server = _server(handler, WriteLedger(60, metrics=metrics))
+    assert server.tools_call("create_network", {"name": "lab"}) == {"id": 1}
+    assert server.tools_call("create_network", {"name": "lab"}) == {"id": 1, "deduplicated": True}
+    assert server.tools_call("create_network", {"name": "other"}) == {"id": 2}
+    stats = metrics.snapshot()["caches"]["write_ledger"]
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_ledger_forgets_expired_and_failed_writes():
+    """Expired entries and failures should let the write be sent again."""
+    now = [0.0]
+    calls = []
+    ledger = WriteLedger(10, clock=lambda: now[0])
+
+    def failing():
+        calls.append("fail")
+        raise httpx.ConnectError("down")
+
+    with pytest.raises(httpx.ConnectError):
+        ledger.run("k", failing)
+    assert ledger.run("k", lambda: calls.append("ok") or "done") == ("done", False)
+    assert ledger.run("k", lambda: calls.append("again")) == ("done", True)
+    now[0] = 11.0
+    ledger.run("k", lambda: calls.append("expired"))
+    assert calls == ["fail", "ok", "expired"]
+
+
+def test_concurrent_replays_share_one_write():
+    """Replays arriving while the write is in flight should wait for it."""
+    ledger = WriteLedger(60)
+    calls = []
+
+    def write():
+        calls.append(1)
+        time.sleep(0.1)
+        return {"id": 7}
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(ledger.run("k", write))) for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert calls == [1]
+    assert sorted(replayed for _, replayed in results) == [False, True, True, True]
+    assert all(result == {"id": 7} for result, _ in results)
+
+
+def test_waiting_replay_honours_deadline_and_cancellation():
+    """A replay waiting on an in-flight write should stop at its deadline or on cancel."""
+    ledger = WriteLedger(60)
+    started, release = threading.Event(), threading.Event()
+
+    def write():
+        started.set()
+        release.wait(5)
+        return {"id": 7}
+
+    leader = threading.Thread(target=ledger.run, args=("k", write))
+    leader.start()
+    started.wait(5)
+    try:
+        with deadline(0.05), pytest.raises(DeadlineExceededError):
+            ledger.run("k", write)
+
+        token = CancelToken()
+        threading.Timer(0.05, token.cancel, args=("client cancelled",)).start()
+        with activate(token), pytest.raises(RequestCancelledError, match="client cancelled"):
+            ledger.run("k", write)
+    finally:
+        release.set()
+        leader.join()
+    assert ledger.run("k", write) == ({"id": 7}, True)
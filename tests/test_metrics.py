@@ -0,0 +1,96 @@
+"""Tests for scanopy_mcp.metrics."""
+
+from unittest.mock import Mock
+
+import httpx
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.metrics import Histogram, Metrics, PrometheusFileWriter
+from scanopy_mcp.server import ScanopyMCPServer
+from scanopy_mcp.stdio_server import MCPStdioServer
+
+
+def test_histogram_quantile_uses_bucket_bounds():
+    """Quantiles should report the upper bound of the matching bucket."""
+    hist = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 5.0):
+        hist.observe(value)
+
+    assert hist.quantile(0.5) == 0.1
+    assert hist.quantile(0.75) == 1.0
+    assert hist.snapshot()["buckets"]["+Inf"] == 4
+
+
+def test_server_records_calls_errors_and_phases():
+    """Server should count calls and errors and time validation per tool."""
+    metrics = Metrics()
+    client = Mock()
+    client.request = Mock(return_value={"ok": True})
+    tools = {
+        "hosts.list": {"method": "GET", "path": "/api/v1/hosts"},
+        "hosts.get": {
+            "method": "GET",
+            "path": "/api/v1/hosts/{id}",
+            "input_schema": {"required": ["id"]},
+        },
+    }
+    server = ScanopyMCPServer(tools=tools, client=client, metrics=metrics)
+
+    server.tools_call("hosts.list", {})
+    try:
+        server.tools_call("hosts.get", {})
+    except ValueError:
+        pass
+
+    snap = metrics.snapshot()
+    assert snap["tools"]["hosts.list"]["calls"] == 1
+    assert snap["tools"]["hosts.list"]["errors"] == 0
+    assert snap["tools"]["hosts.get"]["errors"] == 1
+    assert {"validate", "total"} <= set(snap["tools"]["hosts.list"]["latency"])
+
+
+def test_cache_hit_rate_and_prometheus_output():
+    """Cache counters should produce hit rates and Prometheus lines."""
+    metrics = Metrics()
+    metrics.record_cache("openapi_spec", hit=False)
+    metrics.record_cache("openapi_spec", hit=True)
+    metrics.observe("upstream", 0.02, tool="get_all_hosts")
+
+    assert metrics.snapshot()["caches"]["openapi_spec"]["hit_rate"] == 0.5
+    text = metrics.to_prometheus()
+    assert 'scanopy_mcp_cache_hits_total{cache="openapi_spec"} 1' in text
+    assert 'phase="upstream",le="0.025"} 1' in text
+
+
+def test_stdio_server_metrics_method(mocker):
+    """server/metrics should return a snapshot including upstream timings."""
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    server = MCPStdioServer(
+        config=config,
+        openapi_url="",
+        allowlist=set(),
+        openapi_spec={"paths": {"/api/v1/hosts": {"get": {"operationId": "hosts.list"}}}},
+    )
+    mock_response = httpx.Response(
+        200, json={"hosts": []}, request=httpx.Request("GET", "http://test")
+    )
+    mocker.patch("httpx.Client.request", return_value=mock_response)
+
+    server.handle_request(
+        {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "hosts.list"}}
+    )
+    response = server.handle_request({"jsonrpc": "2.0", "id": 2, "method": "server/metrics"})
+
+    phases = response["result"]["tools"]["hosts.list"]["latency"]
+    assert {"validate", "upstream", "decode", "serialize", "total"} <= set(phases)
+
+
+def test_prometheus_file_writer_writes_file(tmp_path):
+    """Writer should dump Prometheus text to the configured path."""
+    metrics = Metrics()
+    metrics.record_call("hosts.list")
+    path = tmp_path / "metrics.prom"
+
+    PrometheusFileWriter(metrics, str(path)).write_once()
+
+    assert 'scanopy_mcp_tool_calls_total{tool="hosts.list"} 1' in path.read_text()
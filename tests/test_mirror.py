@@ -0,0 +1,145 @@
+"""Tests for scanopy_mcp.mirror."""
+
+import httpx
+import pytest
+
+from scanopy_mcp import mirror as mirror_module
+from scanopy_mcp.mirror import InventoryMirror
+from scanopy_mcp.runtime import build_runtime
+
+
+def _fetcher(data):
+    calls = []
+
+    def fetch(tool, args):
+        calls.append(tool)
+        return {"success": True, "data": data.get(tool, [])}
+
+    return fetch, calls
+
+
+def test_sync_is_incremental():
+    """Second sync should only touch changed, added and removed entities."""
+    data = {
+        "get_all_hosts": [
+            {"id": "h1", "name": "a", "updated_at": "t1"},
+            {"id": "h2", "name": "b", "updated_at": "t1"},
+        ]
+    }
+    fetch, _ = _fetcher(data)
+    mirror = InventoryMirror(":memory:", fetch=fetch)
+
+    assert mirror.sync(["hosts"])["hosts"]["added"] == 2
+
+    data["get_all_hosts"] = [
+        {"id": "h1", "name": "a", "updated_at": "t1"},
+        {"id": "h3", "name": "c", "updated_at": "t2"},
+    ]
+    stats = mirror.sync(["hosts"])["hosts"]
+    assert stats == {"added": 1, "updated": 0, "removed": 1, "unchanged": 1}
+
+
+def _host(host_id, name, subnet_id, ip):
+    return {"id": host_id, "name": name, "interfaces": [{"subnet_id": subnet_id, "ip_address": ip}]}
+
+
+def test_query_hosts_by_port_and_subnet():
+    """Hosts should be filterable by exposed port and subnet membership."""
+    data = {
+        "get_all_hosts": [
+            _host("h1", "web", "s1", "10.0.0.1"),
+            _host("h2", "db", "s2", "10.0.1.1"),
+            _host("h3", "jump", "s1", "10.0.0.9"),
+        ],
+        "list_ports": [
+            {"id": "p1", "host_id": "h1", "number": 22, "protocol": "Tcp"},
+            {"id": "p2", "host_id": "h2", "number": 22, "protocol": "Tcp"},
+            {"id": "p3", "host_id": "h3", "port_type": {"number": 443, "protocol": "Tcp"}},
+        ],
+    }
+    fetch, _ = _fetcher(data)
+    mirror = InventoryMirror(":memory:", fetch=fetch)
+    mirror.sync(["hosts", "ports"])
+
+    names = [h["name"] for h in mirror.query("hosts", port=22, subnet_id="s1")]
+    assert names == ["web"]
+    assert [h["id"] for h in mirror.query("hosts", port=443)] == ["h3"]
+    assert [h["id"] for h in mirror.query("hosts", where={"name": "db"})] == ["h2"]
+
+
+def test_sync_reads_paged_lists_to_the_end(monkeypatch):
+    """Paged list tools should be read page by page; a page that repeats fails."""
+    monkeypatch.setattr(mirror_module, "SYNC_PAGE_SIZE", 2)
+    hosts = [{"id": f"h{i}", "name": str(i)} for i in range(5)]
+    offsets = []
+
+    def fetch(tool, args):
+        offsets.append(args["offset"])
+        return {"data": hosts[args["offset"] : args["offset"] + args["limit"]]}
+
+    mirror = InventoryMirror(":memory:", fetch=fetch, paged=["get_all_hosts"])
+    assert mirror.sync(["hosts"])["hosts"]["added"] == 5
+    assert offsets == [0, 2, 4]
+
+    stuck = InventoryMirror(
+        ":memory:", fetch=lambda tool, args: {"data": hosts[:2]}, paged=["get_all_hosts"]
+    )
+    with pytest.raises(ValueError, match="again at offset 2"):
+        stuck.sync(["hosts"])
+
+
+def test_query_rejects_invalid_fields():
+    """Filter fields must be plain (dotted) identifiers."""
+    mirror = InventoryMirror(":memory:", fetch=_fetcher({})[0])
+    with pytest.raises(ValueError, match="Invalid filter field"):
+        mirror.query("hosts", where={"name') OR 1=1 --": "x"})
+
+
+def test_runtime_registers_mirror_tools_and_syncs_on_first_query(tmp_path, mocker):
+    """query_inventory should sync stale kinds then answer from SQLite."""
+    spec = {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}}
+    runtime = build_runtime(spec, allowlist=set(), mirror_path=str(tmp_path / "inv.db"))
+    mock_response = httpx.Response(
+        200,
+        json={"data": [{"id": "h1", "name": "web"}]},
+        request=httpx.Request("GET", "http://test"),
+    )
+    httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
+
+    first = runtime.tools_call("query_inventory", {"kind": "hosts"})
+    second = runtime.tools_call("query_inventory", {"kind": "hosts"})
+
+    assert first["synced"] == ["hosts"]
+    assert second["synced"] == []
+    assert second["items"] == [{"id": "h1", "name": "web"}]
+    assert httpx_mock.call_count == 1
+
+
+def test_runtime_syncs_only_registered_kinds_with_paging(tmp_path):
+    """sync_inventory should skip kinds without a list tool and page hosts."""
+    spec = {
+        "paths": {
+            "/api/v1/hosts": {
+                "get": {
+                    "operationId": "get_all_hosts",
+                    "parameters": [
+                        {"name": "limit", "in": "query", "schema": {"type": "integer"}},
+                        {"name": "offset", "in": "query", "schema": {"type": "integer"}},
+                    ],
+                }
+            }
+        }
+    }
+    runtime = build_runtime(
+        spec, allowlist=set(), base_url="http://test", mirror_path=str(tmp_path / "inv.db")
+    )
+    queries = []
+
+    def handler(request):
+        queries.append(dict(request.url.params))
+        return httpx.Response(200, json={"data": [{"id": "h1", "name": "web"}]})
+
+    runtime._client._http = httpx.Client(transport=httpx.MockTransport(handler))
+
+    assert list(runtime.tools_call("sync_inventory", {})["synced"]) == ["hosts"]
+    assert queries == [{"limit": "500", "offset": "0"}]
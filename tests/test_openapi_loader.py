@@ -1,6 +1,6 @@
 """Tests for scanopy_mcp.openapi_loader."""
 
-from unittest.mock import Mock
+import httpx
 
 from scanopy_mcp.openapi_loader import OpenAPILoader
 
@@ -8,9 +8,11 @@ from scanopy_mcp.openapi_loader import OpenAPILoader
 def test_loads_openapi_and_paths(mocker):
     """Loader should fetch OpenAPI spec and return paths."""
     url = "http://scanopy.local/openapi.json"
-    mock_response = Mock()
-    mock_response.json.return_value = {"openapi": "3.0.0", "paths": {"/api/v1/x": {"get": {}}}}
-    mock_response.raise_for_status = Mock()
+    mock_response = httpx.Response(
+        200,
+        json={"openapi": "3.0.0", "paths": {"/api/v1/x": {"get": {}}}},
+        request=httpx.Request("GET", "http://test"),
+    )
     mocker.patch("httpx.get", return_value=mock_response)
 
     loader = OpenAPILoader(url=url)
@@ -1,6 +1,6 @@
 """Tests for scanopy_mcp.openapi_loader fixes."""
 
-from unittest.mock import Mock
+import httpx
 
 from scanopy_mcp.openapi_loader import OpenAPILoader
 
@@ -8,9 +8,8 @@ from scanopy_mcp.openapi_loader import OpenAPILoader
 def test_cache_returns_empty_dict(mocker):
     """Loader should cache empty dict correctly (truthiness bug fix)."""
     url = "http://scanopy.local/openapi.json"
-    mock_response = Mock()
-    mock_response.json.return_value = {}  # Empty dict - falsy in Python
-    mock_response.raise_for_status = Mock()
+    # Empty dict - falsy in Python
+    mock_response = httpx.Response(200, json={}, request=httpx.Request("GET", url))
     httpx_mock = mocker.patch("httpx.get", return_value=mock_response)
 
     loader = OpenAPILoader(url=url)
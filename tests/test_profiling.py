@@ -0,0 +1,76 @@
+"""Tests for scanopy_mcp.profiling."""
+
+import pstats
+
+import httpx
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.profiling import RequestProfiler
+from scanopy_mcp.stdio_server import MCPStdioServer
+
+
+def _server(tmp_path, **overrides):
+    config = Config(
+        base_url="http://test",
+        api_key="key",
+        confirm_string="CONFIRM",
+        profile_dir=str(tmp_path),
+        **overrides,
+    )
+    return MCPStdioServer(
+        config=config,
+        openapi_url="",
+        allowlist=set(),
+        openapi_spec={"paths": {"/api/v1/hosts": {"get": {"operationId": "hosts.list"}}}},
+    )
+
+
+def test_profiler_is_disarmed_by_default(tmp_path):
+    """No request should be claimed until the profiler is armed."""
+    profiler = RequestProfiler(output_dir=str(tmp_path))
+    assert profiler.armed is False
+    assert profiler.claim("tools/list", None) is False
+
+
+def test_profiler_claims_next_n_requests_only(tmp_path):
+    """Arming with a count should profile exactly that many requests."""
+    profiler = RequestProfiler(output_dir=str(tmp_path))
+    profiler.arm(count=2)
+
+    assert profiler.claim("tools/list", None)
+    assert profiler.claim("tools/list", None)
+    assert not profiler.claim("tools/list", None)
+    assert profiler.armed is False
+
+
+def test_control_method_profiles_matching_tool(mocker, tmp_path):
+    """server/profile should arm profiling for one tool and dump outputs."""
+    mock_response = httpx.Response(
+        200, json={"hosts": []}, request=httpx.Request("GET", "http://test")
+    )
+    mocker.patch("httpx.Client.request", return_value=mock_response)
+    server = _server(tmp_path)
+    status = server.handle_request(
+        {"jsonrpc": "2.0", "id": 1, "method": "server/profile", "params": {"tool": "hosts.list"}}
+    )["result"]
+    assert status["armed"] is True
+
+    server.handle_request({"jsonrpc": "2.0", "id": 2, "method": "tools/list", "params": {}})
+    assert not list(tmp_path.glob("*.pstats"))
+
+    server.handle_request(
+        {"jsonrpc": "2.0", "id": 3, "method": "tools/call", "params": {"name": "hosts.list"}}
+    )
+    dumps = list(tmp_path.glob("*hosts.list*.pstats"))
+    assert len(dumps) == 1
+    pstats.Stats(str(dumps[0]))
+    assert list(tmp_path.glob("*hosts.list*.tracemalloc"))
+
+
+def test_config_arms_profiler_at_startup(tmp_path):
+    """SCANOPY_PROFILE_NEXT-style config should arm the profiler."""
+    server = _server(tmp_path, profile_next=1)
+    server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}})
+
+    assert len(list(tmp_path.glob("*tools_list*.pstats"))) == 1
+    assert server.profiler.armed is False
@@ -26,3 +26,61 @@ def test_write_tools_dry_run(tmp_path):
     )
     data = json.loads(out.read_text())
     assert data.get("dry_run") is True
+
+
+def _load_script():
+    import importlib.util
+
+    spec = importlib.util.spec_from_file_location("run_all_tools", "scripts/run_all_tools.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+FAKE_SERVER = """
+import json, sys
+for line in sys.stdin:
+    req = json.loads(line)
+    if req["params"].get("name") == "broken":
+        print(json.dumps({"jsonrpc": "2.0", "id": req["id"], "error": {"code": -1}}))
+    else:
+        print(json.dumps({"jsonrpc": "2.0", "id": req["id"], "result": {}}))
+    sys.stdout.flush()
+"""
+
+
+def test_percentile_nearest_rank():
+    module = _load_script()
+    values = [float(v) for v in range(1, 101)]
+    assert module.percentile(values, 50) == 50.0
+    assert module.percentile(values, 95) == 95.0
+    assert module.percentile(values, 99) == 99.0
+    assert module.percentile([], 50) is None
+
+
+def test_load_reuses_one_server_process():
+    module = _load_script()
+    session = module.StdioSession([sys.executable, "-c", FAKE_SERVER])
+    try:
+        stats = module.run_load(
+            session,
+            [("ok_tool", {}), ("broken", {})],
+            rate=200.0,
+            duration_s=0.1,
+            concurrency=4,
+        )
+    finally:
+        session.close()
+
+    assert stats["requests"] == 20
+    assert stats["tools"]["ok_tool"]["errors"] == 0
+    assert stats["tools"]["broken"]["error_rate"] == 1.0
+    assert stats["tools"]["ok_tool"]["p99_ms"] is not None
+
+
+def test_tool_method_skips_meta_tools():
+    module = _load_script()
+    assert module.tool_method({"description": "GET /api/v1/hosts"}) == "GET"
+    assert module.tool_method({"description": "DELETE /api/v1/hosts/{id}"}) == "DELETE"
+    assert module.tool_method({"description": "Run several tool calls in one request"}) is None
+    assert module.tool_method({}) is None
@@ -0,0 +1,98 @@
+"""Tests for scanopy_mcp.schema_defs."""
+
+import json
+
+from scanopy_mcp.schema_defs import DEFS_REF_PREFIX, SchemaInterner, share_definitions
+from scanopy_mcp.tool_registry import ToolRegistry
+
+ADDRESS = {
+    "type": "object",
+    "properties": {
+        "street": {"type": "string", "description": "Street and number"},
+        "city": {"type": "string", "description": "City name"},
+        "country": {"type": "string", "description": "ISO 3166 country code"},
+    },
+}
+
+
+def _resolve(node, defs):
+    """Inline #/$defs/ references again."""
+    if isinstance(node, dict):
+        ref = node.get("$ref", "")
+        if ref.startswith(DEFS_REF_PREFIX):
+            return _resolve(defs[ref[len(DEFS_REF_PREFIX) :]], defs)
+        return {key: _resolve(value, defs) for key, value in node.items()}
+    if isinstance(node, list):
+        return [_resolve(value, defs) for value in node]
+    return node
+
+
+def test_interner_shares_equal_schemas():
+    interner = SchemaInterner()
+    first = interner.intern({"type": "object", "properties": {"home": dict(ADDRESS)}})
+    second = interner.intern(
+        {"type": "object", "properties": {"work": json.loads(json.dumps(ADDRESS))}}
+    )
+
+    assert first["properties"]["home"] is second["properties"]["work"]
+    assert first == {"type": "object", "properties": {"home": ADDRESS}}
+    # Order-sensitive: a reordered schema is kept as its own object
+    reordered = interner.intern(dict(reversed(list(ADDRESS.items()))))
+    assert reordered is not first["properties"]["home"]
+
+
+def test_registry_interns_repeated_bodies():
+    """Tools sharing a request body component should share its schemas."""
+    body = {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Site"}}}}
+    spec = {
+        "paths": {
+            "/api/v1/sites": {"post": {"operationId": "create_site", "requestBody": body}},
+            "/api/v1/sites/{id}": {"put": {"operationId": "update_site", "requestBody": body}},
+        },
+        "components": {"schemas": {"Site": {"type": "object", "properties": {"address": ADDRESS}}}},
+    }
+    tools = ToolRegistry(spec, allowlist={"create_site", "update_site"}).list_tools()
+    create = tools["create_site"].input_schema["properties"]["address"]
+    assert create is tools["update_site"].input_schema["properties"]["address"]
+
+
+def test_share_definitions_hoists_repeated_subschemas():
+    schemas = [
+        {"type": "object", "properties": {"home": ADDRESS, "id": {"type": "string"}}},
+        {"type": "object", "properties": {"work": ADDRESS, "tags": {"items": ADDRESS}}},
+    ]
+    rewritten, defs = share_definitions(schemas)
+
+    assert len(defs) == 1
+    (name,) = defs
+    assert rewritten[0]["properties"]["home"] == {"$ref": DEFS_REF_PREFIX + name}
+    assert rewritten[1]["properties"]["tags"]["items"] == {"$ref": DEFS_REF_PREFIX + name}
+    # Small repeated schemas stay inline
+    assert rewritten[0]["properties"]["id"] == {"type": "string"}
+    assert [_resolve(schema, defs) for schema in rewritten] == schemas
+    assert len(json.dumps([rewritten, defs])) < len(json.dumps(schemas))
+
+
+def test_registry_refresh_prunes_interned_schemas():
+    """Schemas of replaced operations should not stay in the interner."""
+
+    def spec(ip_type):
+        schema = {"type": "object", "properties": {"ip": {"type": ip_type}}}
+        body = {"content": {"application/json": {"schema": schema}}}
+        return {
+            "paths": {
+                "/api/v1/hosts": {"post": {"operationId": "create_host", "requestBody": body}}
+            }
+        }
+
+    fresh = ToolRegistry(spec("string"), allowlist={"create_host"})
+    fresh.list_tools()
+    reg = ToolRegistry(spec("string"), allowlist={"create_host"})
+    reg.list_tools()
+    for ip_type in ("integer", "number", "boolean", "string"):
+        reg.refresh(spec(ip_type))
+    assert len(reg._schemas) == len(fresh._schemas)
+    assert (
+        reg.list_tools()["create_host"].input_schema
+        == fresh.list_tools()["create_host"].input_schema
+    )
@@ -0,0 +1,69 @@
+"""Tests for scanopy_mcp.schema_slim."""
+
+from scanopy_mcp.schema_slim import SlimOptions
+from scanopy_mcp.tool_registry import ToolRegistry
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "description": "Host name", "example": "web-1"},
+        "os": {"type": "string", "enum": [f"os{i}" for i in range(30)]},
+        "kind": {"type": "string", "enum": ["a", "b"]},
+        "interfaces": {
+            "type": "array",
+            "x-order": 3,
+            "items": {
+                "type": "object",
+                "properties": {"ip": {"type": "string"}},
+                "required": ["ip"],
+            },
+        },
+    },
+    "required": ["name"],
+}
+
+
+def test_slim_strips_annotations_and_truncates():
+    slim = SlimOptions(max_depth=2, max_enum=20).apply(SCHEMA)
+
+    assert slim["required"] == ["name"]
+    assert slim["properties"]["name"] == {"type": "string"}
+    assert slim["properties"]["kind"]["enum"] == ["a", "b"]
+    # Long enums become a hint instead of rejecting unlisted values
+    assert "enum" not in slim["properties"]["os"]
+    assert slim["properties"]["os"]["description"].startswith("One of 30 values, e.g. os0")
+    # Depth 2: the array keeps its items, whose properties are cut to the type
+    assert slim["properties"]["interfaces"] == {"type": "array", "items": {"type": "object"}}
+
+
+def test_slim_keeps_everything_when_unbounded():
+    options = SlimOptions(
+        max_depth=None, strip_descriptions=False, strip_examples=False, max_enum=None
+    )
+    assert options.apply(SCHEMA) == SCHEMA
+
+
+def test_registry_reports_bytes_saved():
+    """Slimmed registries should serve slim schemas and report savings per tool."""
+    spec = {
+        "paths": {
+            "/api/v1/hosts": {
+                "post": {
+                    "operationId": "create_host",
+                    "requestBody": {"content": {"application/json": {"schema": SCHEMA}}},
+                },
+                "get": {"operationId": "get_all_hosts"},
+            }
+        }
+    }
+    registry = ToolRegistry(spec, allowlist={"create_host"}, slim=SlimOptions())
+    tools = registry.list_tools()
+    assert tools["create_host"].input_schema["properties"]["name"] == {"type": "string"}
+    assert tools["create_host"].required == frozenset({"name"})
+
+    report = registry.schema_report()
+    assert list(report["tools"]) == ["create_host", "get_all_hosts"]
+    create = report["tools"]["create_host"]
+    assert create["saved_bytes"] == create["full_bytes"] - create["slim_bytes"] > 0
+    assert report["tools"]["get_all_hosts"]["saved_bytes"] == 0
+    assert report["saved_bytes"] == create["saved_bytes"]
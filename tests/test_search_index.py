@@ -0,0 +1,184 @@
+"""Tests for scanopy_mcp.search_index."""
+
+import httpx
+import pytest
+
+from scanopy_mcp.runtime import build_runtime
+from scanopy_mcp.search_index import InventoryIndex, PrefixTrie
+
+
+def _host(host_id, hostname, ip, tags=()):
+    return {
+        "id": host_id,
+        "name": hostname.split(".")[0],
+        "hostname": hostname,
+        "interfaces": [{"subnet_id": "s1", "ip_address": ip}],
+        "tags": list(tags),
+    }
+
+
+HOSTS = {
+    "data": [
+        _host("h1", "web-01.corp.local", "10.0.3.11", tags=["prod"]),
+        _host("h2", "web-02.corp.local", "10.0.4.12"),
+        _host("h3", "db-01.corp.local", "10.0.3.20", tags=["prod"]),
+    ]
+}
+PORTS = {
+    "data": [
+        {"id": "p1", "host_id": "h1", "number": 443},
+        {"id": "p2", "host_id": "h3", "number": 5432},
+        {"id": "p3", "host_id": "h3", "port_type": {"number": 443}},
+    ]
+}
+SERVICES = {"data": [{"id": "v1", "host_id": "h3", "name": "PostgreSQL"}]}
+
+
+def _index(**kwargs):
+    index = InventoryIndex(**kwargs)
+    index.update("hosts", HOSTS)
+    index.update("ports", PORTS)
+    index.update("services", SERVICES)
+    return index
+
+
+def test_prefix_trie_finds_prefixes_and_prunes_on_remove():
+    """Removing the last posting should drop the key's nodes."""
+    trie = PrefixTrie()
+    trie.add("10.0.3.11", ("hosts", "h1"), "h1")
+    trie.add("10.0.4.12", ("hosts", "h2"), "h2")
+
+    assert trie.find("10.0.") == {"h1", "h2"}
+    assert trie.find("10.0.3") == {"h1"}
+
+    nodes = trie.nodes
+    trie.remove("10.0.3.11", ("hosts", "h1"))
+    assert trie.find("10.0.") == {"h2"}
+    assert trie.nodes == nodes - len("3.11")
+
+
+def test_search_combines_criteria():
+    """Criteria should intersect; hostname tokens match by prefix."""
+    index = _index()
+
+    def ids(**criteria):
+        return [h["id"] for h in index.search(**criteria)]
+
+    assert ids(query="web") == ["h1", "h2"]
+    assert ids(query="web 01") == ["h1"]
+    assert ids(ip_prefix="10.0.3.") == ["h1", "h3"]
+    assert ids(port=443) == ["h1", "h3"]
+    assert ids(port=443, tag="PROD", ip_prefix="10.0.3") == ["h1", "h3"]
+    assert ids(service="postgres") == ["h3"]
+    assert ids(query="web", port=5432) == []
+
+
+def test_update_is_incremental_and_skips_identical_responses():
+    """Only changed entities should be re-indexed."""
+    index = _index()
+    assert index.update("hosts", HOSTS) == {"skipped": True}
+
+    changed = {"data": [HOSTS["data"][0], _host("h2", "app-02.corp.local", "10.0.4.12")]}
+    assert index.update("hosts", changed) == {
+        "added": 0,
+        "updated": 1,
+        "removed": 1,
+        "unchanged": 1,
+    }
+    assert [h["id"] for h in index.search(query="app")] == ["h2"]
+    assert index.search(query="db") == []
+    # Ports of removed hosts no longer resolve to an indexed host
+    assert [h["id"] for h in index.search(port=443)] == ["h1"]
+
+
+def test_memory_budget_stops_indexing_new_entities():
+    """Once over budget, new entities are skipped and the index is marked truncated."""
+    index = InventoryIndex()
+    index.max_bytes = index.approx_bytes + 1
+    index.update("hosts", HOSTS)
+
+    stats = index.stats()
+    assert stats["entities"]["hosts"] == 1
+    assert stats["truncated"] is True
+
+
+def test_runtime_search_reuses_cached_lists(mocker):
+    """With the response cache on, repeated searches should not refetch or re-index."""
+    spec = {
+        "paths": {
+            "/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}},
+            "/api/v1/ports": {"get": {"operationId": "list_ports"}},
+        }
+    }
+    assert "search_inventory" not in build_runtime(spec, allowlist=set()).tools_list()
+    runtime = build_runtime(spec, allowlist=set(), cache_ttl_s=60)
+    assert "search_inventory" in runtime.tools_list()
+
+    def respond(method, url, **kwargs):
+        data = PORTS if url.endswith("/ports") else HOSTS
+        return httpx.Response(200, json=data, request=httpx.Request(method, url))
+
+    httpx_mock = mocker.patch("httpx.Client.request", side_effect=respond)
+
+    first = runtime.tools_call("search_inventory", {"ip_prefix": "10.0.3", "port": 5432})
+    second = runtime.tools_call("search_inventory", {"query": "web-02"})
+
+    assert [h["id"] for h in first["hosts"]] == ["h3"]
+    assert [h["id"] for h in second["hosts"]] == ["h2"]
+    assert httpx_mock.call_count == 2
+
+
+def test_memory_budget_truncation_clears_when_back_under_budget():
+    """A later update that fits the budget should stop reporting truncation."""
+    index = InventoryIndex()
+    index.max_bytes = index.approx_bytes + 1
+    index.update("hosts", HOSTS)
+    assert index.stats()["truncated"] is True
+
+    index.max_bytes = 32 << 20
+    index.update("hosts", {"data": list(HOSTS["data"])})
+    assert index.stats()["truncated"] is False
+    assert index.stats()["entities"]["hosts"] == 3
+
+
+def test_runtime_search_rejects_kinds_without_a_list_tool(mocker):
+    """Searching by port without list_ports should fail before any request."""
+    spec = {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}}
+    runtime = build_runtime(spec, allowlist=set(), cache_ttl_s=60)
+    httpx_mock = mocker.patch("httpx.Client.request")
+
+    with pytest.raises(ValueError, match="list_ports is not available"):
+        runtime.tools_call("search_inventory", {"port": 22})
+    httpx_mock.assert_not_called()
+
+
+def test_runtime_search_reads_paged_lists_to_the_end(mocker):
+    """Hosts past the first page should be indexed."""
+    page_param = {"in": "query", "schema": {"type": "integer"}}
+    spec = {
+        "paths": {
+            "/api/v1/hosts": {
+                "get": {
+                    "operationId": "get_all_hosts",
+                    "parameters": [
+                        {"name": "limit", **page_param},
+                        {"name": "offset", **page_param},
+                    ],
+                }
+            }
+        }
+    }
+    runtime = build_runtime(spec, allowlist=set(), cache_ttl_s=60)
+    hosts = [_host(f"h{i:04}", f"node-{i}.corp.local", "10.1.0.1") for i in range(501)]
+
+    def respond(method, url, params=None, **kwargs):
+        offset = int(params["offset"])
+        data = hosts[offset : offset + int(params["limit"])]
+        return httpx.Response(200, json={"data": data}, request=httpx.Request(method, url))
+
+    mocker.patch("httpx.Client.request", side_effect=respond)
+
+    result = runtime.tools_call("search_inventory", {"query": "node", "limit": 500})
+    assert result["index"]["entities"]["hosts"] == 501
+    again = runtime.tools_call("search_inventory", {"query": "node"})
+    assert again["index"]["entities"]["hosts"] == 501
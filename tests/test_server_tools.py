@@ -2,6 +2,8 @@
 
 from unittest.mock import Mock
 
+import httpx
+
 from scanopy_mcp.server import ScanopyMCPServer
 
 
@@ -11,14 +13,14 @@ def test_tools_list_returns_registered_tools():
 
     out = server.tools_list()
     assert "x.y" in out
-    assert out["x.y"]["method"] == "GET"
+    assert out["x.y"].method == "GET"
 
 
 def test_tools_call_requests_without_policy(mocker):
     """Server should make HTTP requests for read operations."""
-    mock_response = Mock()
-    mock_response.json.return_value = {"result": "ok"}
-    mock_response.raise_for_status = Mock()
+    mock_response = httpx.Response(
+        200, json={"result": "ok"}, request=httpx.Request("GET", "http://test")
+    )
     mocker.patch("httpx.Client.request", return_value=mock_response)
 
     client = Mock()
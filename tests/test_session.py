@@ -1,3 +1,10 @@
+import os
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
 from scanopy_mcp import session
 
 
@@ -12,3 +19,86 @@ def test_session_missing_returns_none(monkeypatch):
     monkeypatch.delenv("SCANOPY_LOGIN_USER", raising=False)
     monkeypatch.delenv("SCANOPY_LOGIN_PASSWORD", raising=False)
     assert session.get_session_id() is None
+
+
+def _login_response(session_id="s1", **extra):
+    return httpx.Response(
+        200,
+        json={"session_id": session_id, **extra},
+        request=httpx.Request("POST", "http://test/login"),
+    )
+
+
+def test_session_manager_caches_and_persists(tmp_path, mocker):
+    """A second manager should reuse the persisted session without logging in."""
+    post = mocker.patch.object(httpx.Client, "post", return_value=_login_response())
+    path = tmp_path / "cache" / "session.json"
+
+    manager = session.SessionManager("http://test/login", "u@x", "pw", cache_path=str(path))
+    assert manager.session_id() == "s1"
+    assert manager.session_id() == "s1"
+    assert post.call_count == 1
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert "pw" not in path.read_text()
+
+    again = session.SessionManager("http://test/login", "u@x", "pw", cache_path=str(path))
+    assert again.session_id() == "s1"
+    assert post.call_count == 1
+
+    other_user = session.SessionManager("http://test/login", "v@x", "pw", cache_path=str(path))
+    other_user.session_id()
+    assert post.call_count == 2
+
+
+def test_session_manager_refreshes_before_expiry(mocker):
+    now = [1000.0]
+    post = mocker.patch.object(
+        httpx.Client,
+        "post",
+        side_effect=[_login_response("s1", expires_in=120), _login_response("s2")],
+    )
+    manager = session.SessionManager(
+        "http://test/login", "u", "pw", refresh_margin_s=60, clock=lambda: now[0]
+    )
+    assert manager.session_id() == "s1"
+    now[0] += 59
+    assert manager.session_id() == "s1"
+    now[0] += 2
+    assert manager.session_id() == "s2"
+    assert post.call_count == 2
+
+
+def test_session_manager_relogs_on_401(mocker):
+    mocker.patch.object(
+        httpx.Client, "post", side_effect=[_login_response("s1"), _login_response("s2")]
+    )
+    manager = session.SessionManager("http://test/login", "u", "pw")
+    rejected = httpx.Response(401, request=httpx.Request("GET", "http://test/api"))
+
+    def call(session_id):
+        if session_id == "s1":
+            raise httpx.HTTPStatusError("expired", request=rejected.request, response=rejected)
+        return session_id
+
+    assert manager.call(call) == "s2"
+
+
+def test_session_manager_single_flight(mocker):
+    """Concurrent callers should share one login."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow_login(*args, **kwargs):
+        started.set()
+        release.wait(5)
+        return _login_response()
+
+    post = mocker.patch.object(httpx.Client, "post", side_effect=slow_login)
+    manager = session.SessionManager("http://test/login", "u", "pw")
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        futures = [pool.submit(manager.session_id) for _ in range(4)]
+        started.wait(5)
+        release.set()
+        assert [f.result(timeout=5) for f in futures] == ["s1"] * 4
+    assert post.call_count == 1
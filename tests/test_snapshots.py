@@ -0,0 +1,84 @@
+"""Tests for scanopy_mcp.snapshots."""
+
+import httpx
+import pytest
+
+from scanopy_mcp.runtime import build_runtime
+from scanopy_mcp.snapshots import SnapshotStore, diff_entities, entity_digest
+
+
+def _digests(items):
+    return {item["id"]: entity_digest(item) for item in items}
+
+
+def test_diff_entities_reports_added_removed_and_changed_fields():
+    """Only differing entities and the fields that changed should be reported."""
+    old = _digests([{"id": "h1", "name": "a", "os": "linux"}, {"id": "h2", "name": "b"}])
+    new = _digests([{"id": "h1", "name": "a", "os": "bsd"}, {"id": "h3", "name": "c"}])
+
+    diff = diff_entities(old, new, limit=10)
+
+    assert diff["counts"] == {"added": 1, "removed": 1, "changed": 1}
+    assert diff["added"] == [{"id": "h3", "name": "c"}]
+    assert diff["removed"] == [{"id": "h2", "name": "b"}]
+    assert diff["changed"] == [{"id": "h1", "name": "a", "fields": ["os"]}]
+
+
+def test_snapshots_persist_and_reload(tmp_path):
+    """Persisted snapshots should be readable by a fresh store."""
+    hosts = [{"id": "h1", "name": "a"}]
+
+    def fetch(tool, args):
+        return {"data": list(hosts)}
+
+    store = SnapshotStore(fetch, directory=str(tmp_path), kinds=["hosts"])
+    first = store.take(label="before")
+    hosts.append({"id": "h2", "name": "b"})
+    second = store.take()
+
+    reloaded = SnapshotStore(fetch, directory=str(tmp_path))
+    assert [s["id"] for s in reloaded.summaries()] == [first["id"], second["id"]]
+    diff = reloaded.diff(first["id"], second["id"])
+    assert diff["kinds"]["hosts"]["counts"] == {"added": 1, "removed": 0, "changed": 0}
+
+    with pytest.raises(ValueError, match="Unknown snapshot"):
+        reloaded.get("../etc/passwd")
+
+
+def test_runtime_diff_against_current_inventory(mocker):
+    """diff_snapshots without 'to' should compare against a fresh snapshot."""
+    spec = {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}}
+    runtime = build_runtime(spec, allowlist=set())
+    responses = [
+        {"data": [{"id": "h1", "name": "a"}]},
+        {"data": [{"id": "h1", "name": "renamed"}]},
+    ]
+    request = httpx.Request("GET", "http://test/api/v1/hosts")
+    mocker.patch(
+        "httpx.Client.request",
+        side_effect=[httpx.Response(200, json=data, request=request) for data in responses],
+    )
+
+    snapshot = runtime.tools_call("snapshot_inventory", {})
+    diff = runtime.tools_call("diff_snapshots", {"from": snapshot["id"]})
+
+    assert snapshot["counts"] == {"hosts": 1}
+    assert diff["kinds"]["hosts"]["changed"] == [
+        {"id": "h1", "name": "renamed", "fields": ["name"]}
+    ]
+
+
+def test_snapshots_read_paged_lists_to_the_end(tmp_path):
+    """Entities past the first page should be captured."""
+    hosts = [{"id": f"h{i}", "name": str(i)} for i in range(501)]
+    calls = []
+
+    def fetch(tool, args):
+        calls.append(args)
+        offset = args["offset"]
+        return {"data": hosts[offset : offset + args["limit"]]}
+
+    store = SnapshotStore(fetch, kinds=["hosts"], paged=["get_all_hosts"])
+
+    assert store.take()["counts"] == {"hosts": 501}
+    assert [args["offset"] for args in calls] == [0, 500]
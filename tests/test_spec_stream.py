@@ -0,0 +1,133 @@
+"""Tests for scanopy_mcp.spec_stream."""
+
+import contextlib
+import json
+
+import httpx
+import pytest
+
+from scanopy_mcp.openapi_loader import OpenAPILoader
+from scanopy_mcp.spec_stream import parse_spec
+from scanopy_mcp.tool_registry import ToolRegistry
+
+SPEC = {
+    "openapi": "3.1.0",
+    "info": {"title": 'Scanopy é "api"', "version": "1"},
+    "tags": [{"name": "hosts", "description": "Hosts"}],
+    "paths": {
+        "/api/v1/hosts/{id}": {
+            "summary": "One host",
+            "parameters": [{"name": "id", "in": "path", "example": "h1"}],
+            "get": {
+                "operationId": "get_host_by_id",
+                "summary": "Get a host \\ by id",
+                "tags": ["hosts"],
+                "description": "Long text",
+                "responses": {"200": {"content": {"x": {"example": [1, {"a": "}]"}]}}}},
+            },
+            "put": {
+                "operationId": "update_host",
+                "requestBody": {
+                    "content": {
+                        "application/json": {
+                            "schema": {"$ref": "#/components/schemas/Host"},
+                            "example": {"name": "web"},
+                        }
+                    }
+                },
+            },
+        }
+    },
+    "components": {
+        "schemas": {
+            "Host": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "example": "web"},
+                    "example": {"type": "integer", "examples": [1.5e3, -2, True, None]},
+                },
+                "required": ["name"],
+            }
+        },
+        "responses": {"NotFound": {"description": "Not found"}},
+    },
+}
+
+
+def _chunks(data: bytes, size: int) -> list[bytes]:
+    return [data[i : i + size] for i in range(0, len(data), size)]
+
+
+class _Stream(httpx.SyncByteStream):
+    def __init__(self, chunks: list[bytes]):
+        self._chunks = chunks
+
+    def __iter__(self):
+        yield from self._chunks
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+@pytest.mark.parametrize("size", [1, 3, 64, 1 << 16])
+def test_parse_spec_keeps_tool_sections_across_chunk_boundaries(indent, size):
+    """Only tool-relevant sections survive, however the bytes are split."""
+    data = json.dumps(SPEC, indent=indent, ensure_ascii=False).encode()
+    spec = parse_spec(_chunks(data, size))
+
+    assert set(spec) == {"openapi", "info", "paths", "components"}
+    assert spec["info"] == SPEC["info"]
+    item = spec["paths"]["/api/v1/hosts/{id}"]
+    assert item["parameters"] == [{"name": "id", "in": "path"}]
+    assert item["get"] == {
+        "operationId": "get_host_by_id",
+        "summary": "Get a host \\ by id",
+        "tags": ["hosts"],
+    }
+    assert "example" not in item["put"]["requestBody"]["content"]["application/json"]
+    assert spec["components"] == {
+        "schemas": {
+            "Host": {
+                "type": "object",
+                "properties": {"name": {"type": "string"}, "example": {"type": "integer"}},
+                "required": ["name"],
+            }
+        }
+    }
+
+
+def test_streamed_spec_builds_the_same_tools():
+    """Tools built from the streamed spec should match those from the whole one."""
+    streamed = parse_spec([json.dumps(SPEC).encode()])
+    allowlist = {"update_host"}
+    full = ToolRegistry(SPEC, allowlist=allowlist).list_tools()
+    slim = ToolRegistry(streamed, allowlist=allowlist).list_tools()
+
+    assert full.keys() == slim.keys()
+    for name, tool in full.items():
+        assert slim[name].required == tool.required
+        assert (
+            slim[name].input_schema["properties"].keys() == tool.input_schema["properties"].keys()
+        )
+
+
+def test_parse_spec_rejects_truncated_documents():
+    data = json.dumps(SPEC).encode()
+    with pytest.raises(ValueError):
+        parse_spec(_chunks(data[:-40], 16))
+
+
+def test_loader_streams_when_enabled(mocker):
+    """The streaming loader should parse the response body chunk by chunk."""
+    url = "http://scanopy.local/openapi.json"
+    response = httpx.Response(
+        200,
+        stream=_Stream(_chunks(json.dumps(SPEC).encode(), 100)),
+        request=httpx.Request("GET", url),
+    )
+    stream = mocker.patch("httpx.stream", return_value=contextlib.nullcontext(response))
+    get = mocker.patch("httpx.get")
+
+    spec = OpenAPILoader(url, streaming=True).load()
+
+    get.assert_not_called()
+    assert stream.call_args.args == ("GET", "http://scanopy.local/openapi.json")
+    assert list(spec["paths"]["/api/v1/hosts/{id}"]) == ["parameters", "get", "put"]
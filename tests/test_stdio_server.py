@@ -2,6 +2,8 @@
 
 import json
 
+import httpx
+
 from scanopy_mcp.config import Config
 from scanopy_mcp.stdio_server import MCPStdioServer
 
@@ -118,9 +120,8 @@ def test_stdio_server_handles_tools_call_request(mocker):
     )
 
     # Mock the HTTP client
-    mock_response = mocker.Mock()
-    mock_response.json.return_value = {"hosts": []}
-    mock_response.raise_for_status = mocker.Mock()
+    request = httpx.Request("GET", "http://test/api/v1/hosts")
+    mock_response = httpx.Response(200, json={"hosts": []}, request=request)
     mocker.patch("httpx.Client.request", return_value=mock_response)
 
     request = {
@@ -134,3 +135,83 @@ def test_stdio_server_handles_tools_call_request(mocker):
     # MCP format wraps result in content array
     assert response["result"]["content"][0]["type"] == "text"
     assert json.loads(response["result"]["content"][0]["text"]) == {"hosts": []}
+
+
+def test_stdio_server_applies_refreshed_spec_and_notifies(mocker):
+    """A changed spec after the loader TTL should update tools and emit list_changed."""
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    server = MCPStdioServer(config=config, openapi_url="http://test/openapi.json", allowlist=set())
+    specs = [
+        {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}},
+        {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}},
+        {"paths": {"/api/v1/ports": {"get": {"operationId": "list_ports"}}}},
+    ]
+    request = httpx.Request("GET", "http://test/openapi.json")
+    mocker.patch(
+        "httpx.get", side_effect=[httpx.Response(200, json=spec, request=request) for spec in specs]
+    )
+    notifications = []
+    mocker.patch.object(server, "_write", side_effect=notifications.append)
+
+    server._get_runtime()
+    for _ in range(2):
+        # Expire the loader cache so the next request re-fetches the spec
+        server.runtimes._states["default"].loader._loaded_at = 0
+        response = server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+
+    names = {tool["name"] for tool in response["result"]["tools"]}
+    assert "list_ports" in names
+    assert "get_all_hosts" not in names
+    assert "batch_call" in names
+    assert notifications == [{"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}]
+
+
+def test_stdio_server_compact_schemas_share_definitions():
+    """Compact tools/list output should emit a repeated body schema once."""
+    body = {"content": {"application/json": {"schema": {"$ref": "#/components/schemas/Host"}}}}
+    host = {
+        "type": "object",
+        "properties": {
+            "name": {"type": "string"},
+            "interfaces": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "ip_address": {"type": "string", "description": "IPv4 or IPv6 address"},
+                        "subnet_id": {"type": "string", "format": "uuid"},
+                    },
+                },
+            },
+        },
+    }
+    spec = {
+        "paths": {
+            "/api/v1/hosts": {"post": {"operationId": "create_host", "requestBody": body}},
+            "/api/v1/hosts/{id}": {"put": {"operationId": "update_host", "requestBody": body}},
+        },
+        "components": {"schemas": {"Host": host}},
+    }
+    request = {"jsonrpc": "2.0", "id": 1, "method": "tools/list", "params": {}}
+    results = {}
+    for compact in (False, True):
+        config = Config(
+            base_url="http://test",
+            api_key="key",
+            confirm_string="CONFIRM",
+            compact_schemas=compact,
+        )
+        server = MCPStdioServer(
+            config=config,
+            openapi_url="",
+            allowlist={"create_host", "update_host"},
+            openapi_spec=spec,
+        )
+        results[compact] = server.handle_request(request)["result"]
+
+    assert "$defs" not in results[False]
+    (name,) = results[True]["$defs"]
+    tools = {t["name"]: t for t in results[True]["tools"]}
+    interfaces = tools["update_host"]["inputSchema"]["properties"]["interfaces"]
+    assert interfaces == {"$ref": f"#/$defs/{name}"}
+    assert len(json.dumps(results[True])) < len(json.dumps(results[False]))
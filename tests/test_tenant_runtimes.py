@@ -0,0 +1,37 @@
+"""Tests for scanopy_mcp.tenant_runtimes."""
+
+import httpx
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.metrics import Metrics
+from scanopy_mcp.tenant_runtimes import TenantRuntimes
+from scanopy_mcp.tracing import Tracer
+
+SPEC = {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}}
+
+
+def test_spec_is_consulted_only_after_the_loader_ttl(mocker):
+    """Lookups within the loader TTL should not touch the loader at all."""
+    config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+    request = httpx.Request("GET", "http://test/openapi.json")
+    fetch = mocker.patch("httpx.get", return_value=httpx.Response(200, json=SPEC, request=request))
+    changed = []
+    runtimes = TenantRuntimes(
+        config,
+        "http://test/openapi.json",
+        set(),
+        metrics=Metrics(),
+        tracer=Tracer(),
+        on_tools_changed=changed.append,
+    )
+
+    runtime = runtimes.get()
+    load = mocker.spy(runtimes._states["default"].loader, "load")
+    assert all(runtimes.get() is runtime for _ in range(5))
+    assert load.call_count == 0
+
+    runtimes._states["default"].loader._loaded_at = 0
+    assert runtimes.get() is runtime
+    assert load.call_count == 1
+    assert fetch.call_count == 2
+    assert changed == []
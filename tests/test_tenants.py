@@ -0,0 +1,203 @@
+"""Tests for scanopy_mcp.tenants."""
+
+import json
+
+import httpx
+import pytest
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.http_server import MCPHTTPServer
+from scanopy_mcp.stdio_server import MCPStdioServer
+from scanopy_mcp.tenants import RegistryPool, load_tenants
+
+SPEC = {
+    "paths": {
+        "/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}},
+        "/api/v1/networks": {"post": {"operationId": "create_network"}},
+    }
+}
+
+
+def test_load_tenants_reads_keys_from_env(tmp_path, monkeypatch):
+    """Tenants inherit confirm string and allowlist unless they override them."""
+    monkeypatch.setenv("SITE_B_KEY", "key-b")
+    path = tmp_path / "tenants.json"
+    path.write_text(
+        json.dumps(
+            {
+                "site-b": {"base_url": "http://b/", "api_key_env": "SITE_B_KEY"},
+                "site-c": {"base_url": "http://c", "api_key": "key-c", "allowlist": []},
+            }
+        )
+    )
+
+    tenants = load_tenants(str(path), "CONFIRM", {"create_network"})
+
+    assert tenants["site-b"].base_url == "http://b"
+    assert tenants["site-b"].api_key == "key-b"
+    assert tenants["site-b"].allowlist == frozenset({"create_network"})
+    assert tenants["site-c"].allowlist == frozenset()
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [{"default": {"base_url": "http://x", "api_key": "k"}}, {"../x": {}}, {"b": {"base_url": ""}}],
+)
+def test_load_tenants_rejects_invalid_entries(tmp_path, raw):
+    """Reserved or unsafe names and missing settings are configuration errors."""
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps(raw))
+    with pytest.raises(ValueError):
+        load_tenants(str(path), "CONFIRM", set())
+
+
+def test_registry_pool_shares_identical_specs():
+    """Equal specs should share one spec object and one set of tools per allowlist."""
+    pool = RegistryPool()
+    first = pool.registry(json.loads(json.dumps(SPEC)), {"create_network"})
+    second = pool.registry(json.loads(json.dumps(SPEC)), {"create_network"})
+    read_only = pool.registry(json.loads(json.dumps(SPEC)), set())
+
+    assert second is first
+    assert read_only is not first
+    assert read_only.spec is first.spec
+    assert "create_network" not in read_only.built_tools()
+
+
+def _tenants_config(tmp_path, **kwargs):
+    path = tmp_path / "tenants.json"
+    path.write_text(json.dumps({"site-b": {"base_url": "http://b", "api_key": "key-b"}}))
+    return Config(
+        base_url="http://a",
+        api_key="key-a",
+        confirm_string="CONFIRM",
+        tenants_file=str(path),
+        **kwargs,
+    )
+
+
+def _call_hosts(req_id):
+    return {
+        "jsonrpc": "2.0",
+        "id": req_id,
+        "method": "tools/call",
+        "params": {"name": "get_all_hosts", "arguments": {}},
+    }
+
+
+def test_stdio_server_serves_configured_tenant(tmp_path, mocker):
+    """A stdio process should serve the tenant named by SCANOPY_TENANT."""
+    config = _tenants_config(tmp_path, tenant="site-b")
+    server = MCPStdioServer(config=config, openapi_url="", allowlist=set(), openapi_spec=SPEC)
+    mock_response = httpx.Response(
+        200, json={"data": []}, request=httpx.Request("GET", "http://test")
+    )
+    httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
+
+    listed = server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+    schema = {t["name"]: t for t in listed["result"]["tools"]}["get_all_hosts"]["inputSchema"]
+    assert "tenant" not in schema["properties"]
+
+    server.handle_request(_call_hosts(2))
+    assert httpx_mock.call_args[0][1] == "http://b/api/v1/hosts"
+    assert httpx_mock.call_args[1]["headers"]["Authorization"] == "Bearer key-b"
+
+    default, site_b = server._get_runtime(), server._get_runtime("site-b")
+    assert default is not site_b
+    assert default.tools_list()["get_all_hosts"] is site_b.tools_list()["get_all_hosts"]
+
+    with pytest.raises(ValueError, match="Unknown tenant"):
+        MCPStdioServer(
+            config=_tenants_config(tmp_path, tenant="nope"),
+            openapi_url="",
+            allowlist=set(),
+            openapi_spec=SPEC,
+        )
+
+
+def test_http_sessions_are_bound_to_their_tenant(tmp_path, mocker):
+    """The tenant header picks a session's tenant at initialize; later ones must agree."""
+    server = MCPHTTPServer(
+        config=_tenants_config(tmp_path), openapi_url="", allowlist=set(), openapi_spec=SPEC
+    )
+    mock_response = httpx.Response(
+        200, json={"data": []}, request=httpx.Request("GET", "http://test")
+    )
+    httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
+    init = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize"}).encode()
+    _, _, site_b = server.handle_post(init, None, tenant="site-b")
+    _, _, default = server.handle_post(init, None)
+
+    server.handle_post(json.dumps(_call_hosts(2)).encode(), site_b)
+    assert httpx_mock.call_args[0][1] == "http://b/api/v1/hosts"
+    server.handle_post(json.dumps(_call_hosts(3)).encode(), site_b, tenant="site-b")
+    assert httpx_mock.call_args[0][1] == "http://b/api/v1/hosts"
+    server.handle_post(json.dumps(_call_hosts(4)).encode(), default)
+    assert httpx_mock.call_args[0][1] == "http://a/api/v1/hosts"
+
+    status, payload, _ = server.handle_post(
+        json.dumps(_call_hosts(5)).encode(), site_b, tenant="default"
+    )
+    assert status == 400
+    assert "bound to tenant site-b" in payload["error"]
+    status, payload, _ = server.handle_post(init, None, tenant="nope")
+    assert status == 400
+    assert "Unknown tenant" in payload["error"]
+
+    server._tools_changed("site-b")
+    assert list(server._sessions[site_b].pending) == [
+        {"jsonrpc": "2.0", "method": "notifications/tools/list_changed"}
+    ]
+    assert not server._sessions[default].pending
+
+
+def test_http_workers_adopt_sessions_with_their_tenant(tmp_path):
+    """A signed session id should carry its tenant to the worker that adopts it."""
+    servers = [
+        MCPHTTPServer(
+            config=_tenants_config(tmp_path),
+            openapi_url="",
+            allowlist=set(),
+            openapi_spec=SPEC,
+            session_secret=b"secret",
+        )
+        for _ in range(2)
+    ]
+    init = json.dumps({"jsonrpc": "2.0", "id": 1, "method": "initialize"}).encode()
+    _, _, session_id = servers[0].handle_post(init, None, tenant="site-b")
+
+    assert servers[1]._get_session(session_id).tenant == "site-b"
+    token, _, signature = session_id.split(".")
+    assert servers[1]._get_session(f"{token}.default.{signature}") is None
+
+
+def test_http_tenants_take_their_own_token(tmp_path, monkeypatch):
+    """A tenant's token from the tenants file should replace SCANOPY_HTTP_TOKEN for it."""
+    monkeypatch.setenv("SITE_B_TOKEN", "token-b")
+    path = tmp_path / "tenants.json"
+    path.write_text(
+        json.dumps(
+            {
+                "site-b": {
+                    "base_url": "http://b",
+                    "api_key": "k",
+                    "http_token_env": "SITE_B_TOKEN",
+                },
+                "site-c": {"base_url": "http://c", "api_key": "k"},
+            }
+        )
+    )
+    config = Config(
+        base_url="http://a",
+        api_key="key-a",
+        confirm_string="CONFIRM",
+        tenants_file=str(path),
+        http_token="token-a",
+    )
+    server = MCPHTTPServer(config=config, openapi_url="", allowlist=set(), openapi_spec=SPEC)
+
+    assert server.authorized("Bearer token-a")
+    assert server.authorized("Bearer token-b", "site-b")
+    assert not server.authorized("Bearer token-a", "site-b")
+    assert server.authorized("Bearer token-a", "site-c")
+    assert not server.authorized("Bearer token-b", "site-c")
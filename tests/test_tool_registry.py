@@ -3,6 +3,7 @@
 import pytest
 
 from scanopy_mcp.tool_registry import ToolRegistry
+from scanopy_mcp.tool_spec import ToolSpec
 
 
 def test_registry_skips_openapi_metadata_keys():
@@ -58,7 +59,7 @@ def test_duplicate_detection_is_order_independent():
 
     # Only GET should be included, no error
     assert "same.id" in tools
-    assert tools["same.id"]["method"] == "GET"
+    assert tools["same.id"].method == "GET"
     assert len(tools) == 1
 
 
@@ -100,12 +101,12 @@ def test_registry_filters_write_ops():
 
     # Read operation should be included
     assert "hosts.list" in tools
-    assert tools["hosts.list"]["method"] == "GET"
-    assert tools["hosts.list"]["path"] == "/api/v1/hosts"
+    assert tools["hosts.list"].method == "GET"
+    assert tools["hosts.list"].path == "/api/v1/hosts"
 
     # Allowlisted write operation should be included
     assert "hosts.create" in tools
-    assert tools["hosts.create"]["method"] == "POST"
+    assert tools["hosts.create"].method == "POST"
 
 
 def test_registry_excludes_non_allowlisted_writes():
@@ -178,12 +179,12 @@ def test_registry_builds_input_schema_from_parameters_and_body():
     reg = ToolRegistry(spec, allowlist={"update_host"})
     tools = reg.list_tools()
 
-    get_schema = tools["get_host_by_id"]["input_schema"]
+    get_schema = tools["get_host_by_id"].input_schema
     assert "id" in get_schema["properties"]
     assert "include" in get_schema["properties"]
     assert "id" in get_schema["required"]
 
-    put_schema = tools["update_host"]["input_schema"]
+    put_schema = tools["update_host"].input_schema
     assert "name" in put_schema["properties"]
     assert "name" in put_schema["required"]
 
@@ -220,7 +221,7 @@ def test_registry_resolves_ref_in_request_body_schema():
     reg = ToolRegistry(spec, allowlist={"update_host"})
     tools = reg.list_tools()
 
-    put_schema = tools["update_host"]["input_schema"]
+    put_schema = tools["update_host"].input_schema
     assert "name" in put_schema["properties"]
     assert "name" in put_schema["required"]
 
@@ -260,7 +261,7 @@ def test_registry_merges_allof_request_body_schema():
     reg = ToolRegistry(spec, allowlist={"merge_body"})
     tools = reg.list_tools()
 
-    schema = tools["merge_body"]["input_schema"]
+    schema = tools["merge_body"].input_schema
     assert "a" in schema["properties"]
     assert "b" in schema["properties"]
     assert "a" in schema["required"]
@@ -295,7 +296,135 @@ def test_registry_excludes_readonly_properties_from_required():
     reg = ToolRegistry(spec, allowlist={"create_thing"})
     tools = reg.list_tools()
 
-    schema = tools["create_thing"]["input_schema"]
+    schema = tools["create_thing"].input_schema
     assert "id" not in schema["properties"]
     assert "name" in schema["properties"]
     assert "name" in schema["required"]
+
+
+@pytest.mark.parametrize("lazy", [False, True])
+def test_refresh_rebuilds_only_changed_operations(lazy):
+    """Unchanged operations keep their tool; transitive component edits are detected."""
+
+    def spec(address_type="string", hosts_summary="List hosts"):
+        return {
+            "paths": {
+                "/api/v1/hosts": {
+                    "get": {"operationId": "get_all_hosts", "summary": hosts_summary}
+                },
+                "/api/v1/hosts/{id}": {
+                    "put": {
+                        "operationId": "update_host",
+                        "requestBody": {
+                            "content": {
+                                "application/json": {
+                                    "schema": {"$ref": "#/components/schemas/Host"}
+                                }
+                            }
+                        },
+                    }
+                },
+            },
+            "components": {
+                "schemas": {
+                    "Host": {
+                        "type": "object",
+                        "properties": {"iface": {"$ref": "#/components/schemas/Iface"}},
+                    },
+                    "Iface": {"type": "object", "properties": {"ip": {"type": address_type}}},
+                }
+            },
+        }
+
+    reg = ToolRegistry(spec(), allowlist={"update_host"}, lazy=lazy)
+    before = dict(reg.list_tools())
+
+    assert reg.refresh(spec()) == {"added": [], "removed": [], "changed": []}
+    assert reg.list_tools()["update_host"] is before["update_host"]
+
+    changes = reg.refresh(spec(address_type="integer"))
+    assert changes == {"added": [], "removed": [], "changed": ["update_host"]}
+    after = reg.list_tools()
+    assert after["get_all_hosts"] is before["get_all_hosts"]
+    assert after["update_host"] is not before["update_host"]
+
+
+def test_registry_builds_compact_tool_specs():
+    """Tools should carry precomputed flags and no per-instance __dict__."""
+    spec = {
+        "paths": {
+            "/api/v1/hosts/{id}": {
+                "get": {
+                    "operationId": "get_host_by_id",
+                    "parameters": [{"name": "id", "in": "path", "schema": {"type": "string"}}],
+                },
+                "delete": {"operationId": "delete_host"},
+            }
+        }
+    }
+    tools = ToolRegistry(spec, allowlist={"delete_host"}).list_tools()
+
+    read, write = tools["get_host_by_id"], tools["delete_host"]
+    assert not read.is_write and write.is_write
+    assert read.required == frozenset({"id"})
+    assert read.path_params == ("id",)
+    assert read.path is write.path
+    assert not hasattr(read, "__dict__")
+    with pytest.raises(AttributeError):
+        read.method = "POST"
+
+
+def test_registry_shares_values_within_a_build_only():
+    """Equal required sets are shared within a registry; empty schemas never are."""
+    spec = {
+        "paths": {
+            "/api/v1/hosts/{id}": {"get": {"operationId": "get_host_by_id"}},
+            "/api/v1/ports/{id}": {"get": {"operationId": "get_port_by_id"}},
+        }
+    }
+    tools = ToolRegistry(spec, allowlist=set()).list_tools()
+    host, port = tools["get_host_by_id"], tools["get_port_by_id"]
+    assert host.path_params is port.path_params
+    other = ToolRegistry(spec, allowlist=set()).list_tools()["get_host_by_id"]
+    assert other.path_params == host.path_params
+    assert other.path_params is not host.path_params
+
+    first, second = ToolSpec.http("a", "GET", "/a"), ToolSpec.http("b", "GET", "/b")
+    first.input_schema["properties"]["x"] = {"type": "string"}
+    assert second.input_schema == {"type": "object", "properties": {}}
+
+
+def test_lazy_registry_builds_tools_on_first_use(mocker):
+    """Lazy mode should index operations up front and build each schema once, when used."""
+    spec = {
+        "paths": {
+            "/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}},
+            "/api/v1/hosts/{id}": {
+                "get": {
+                    "operationId": "get_host_by_id",
+                    "parameters": [{"name": "id", "in": "path", "schema": {"type": "string"}}],
+                },
+                "delete": {"operationId": "delete_host"},
+            },
+        }
+    }
+    reg = ToolRegistry(spec, allowlist=set(), lazy=True)
+    build = mocker.spy(reg, "_build_input_schema")
+
+    tools = reg.list_tools(include_meta=True)
+    assert build.call_count == 0
+    assert set(tools) == {"get_all_hosts", "get_host_by_id", "batch_call"}
+    assert "delete_host" not in tools
+
+    tool = tools["get_host_by_id"]
+    assert tools["get_host_by_id"] is tool
+    assert reg.built_tools()["get_host_by_id"] is tool
+    assert build.call_count == 1
+    assert tool.required == frozenset({"id"})
+    assert (
+        tool.input_schema
+        == ToolRegistry(spec, allowlist=set()).list_tools()["get_host_by_id"].input_schema
+    )
+
+    with pytest.raises(ValueError, match="Duplicate operationId"):
+        tools["get_all_hosts"] = tools["batch_call"]
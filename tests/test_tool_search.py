@@ -0,0 +1,92 @@
+"""Tests for scanopy_mcp.tool_search and tag-filtered tools/list."""
+
+from scanopy_mcp.config import Config
+from scanopy_mcp.stdio_server import MCPStdioServer
+from scanopy_mcp.tool_registry import ToolRegistry
+from scanopy_mcp.tool_search import ToolIndex
+
+SPEC = {
+    "paths": {
+        "/api/v1/hosts": {
+            "get": {"operationId": "get_all_hosts", "summary": "List hosts", "tags": ["hosts"]},
+        },
+        "/api/v1/discovery/start-session": {
+            "post": {
+                "operationId": "create_discovery",
+                "summary": "Start a network discovery",
+                "tags": ["discovery"],
+            },
+        },
+        "/api/v1/discovery": {
+            "get": {"operationId": "list_discoveries", "tags": ["discovery"]},
+        },
+        "/api/v1/health": {"get": {"operationId": "health"}},
+    }
+}
+
+
+def _index():
+    tools = ToolRegistry(SPEC, allowlist={"create_discovery"}).list_tools(include_meta=True)
+    return ToolIndex(lambda: tools), tools
+
+
+def test_search_ranks_by_keywords_and_prefixes():
+    index, _ = _index()
+    names = [tool.name for tool in index.search("start disc")]
+    assert names == ["create_discovery"]
+
+    names = [tool.name for tool in index.search("discover")]
+    assert set(names) == {"create_discovery", "list_discoveries"}
+    assert index.search("nothing matches") == []
+
+
+def test_search_groups_by_tag():
+    index, _ = _index()
+    assert index.groups() == {"discovery": 2, "hosts": 1, "meta": 1, "other": 1}
+    assert [tool.name for tool in index.search(tag="hosts")] == ["get_all_hosts"]
+    result = index.handle_search({})
+    assert result["groups"]["discovery"] == 2
+
+
+def test_index_rebuilds_when_tools_change():
+    tools = ToolRegistry(SPEC, allowlist=set()).list_tools()
+    index = ToolIndex(lambda: tools)
+    assert index.search("health")
+    tools.pop("health")
+    assert index.search("health") == []
+
+
+def test_tools_list_exposes_selected_tags_only(mocker):
+    """Hidden groups should stay out of tools/list but remain searchable and callable."""
+    config = Config(
+        base_url="http://test",
+        api_key="key",
+        confirm_string="CONFIRM",
+        tool_tags=frozenset({"hosts"}),
+    )
+    server = MCPStdioServer(config=config, openapi_url="", allowlist=set(), openapi_spec=SPEC)
+
+    response = server.handle_request({"jsonrpc": "2.0", "id": 1, "method": "tools/list"})
+    names = {tool["name"] for tool in response["result"]["tools"]}
+    assert "get_all_hosts" in names and "search_tools" in names
+    assert "list_discoveries" not in names and "health" not in names
+
+    runtime = server._get_runtime()
+    found = runtime.tools_call("search_tools", {"query": "discoveries"})
+    assert [tool["name"] for tool in found["tools"]] == ["list_discoveries"]
+
+
+def test_search_in_lazy_mode_builds_only_returned_schemas(mocker):
+    """Indexing a lazy table should not build input schemas."""
+    registry = ToolRegistry(SPEC, allowlist={"create_discovery"}, lazy=True)
+    build = mocker.spy(registry, "_build_input_schema")
+    tools = registry.list_tools(include_meta=True)
+    index = ToolIndex(lambda: tools)
+
+    assert index.groups() == {"discovery": 2, "hosts": 1, "meta": 1, "other": 1}
+    assert build.call_count == 0
+    assert tools.resolved() == 0
+
+    result = index.handle_search({"query": "start discovery"})
+    assert [tool["name"] for tool in result["tools"]] == ["create_discovery"]
+    assert build.call_count == 1
@@ -0,0 +1,80 @@
+"""Tests for scanopy_mcp.tracing."""
+
+import json
+
+import httpx
+
+from scanopy_mcp.client import ScanopyClient
+from scanopy_mcp.config import Config
+from scanopy_mcp.stdio_server import MCPStdioServer
+from scanopy_mcp.tracing import JsonlSpanExporter, Tracer, parse_traceparent
+
+
+def test_disabled_tracer_yields_none():
+    """Tracer without exporter should not create spans."""
+    with Tracer().span("noop") as span:
+        assert span is None
+
+
+def test_nested_spans_share_trace_and_link_parent(tmp_path):
+    """Child spans should inherit the trace id and point at their parent."""
+    path = tmp_path / "trace.jsonl"
+    tracer = Tracer(JsonlSpanExporter(str(path)))
+
+    with tracer.span("outer") as outer:
+        with tracer.span("inner", key="value"):
+            pass
+
+    inner, outer_line = [json.loads(line) for line in path.read_text().splitlines()]
+    assert inner["traceId"] == outer.trace_id == outer_line["traceId"]
+    assert inner["parentSpanId"] == outer_line["spanId"]
+    assert inner["attributes"] == [{"key": "key", "value": {"stringValue": "value"}}]
+
+
+def test_client_forwards_traceparent_header(mocker, tmp_path):
+    """Upstream requests should carry the active trace id."""
+    mock_response = httpx.Response(200, json={}, request=httpx.Request("GET", "http://test"))
+    httpx_mock = mocker.patch("httpx.Client.request", return_value=mock_response)
+    tracer = Tracer(JsonlSpanExporter(str(tmp_path / "trace.jsonl")))
+    client = ScanopyClient(base_url="http://test", api_key="key", tracer=tracer)
+
+    with tracer.span("root") as root:
+        client.request("GET", "/api/v1/hosts")
+
+    header = httpx_mock.call_args[1]["headers"]["traceparent"]
+    assert parse_traceparent(header)[0] == root.trace_id
+
+
+def test_stdio_request_spans_cover_all_layers(mocker, tmp_path):
+    """A tools/call should produce spans from stdio down to the HTTP client."""
+    path = tmp_path / "trace.jsonl"
+    config = Config(
+        base_url="http://test", api_key="key", confirm_string="CONFIRM", trace_file=str(path)
+    )
+    server = MCPStdioServer(
+        config=config,
+        openapi_url="",
+        allowlist=set(),
+        openapi_spec={"paths": {"/api/v1/hosts": {"get": {"operationId": "hosts.list"}}}},
+    )
+    mock_response = httpx.Response(
+        200, json={"hosts": []}, request=httpx.Request("GET", "http://test")
+    )
+    mocker.patch("httpx.Client.request", return_value=mock_response)
+    mocker.patch("sys.stdout")
+
+    request = {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": "hosts.list"}}
+    server._serve([json.dumps(request)])
+
+    spans = [json.loads(line) for line in path.read_text().splitlines()]
+    names = {span["name"] for span in spans}
+    assert {
+        "mcp.stdio.message",
+        "jsonrpc.parse",
+        "mcp.handle_request",
+        "mcp.runtime.load",
+        "mcp.tools_call",
+        "scanopy.http.request",
+        "mcp.serialize",
+    } <= names
+    assert len({span["traceId"] for span in spans}) == 1
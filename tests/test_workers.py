@@ -0,0 +1,56 @@
+"""Tests for scanopy_mcp.workers (pre-fork HTTP worker mode)."""
+
+import os
+import signal
+import subprocess
+import sys
+
+import httpx
+import pytest
+
+from scanopy_mcp.http_server import SESSION_HEADER
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+
+SCRIPT = """
+from scanopy_mcp.config import Config
+from scanopy_mcp.workers import PreforkHTTPServer
+
+spec = {"paths": {"/api/v1/hosts": {"get": {"operationId": "get_all_hosts"}}}}
+config = Config(base_url="http://test", api_key="key", confirm_string="CONFIRM")
+server = PreforkHTTPServer(config, "", set(), workers=2, openapi_spec=spec, port=0)
+server.prepare()
+print("%s:%d" % server.address, flush=True)
+server.run()
+"""
+
+
+def _children(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return f.read().split()
+
+
+def test_workers_share_socket_and_sessions():
+    """Sessions issued by one worker should be accepted by every worker."""
+    proc = subprocess.Popen([sys.executable, "-c", SCRIPT], stdout=subprocess.PIPE, text=True)
+    try:
+        url = f"http://{proc.stdout.readline().strip()}/mcp"
+        init = httpx.post(url, json={"jsonrpc": "2.0", "id": 1, "method": "initialize"})
+        session = init.headers[SESSION_HEADER]
+
+        # Fresh connections each time, so the kernel spreads them over workers
+        for i in range(8):
+            response = httpx.post(
+                url,
+                json={"jsonrpc": "2.0", "id": i + 2, "method": "tools/list"},
+                headers={SESSION_HEADER: session},
+            )
+            assert response.status_code == 200
+            names = [tool["name"] for tool in response.json()["result"]["tools"]]
+            assert "get_all_hosts" in names
+
+        if os.path.exists(f"/proc/{proc.pid}/task/{proc.pid}/children"):
+            assert len(_children(proc.pid)) == 2
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        assert proc.wait(timeout=15) == 0